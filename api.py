@@ -0,0 +1,307 @@
+#----------------------------------------------------------------------------#
+# Read-only JSON API, version 1.
+#
+# Responses are serialized straight from column-projected queries. Listings
+# use the same keyset cursors as the HTML pages (?cursor=, ?limit=), every
+# endpoint accepts ?fields=a,b,c to return a sparse fieldset, and responses
+# carry an ETag so clients can revalidate with If-None-Match; venue and
+# artist records also carry Last-Modified. Venue and
+# artist listings can be sorted by ?sort=name or ?sort=activity and
+# filtered by ?genre=; /genres lists the genres with their counts.
+# /shows/conflicts checks a venue and artist booking before it is made and
+# /artists/available finds the artists free for one. /venues/autocomplete
+# and /artists/autocomplete suggest names for a typed prefix (?q=).
+#----------------------------------------------------------------------------#
+
+import datetime
+import hashlib
+import json
+from flask import Blueprint, Response, current_app, request, abort, jsonify
+from extensions import db
+from models import Venue, Artist, Show, Genre, sort_text
+import pagination
+import scheduling
+import autocomplete
+import genres
+import page_cache
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+VENUE_FIELDS = {
+    'id': Venue.id,
+    'name': Venue.name,
+    'city': Venue.city,
+    'state': Venue.state,
+    'address': Venue.address,
+    'phone': Venue.phone,
+    'website': Venue.website,
+    'image_link': Venue.image_link,
+    'facebook_link': Venue.facebook_link,
+    'genres': Venue.genres,
+    'seeking_talent': Venue.seeking_talent,
+    'seeking_description': Venue.seeking_description,
+    'listed_at': Venue.listed_at,
+    'upcoming_shows_count': Venue.upcoming_shows_count,
+    'past_shows_count': Venue.past_shows_count,
+    'next_show_time': Venue.next_show_time,
+    'updated_at': Venue.updated_at,
+}
+
+ARTIST_FIELDS = {
+    'id': Artist.id,
+    'name': Artist.name,
+    'city': Artist.city,
+    'state': Artist.state,
+    'phone': Artist.phone,
+    'website': Artist.website,
+    'image_link': Artist.image_link,
+    'facebook_link': Artist.facebook_link,
+    'genres': Artist.genres,
+    'seeking_venue': Artist.seeking_venue,
+    'seeking_description': Artist.seeking_description,
+    'lists_available': Artist.lists_available,
+    'available_from': Artist.available_from,
+    'available_to': Artist.available_to,
+    'listed_at': Artist.listed_at,
+    'upcoming_shows_count': Artist.upcoming_shows_count,
+    'past_shows_count': Artist.past_shows_count,
+    'next_show_time': Artist.next_show_time,
+    'updated_at': Artist.updated_at,
+}
+
+SHOW_FIELDS = {
+    'id': Show.id,
+    'start_time': Show.start_time,
+    'end_time': Show.end_time,
+    'venue_id': Show.venue_id,
+    'venue_name': Venue.name,
+    'artist_id': Show.artist_id,
+    'artist_name': Artist.name,
+    'artist_image_link': Artist.image_link,
+}
+
+
+def _selected_fields(available):
+    # Parses ?fields=; unknown names are a client error.
+    requested = request.args.get('fields')
+    if not requested:
+        return list(available)
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown or not names:
+        abort(400, description=f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def _project(available):
+    names = _selected_fields(available)
+    return names, [available[name].label(name) for name in names]
+
+
+def _value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def _serialize(row, names):
+    return {name: _value(getattr(row, name)) for name in names}
+
+
+def _conditional_response(payload, last_modified=None):
+    body = json.dumps(payload, separators=(',', ':'), sort_keys=True)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(hashlib.sha1(body.encode()).hexdigest())
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def _listing(query, names, keys):
+    page = pagination.paginate(query, keys)
+    return _conditional_response({
+        'data': [_serialize(row, names) for row in page.items],
+        'count': len(page.items),
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+    })
+
+
+def _sort_keys(model):
+    # ?sort=name (default) or ?sort=activity, most upcoming shows first.
+    sort = request.args.get('sort', 'name')
+    if sort == 'name':
+        return [(sort_text(model.name), False), (model.id, False)]
+    if sort == 'activity':
+        return [(model.upcoming_shows_count, True), (model.id, True)]
+    abort(400, description=f'Unknown sort: {sort}')
+
+
+def _genre_filter(query, model):
+    genre = request.args.get('genre')
+    if genre:
+        query = query.filter(genres.has_genre(model.genres, genre))
+    return query
+
+
+def _detail(query, names, modified=None):
+    # `modified` is the updated_at column of the record, sent as
+    # Last-Modified whatever fields were asked for.
+    if modified is not None:
+        query = query.add_columns(modified.label('last_modified'))
+    row = query.first()
+    if row is None:
+        abort(404)
+    last_modified = page_cache.http_time(row.last_modified) if modified is not None else None
+    return _conditional_response({'data': _serialize(row, names)}, last_modified)
+
+
+def _window():
+    # (start, end) from ?start_time= and ?end_time=, or ?duration= minutes
+    # (SHOW_DEFAULT_DURATION when neither is given).
+    try:
+        start_time = datetime.datetime.fromisoformat(request.args.get('start_time', ''))
+        if request.args.get('end_time'):
+            end_time = datetime.datetime.fromisoformat(request.args['end_time'])
+        else:
+            duration = request.args.get('duration')
+            end_time = scheduling.end_time_for(start_time, int(duration) if duration else None)
+    except ValueError as e:
+        abort(400, description=str(e))
+    if end_time <= start_time:
+        abort(400, description='end_time must be after start_time')
+    return start_time, end_time
+
+
+def _suggestions(model):
+    # ?q=<prefix>&limit=; ?limit= is clamped to AUTOCOMPLETE_LIMIT_MAX.
+    config = current_app.config
+    limit = request.args.get('limit', config['AUTOCOMPLETE_LIMIT'], type=int)
+    limit = max(1, min(limit, config['AUTOCOMPLETE_LIMIT_MAX']))
+    return _conditional_response({'data': autocomplete.suggest(model, request.args.get('q'), limit)})
+
+
+def _shows_query(columns):
+    return db.session.query(*columns).select_from(Show) \
+        .join(Artist, Show.artist_id == Artist.id) \
+        .join(Venue, Show.venue_id == Venue.id)
+
+
+#  Venues
+#  ----------------------------------------------------------------
+
+@api.route('/venues')
+def list_venues():
+    names, columns = _project(VENUE_FIELDS)
+    return _listing(_genre_filter(db.session.query(*columns), Venue), names, _sort_keys(Venue))
+
+
+@api.route('/venues/autocomplete')
+def autocomplete_venues():
+    return _suggestions(Venue)
+
+
+@api.route('/venues/<int:venue_id>')
+def get_venue(venue_id):
+    names, columns = _project(VENUE_FIELDS)
+    return _detail(db.session.query(*columns).filter(Venue.id == venue_id), names, Venue.updated_at)
+
+
+#  Artists
+#  ----------------------------------------------------------------
+
+@api.route('/artists')
+def list_artists():
+    names, columns = _project(ARTIST_FIELDS)
+    return _listing(_genre_filter(db.session.query(*columns), Artist), names, _sort_keys(Artist))
+
+
+@api.route('/artists/available')
+def available_artists():
+    # ?start_time=<ISO 8601>&end_time=<ISO 8601> (or &duration=<minutes>),
+    # optionally &genre=&city=&state=; paged like /artists.
+    start_time, end_time = _window()
+    names, columns = _project(ARTIST_FIELDS)
+    query = scheduling.available_artists(
+        db.session.query(*columns), start_time, end_time,
+        genre=request.args.get('genre'), city=request.args.get('city'), state=request.args.get('state'))
+    return _listing(query, names, _sort_keys(Artist))
+
+
+@api.route('/artists/autocomplete')
+def autocomplete_artists():
+    return _suggestions(Artist)
+
+
+@api.route('/artists/<int:artist_id>')
+def get_artist(artist_id):
+    names, columns = _project(ARTIST_FIELDS)
+    return _detail(db.session.query(*columns).filter(Artist.id == artist_id), names, Artist.updated_at)
+
+
+#  Shows
+#  ----------------------------------------------------------------
+
+@api.route('/shows')
+def list_shows():
+    names, columns = _project(SHOW_FIELDS)
+    query = _shows_query(columns)
+    venue_id = request.args.get('venue_id', type=int)
+    if venue_id is not None:
+        query = query.filter(Show.venue_id == venue_id)
+    artist_id = request.args.get('artist_id', type=int)
+    if artist_id is not None:
+        query = query.filter(Show.artist_id == artist_id)
+    return _listing(query, names, [(Show.start_time, True), (Show.id, True)])
+
+
+@api.route('/shows/<int:show_id>')
+def get_show(show_id):
+    names, columns = _project(SHOW_FIELDS)
+    return _detail(_shows_query(columns).filter(Show.id == show_id), names)
+
+
+@api.route('/shows/conflicts')
+def show_conflicts():
+    # ?venue_id=&artist_id=&start_time=<ISO 8601>&duration=<minutes> (or
+    # &end_time=); at least one of venue_id and artist_id. Lists the shows the booking
+    # would overlap.
+    venue_id = request.args.get('venue_id', type=int)
+    artist_id = request.args.get('artist_id', type=int)
+    if venue_id is None and artist_id is None:
+        abort(400, description='venue_id or artist_id is required')
+    start_time, end_time = _window()
+    found = scheduling.conflicts(start_time, end_time, venue_id=venue_id, artist_id=artist_id,
+                                 exclude_id=request.args.get('exclude_id', type=int))
+    return _conditional_response({
+        'conflict': bool(found),
+        'end_time': end_time.isoformat(),
+        'data': [{name: _value(value) for name, value in conflict.items()} for conflict in found],
+    })
+
+
+#  Genres
+#  ----------------------------------------------------------------
+
+@api.route('/genres')
+def list_genres():
+    rows = db.session.query(Genre.name, Genre.venue_count, Genre.artist_count).order_by(Genre.name)
+    return _conditional_response({'data': [{
+        'name': row.name,
+        'venue_count': row.venue_count,
+        'artist_count': row.artist_count,
+    } for row in rows]})
+
+
+#  Errors
+#  ----------------------------------------------------------------
+
+@api.errorhandler(400)
+def bad_request(error):
+    return jsonify({'error': 'bad request', 'message': error.description}), 400
+
+
+@api.errorhandler(404)
+def not_found(error):
+    return jsonify({'error': 'not found'}), 404
@@ -0,0 +1,140 @@
+#----------------------------------------------------------------------------#
+# Venue directory summary.
+#
+# /venues renders one venue_area row per (city, state), each holding the
+# area's venue count and its first VENUE_AREA_PREVIEW venues, so a page is a
+# single read of a few rows off ix_venue_area_directory however many venues
+# there are. The full list of an area is paged from the venue table
+# (/venues?city=&state=, served by ix_venue_directory), and so is a genre
+# (/venues?genre=, served by ix_venue_genres). Rows are rebuilt for
+# the areas a write touched:
+#   - venue create/edit/delete and bulk imports (venues.venues_changed),
+#   - show counter changes (counters.py), since the lists carry the
+#     upcoming show counts,
+# and entirely with
+#   flask rebuild-venue-areas
+#----------------------------------------------------------------------------#
+
+import itertools
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import func, or_, and_
+from extensions import db
+from models import Venue, VenueArea, sort_text
+import genres
+
+AREA_DIRECTORY_KEYS = [(VenueArea.city, True), (VenueArea.state, False)]
+VENUE_DIRECTORY_KEYS = [
+    (sort_text(Venue.city), True),
+    (sort_text(Venue.state), False),
+    (Venue.id, False)
+]
+
+
+def group_venues_by_area(rows):
+    # rows carry id, name, city, state and upcoming_shows_count and are
+    # ordered by city and state, so every area is a contiguous run and one
+    # pass is enough to group them.
+    areas = []
+    area = None
+    for row in rows:
+        if area is None or area['city'] != row.city or area['state'] != row.state:
+            area = {'city': row.city, 'state': row.state, 'venues': []}
+            areas.append(area)
+        area['venues'].append({
+            'id': row.id,
+            'name': row.name,
+            'num_upcoming_shows': row.upcoming_shows_count
+        })
+    return areas
+
+
+def _venue_rows(where=None):
+    # The first VENUE_AREA_PREVIEW venues by id of every area, each with the
+    # area's venue count as `total`; the database ranks and counts them, so
+    # only the previews are read.
+    city = sort_text(Venue.city)
+    state = sort_text(Venue.state)
+    ranked = db.session.query(
+        Venue.id, Venue.name, city.label('city'), state.label('state'), Venue.upcoming_shows_count,
+        func.row_number().over(partition_by=(city, state), order_by=Venue.id).label('position'),
+        func.count().over(partition_by=(city, state)).label('total'))
+    if where is not None:
+        ranked = ranked.filter(where)
+    ranked = ranked.subquery()
+    return db.session.query(ranked) \
+        .filter(ranked.c.position <= current_app.config.get('VENUE_AREA_PREVIEW', 10)) \
+        .order_by(ranked.c.city, ranked.c.state, ranked.c.id).yield_per(1000)
+
+
+def _matching(model_city, model_state, areas):
+    return or_(*[and_(model_city == city, model_state == state) for city, state in areas])
+
+
+def _store(rows):
+    # rows from _venue_rows().
+    records = []
+    for (city, state), previews in itertools.groupby(rows, lambda row: (row.city, row.state)):
+        previews = list(previews)
+        records.append({
+            'city': city,
+            'state': state,
+            'venue_count': previews[0].total,
+            'venues': group_venues_by_area(previews)[0]['venues'],
+        })
+    if records:
+        db.session.execute(VenueArea.__table__.insert(), records)
+    return len(records)
+
+
+def area_of(city, state):
+    return (city or '', state or '')
+
+
+def refresh(areas):
+    # Rebuilds the given (city, state) areas and commits. Areas left without
+    # venues are removed.
+    areas = {area_of(city, state) for city, state in areas}
+    if not areas:
+        return 0
+    db.session.query(VenueArea) \
+        .filter(_matching(VenueArea.city, VenueArea.state, areas)) \
+        .delete(synchronize_session=False)
+    stored = _store(_venue_rows(_matching(
+        sort_text(Venue.city), sort_text(Venue.state), areas)))
+    db.session.commit()
+    return stored
+
+
+def filtered_venues(city=None, state=None, genre=None):
+    # Query for the venues of an area (city and/or state) and/or genre, for
+    # paging with VENUE_DIRECTORY_KEYS. None leaves a filter out.
+    query = db.session.query(Venue.id, Venue.name, Venue.city, Venue.state, Venue.upcoming_shows_count)
+    if city is not None:
+        query = query.filter(sort_text(Venue.city) == city)
+    if state is not None:
+        query = query.filter(sort_text(Venue.state) == state)
+    if genre:
+        query = query.filter(genres.has_genre(Venue.genres, genre))
+    return query
+
+
+def areas_of_venues(where):
+    # The areas of the venues matching `where`, for callers about to change them.
+    return {area_of(city, state) for city, state in
+            db.session.query(Venue.city, Venue.state).filter(where).distinct()}
+
+
+def rebuild():
+    db.session.query(VenueArea).delete(synchronize_session=False)
+    stored = _store(_venue_rows())
+    db.session.commit()
+    return stored
+
+
+@click.command('rebuild-venue-areas')
+@with_appcontext
+def rebuild_command():
+    """Rebuild the venue directory summary from the venue table."""
+    click.echo(f'Rebuilt {rebuild()} venue areas')
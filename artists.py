@@ -0,0 +1,213 @@
+#----------------------------------------------------------------------------#
+# Artist pages.
+#----------------------------------------------------------------------------#
+
+import datetime
+from flask import Blueprint, current_app, render_template, request, flash, redirect, url_for, abort
+from extensions import db, cache
+from models import Venue, Artist, Show, sort_text
+from forms import ArtistForm
+from main import RECENT_ARTISTS_KEY
+from shows import split_shows
+import pagination
+import search
+import autocomplete
+import genres
+import page_cache
+
+bp = Blueprint('artists', __name__)
+
+
+def artists_changed(old_genres=None, new_genres=None, ids=()):
+    # Drops everything derived from the artist table after a write.
+    # Handlers pass the genres of the artist before and after and its id;
+    # without either genre list every genre is recounted and the
+    # autocomplete array rebuilt.
+    search.invalidate(Artist)
+    cache.delete(RECENT_ARTISTS_KEY)
+    if old_genres is None and new_genres is None:
+        genres.refresh([Artist])
+        autocomplete.invalidate(Artist)
+    else:
+        genres.adjust(Artist, old_genres, new_genres)
+        autocomplete.refresh(Artist, ids)
+
+
+#  Artists
+#  ----------------------------------------------------------------
+
+ARTIST_SORT_KEYS = {
+    'name': [(sort_text(Artist.name), False), (Artist.id, False)],
+    # Most upcoming shows first, served by ix_artist_activity.
+    'activity': [(Artist.upcoming_shows_count, True), (Artist.id, True)],
+}
+
+@bp.route('/artists')
+def artists():
+    sort = request.args.get('sort', 'name')
+    if sort not in ARTIST_SORT_KEYS:
+        abort(400)
+    query = db.session.query(Artist.id, Artist.name, Artist.upcoming_shows_count.label('num_upcoming_shows'))
+    genre = request.args.get('genre')
+    if genre:
+        query = query.filter(genres.has_genre(Artist.genres, genre))
+    page = pagination.paginate(query, ARTIST_SORT_KEYS[sort])
+    return render_template('pages/artists.html', artists=page.items, page=page, sort=sort,
+                           genre=genre, genres=genres.counts(Artist))
+
+@bp.route('/artists/search', methods=['POST'])
+def search_artists():
+    # Only returns items for state, city or artist.
+    # You can search for LA, but not "LA, CA". 
+    search_term=request.form.get('search_term', '')
+    genre = request.form.get('genre') or None
+    data = search.search(Artist, search_term, genre=genre)
+    response={
+        "count": len(data),
+        "data": data
+    }
+    return render_template('pages/search_artists.html', results=response, search_term=request.form.get('search_term', ''),
+                           genre=genre, genres=genres.counts(Artist))
+
+@bp.route('/artists/<int:artist_id>')
+@page_cache.cached_detail(Artist)
+def show_artist(artist_id):
+    # shows the artist page with the given artist_id
+    artist = Artist.query.get(artist_id)
+    current_time = datetime.datetime.now()
+
+    if not artist:
+        return render_template('errors/404.html'), 404
+
+    rows = db.session.query(Show.venue_id, Venue.name, Venue.image_link, Show.start_time) \
+        .join(Venue, Show.venue_id == Venue.id) \
+        .filter(Show.artist_id == artist_id) \
+        .order_by(Show.start_time).all()
+
+    past_shows, upcoming_shows = split_shows([{
+        "venue_id" : venue_id,
+        "venue_name" : venue_name,
+        "venue_image_link": venue_image_link,
+        "start_time" : start_time
+    } for venue_id, venue_name, venue_image_link, start_time in rows], current_time)
+
+    data = {
+        'name' : artist.name,
+        'id' : artist_id,
+        'genres': artist.genres,
+        'city': artist.city,
+        'state': artist.state,
+        'phone': artist.phone,
+        'website': artist.website,
+        'facebook_link': artist.facebook_link,
+        'seeking_venue': artist.seeking_venue,
+        'seeking_description': artist.seeking_description,
+        'lists_available': artist.lists_available,
+        'available_from': artist.available_from.strftime("%Y-%m-%d"),
+        'available_to': artist.available_to.strftime("%Y-%m-%d"),
+        'image_link': artist.image_link,
+        'past_shows': past_shows,
+        'past_shows_count' : len(past_shows),
+        'upcoming_shows': upcoming_shows,
+        'upcoming_shows_count': len(upcoming_shows)
+      }
+
+
+    return render_template('pages/show_artist.html', artist=data)
+#  Update
+#  ----------------------------------------------------------------
+@bp.route('/artists/<int:artist_id>/edit', methods=['GET'])
+def edit_artist(artist_id):
+
+    artist= Artist.query.get(artist_id)
+    if artist:
+        form = ArtistForm(obj=artist)
+    else:
+        flash('No artist with that ID exist.')
+        render_template('errors/404.html')
+
+    return render_template('forms/edit_artist.html', form=form, artist=artist)
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['POST'])
+def edit_artist_submission(artist_id):
+    form = ArtistForm()
+    artist = Artist.query.get(artist_id)
+    old_genres = list(artist.genres or [])
+    if form.available_from.data == None or form.available_to.data == None:
+        bool_lists_available = False
+    else:
+        bool_lists_available = True
+
+    try:
+        artist.name = form.name.data,
+        artist.genres = form.genres.data,
+        artist.city = form.city.data,
+        artist.state = form.state.data,
+        artist.phone = form.phone.data,
+        artist.website = form.website.data,
+        artist.facebook_link = form.facebook_link.data,
+        artist.seeking_description = form.seeking_description.data,
+        artist.image_link = form.image_link.data,
+        artist.available_from = form.available_from.data, 
+        artist.available_to = form.available_to.data, 
+        artist.lists_available = bool_lists_available
+        db.session.commit()
+        artists_changed(old_genres, form.genres.data, ids=[artist_id])
+        page_cache.touch_related(Venue, Show.venue_id, Show.artist_id == artist_id)
+
+        #Can't get the bool submission to work on edit, while it works flawlessly on create new :S
+    except ValueError:
+        current_app.logger.exception('Artist %s could not be edited', artist_id)
+        flash('An error has occured! ' + form.name.data+' could not be listed')
+        db.session.rollback()
+    finally:
+        db.session.close
+
+    return redirect(url_for('.show_artist', artist_id=artist_id))
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+@bp.route('/artists/create', methods=['GET'])
+def create_artist_form():
+    form = ArtistForm()
+    return render_template('forms/new_artist.html', form=form)
+
+@bp.route('/artists/create', methods=['POST'])
+def create_artist_submission():
+    form = ArtistForm(request.form)
+
+    if form.available_from.data == None or form.available_to.data == None:
+        bool_lists_available = False
+    else:
+        bool_lists_available = True
+    try: 
+        artist = Artist(
+            name=form.name.data,
+            city = form.city.data,
+            state = form.state.data,
+            phone = form.phone.data,
+            genres = form.genres.data,
+            facebook_link = form.facebook_link.data,
+            website = form.website.data,
+            seeking_venue = form.seeking_venue.data,
+            seeking_description = form.seeking_description.data,
+            image_link = form.image_link.data,
+            available_from = form.available_from.data, 
+            available_to = form.available_to.data, 
+            lists_available = bool_lists_available
+
+
+        )
+        db.session.add(artist)
+        db.session.commit()
+        artists_changed(new_genres=form.genres.data, ids=[artist.id])
+        flash('Artist '+form.name.data+' was successfully listed!' )
+    except ValueError:
+        current_app.logger.exception('Artist %r could not be listed', form.name.data)
+        flash('An error has occured! ' + form.name.data+' could not be listed')
+        db.session.rollback()
+    finally:
+        db.session.close
+
+    return redirect(url_for("main.index"))
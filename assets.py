@@ -0,0 +1,248 @@
+#----------------------------------------------------------------------------#
+# Static assets.
+#
+#   flask build-assets
+# concatenates the stylesheets and scripts of every bundle in BUNDLES into
+# one file each, minifies them, and writes them to static/dist under a name
+# carrying a hash of their content (main.3f09c2a1b4d8.css), along with
+# fingerprinted copies of FILES. It also writes .gz variants, plus .br when
+# the brotli package is installed, and a manifest.json mapping each bundle
+# and file to its output.
+#
+# Templates reference assets through asset_urls(bundle) and asset_url(file).
+# With a manifest and ASSETS_USE_BUILD these return the fingerprinted URLs.
+# They are served from /static/dist with a year-long immutable Cache-Control
+# and in the best encoding the client accepts, so a page is two stylesheet
+# and script requests, each fetched once per release. Otherwise, as in
+# development, they return the source files.
+#----------------------------------------------------------------------------#
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import click
+from flask import current_app, request, send_from_directory, url_for
+from flask.cli import with_appcontext
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+BUILD_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST = 'manifest.json'
+
+# Bundles are written to the root of static/dist, at the depth of
+# static/css, so relative url(../fonts/...) references keep resolving.
+BUNDLES = {
+    'main.css': [
+        'css/bootstrap.min.css',
+        'css/layout.main.css',
+        'css/main.css',
+        'css/main.responsive.css',
+        'css/main.quickfix.css',
+    ],
+    # Loaded synchronously in <head>.
+    'head.js': [
+        'js/libs/modernizr-2.8.2.min.js',
+        'js/libs/moment.min.js',
+    ],
+    # Deferred, after jQuery.
+    'app.js': [
+        'js/libs/bootstrap-3.1.1.min.js',
+        'js/plugins.js',
+        'js/script.js',
+    ],
+}
+
+# Referenced on their own: the jQuery fallback for when the CDN is
+# unreachable, the old IE shim and the home page image.
+FILES = [
+    'js/libs/jquery-1.11.1.min.js',
+    'js/libs/respond-1.4.2.min.js',
+    'img/front-splash.jpg',
+]
+
+COMPRESSIBLE = ('.css', '.js', '.svg')
+# Precompressed variants, preferred first.
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+#  Minification
+#  ----------------------------------------------------------------
+
+# Strings and /*! license comments are kept as they are; other comments are
+# dropped and whitespace is collapsed, and removed around punctuation.
+# Whitespace before ':' is kept since it is a descendant combinator in
+# selectors such as `.nav :first-child`.
+CSS_TOKENS = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*!.*?\*/)'''
+                        r'''|/\*.*?\*/|\s*([{};,>])\s*|\s+''', re.S)
+
+
+def _css_token(match):
+    kept, punctuation = match.groups()
+    if kept:
+        return kept
+    if punctuation:
+        return punctuation
+    return '' if match.group(0).startswith('/*') else ' '
+
+
+def minify_css(text):
+    return CSS_TOKENS.sub(_css_token, text).strip()
+
+
+def minify_js(text):
+    # rjsmin is optional; without it scripts are bundled as they are, which
+    # costs little since the libraries ship minified.
+    try:
+        import rjsmin
+    except ImportError:
+        return text.strip()
+    return rjsmin.jsmin(text)
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+#  Build
+#  ----------------------------------------------------------------
+
+def _read(path):
+    with open(os.path.join(STATIC_DIR, path), encoding='utf-8') as f:
+        return f.read()
+
+
+def bundle(name, sources):
+    # The minified content of a bundle. Sources that are already minified
+    # are only concatenated; scripts are separated with ';' so a file that
+    # does not end in one cannot run into the next.
+    extension = os.path.splitext(name)[1]
+    minify = MINIFIERS[extension]
+    parts = []
+    for path in sources:
+        text = _read(path)
+        parts.append(text.strip() if path.endswith(f'.min{extension}') else minify(text))
+    separator = ';\n' if extension == '.js' else '\n'
+    return separator.join(parts).encode('utf-8')
+
+
+def fingerprint(path, content):
+    stem, extension = os.path.splitext(os.path.basename(path))
+    return f'{stem}.{hashlib.sha256(content).hexdigest()[:12]}{extension}'
+
+
+def compressed(content):
+    # {encoding: bytes} of the variants smaller than the content itself.
+    variants = {'gzip': gzip.compress(content, 9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        variants['br'] = brotli.compress(content, quality=11)
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(content)}
+
+
+def _write(name, content):
+    with open(os.path.join(BUILD_DIR, name), 'wb') as f:
+        f.write(content)
+
+
+def build(clean=False):
+    # Writes every bundle and file with its compressed variants and the
+    # manifest; returns [(name, output, size, {encoding: size})]. Outputs of
+    # earlier builds are kept for pages still referencing them unless clean.
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    outputs = [(name, bundle(name, sources)) for name, sources in BUNDLES.items()]
+    for path in FILES:
+        with open(os.path.join(STATIC_DIR, path), 'rb') as f:
+            outputs.append((path, f.read()))
+
+    manifest = {'assets': {}, 'encodings': {}}
+    written = {MANIFEST}
+    report = []
+    for name, content in outputs:
+        output = fingerprint(name, content)
+        _write(output, content)
+        written.add(output)
+        variants = compressed(content) if output.endswith(COMPRESSIBLE) else {}
+        for encoding, data in variants.items():
+            suffix = ENCODING_SUFFIXES[encoding]
+            _write(output + suffix, data)
+            written.add(output + suffix)
+        manifest['assets'][name] = output
+        manifest['encodings'][output] = sorted(variants)
+        report.append((name, output, len(content), {e: len(d) for e, d in variants.items()}))
+
+    _write(MANIFEST, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    if clean:
+        for stale in set(os.listdir(BUILD_DIR)) - written:
+            os.remove(os.path.join(BUILD_DIR, stale))
+    return report
+
+
+@click.command('build-assets')
+@click.option('--clean', is_flag=True, help='Remove the outputs of earlier builds.')
+@with_appcontext
+def build_command(clean):
+    """Bundle, minify, fingerprint and compress the static assets."""
+    for name, output, size, variants in build(clean):
+        sizes = ', '.join(f'{encoding} {variant}' for encoding, variant in sorted(variants.items()))
+        click.echo(f'{name} -> dist/{output} ({size} bytes{", " + sizes if sizes else ""})')
+
+#  Serving
+#  ----------------------------------------------------------------
+
+def load_manifest(path=None):
+    try:
+        with open(path or os.path.join(BUILD_DIR, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _manifest():
+    return current_app.extensions['assets']
+
+
+def asset_url(path):
+    # The URL of a static file, fingerprinted when built.
+    manifest = _manifest()
+    if manifest is not None and path in manifest['assets']:
+        return url_for('assets', filename=manifest['assets'][path])
+    return url_for('static', filename=path)
+
+
+def asset_urls(name):
+    # The URLs of a bundle: the built file, or its sources when not built.
+    manifest = _manifest()
+    if manifest is not None and name in manifest['assets']:
+        return [url_for('assets', filename=manifest['assets'][name])]
+    return [url_for('static', filename=path) for path in BUNDLES[name]]
+
+
+def serve(filename):
+    # Built files never change under a name, so they can be cached for good.
+    manifest = _manifest() or {'encodings': {}}
+    accepted = request.accept_encodings
+    path = filename
+    encoding = next((encoding for encoding in ENCODING_SUFFIXES
+                     if encoding in manifest['encodings'].get(filename, ()) and accepted[encoding]), None)
+    if encoding is not None:
+        path += ENCODING_SUFFIXES[encoding]
+    response = send_from_directory(BUILD_DIR, path, mimetype=mimetypes.guess_type(filename)[0],
+                                   cache_timeout=current_app.config['ASSETS_MAX_AGE'])
+    if encoding is not None:
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_app(app):
+    manifest = load_manifest() if app.config['ASSETS_USE_BUILD'] else None
+    if app.config['ASSETS_USE_BUILD'] and manifest is None:
+        app.logger.warning('No %s in %s; serving the unbundled assets (run flask build-assets)',
+                           MANIFEST, BUILD_DIR)
+    app.extensions['assets'] = manifest
+    app.add_url_rule(f'{app.static_url_path}/dist/<path:filename>', 'assets', serve)
+    app.jinja_env.globals.update(asset_url=asset_url, asset_urls=asset_urls)
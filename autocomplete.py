@@ -0,0 +1,160 @@
+#----------------------------------------------------------------------------#
+# Venue and artist name autocomplete.
+#
+# Suggestions are the venues or artists whose lowercased name starts with
+# what was typed, in name order. Every lowercased name starting with a
+# prefix p sorts in [p, p + MAX_CHAR), in Python and in a byte-wise
+# collation alike, so both paths answer with one range scan that stops
+# after the limit:
+#   - 'index' reads the expression indexes ix_venue_name_prefix and
+#     ix_artist_name_prefix (migration f3b8d2c6a419), on lower(name) in
+#     the "C" collation on Postgres,
+#   - 'memory' bisects a sorted array of (lowercased name, id) per model
+#     and app, built on first use and kept current by the write handlers
+#     (venues.venues_changed, artists.artists_changed) through refresh().
+#     Writes made by other processes are read in once the array is
+#     AUTOCOMPLETE_INDEX_MAX_AGE seconds old (search.IndexCache).
+#----------------------------------------------------------------------------#
+
+import bisect
+import threading
+from flask import current_app
+from extensions import db
+from models import name_prefix_key
+from search import IndexCache
+
+# Sorts after every other code point, and UTF-8 keeps code point order.
+MAX_CHAR = '\U0010ffff'
+SUGGESTION_FIELDS = ('id', 'name', 'city', 'state')
+
+
+def _columns(model):
+    return [getattr(model, field) for field in SUGGESTION_FIELDS]
+
+
+def _key(name):
+    return (name or '').lower()
+
+
+def plan():
+    # 'index' on Postgres, where every worker sees the other workers'
+    # writes, 'memory' elsewhere; AUTOCOMPLETE_BACKEND forces one.
+    backend = current_app.config.get('AUTOCOMPLETE_BACKEND', 'auto')
+    if backend != 'auto':
+        return backend
+    return 'index' if db.engine.dialect.name == 'postgresql' else 'memory'
+
+
+def suggest(model, term, limit=None):
+    # [{id, name, city, state}] of the first `limit` names starting with
+    # `term`, ignoring case; none for a blank term.
+    prefix = ' '.join(_key(term).split())
+    if limit is None:
+        limit = current_app.config.get('AUTOCOMPLETE_LIMIT', 10)
+    if not prefix or limit < 1:
+        return []
+    if plan() == 'index':
+        rows = _index_suggest(model, prefix, limit)
+    else:
+        rows = _array_for(model).suggest(prefix, limit)
+    return [dict(zip(SUGGESTION_FIELDS, row)) for row in rows]
+
+
+#  SQL prefix index path
+#  ----------------------------------------------------------------
+
+def _index_suggest(model, prefix, limit):
+    key = name_prefix_key(model.name)
+    return db.session.query(*_columns(model)) \
+        .filter(key >= prefix, key < prefix + MAX_CHAR) \
+        .order_by(key, model.id).limit(limit).all()
+
+
+#  In-memory sorted array
+#  ----------------------------------------------------------------
+
+class PrefixArray(object):
+    # `keys` holds (lowercased name, id) in order and `rows` the suggestion
+    # of each id. A lookup bisects to the first key at or after the prefix
+    # and reads on until the limit or the first key past the prefix, so it
+    # costs O(log n + limit) whatever the catalogue size. Writers take the
+    # lock and move single entries; readers go without it.
+
+    def __init__(self, rows):
+        self.lock = threading.Lock()
+        self.rows = {row[0]: tuple(row) for row in rows}
+        self.keys = sorted((_key(row[1]), id) for id, row in self.rows.items())
+
+    def __len__(self):
+        return len(self.keys)
+
+    def suggest(self, prefix, limit):
+        keys = self.keys
+        start = bisect.bisect_left(keys, (prefix,))
+        found = []
+        for key, id in keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            row = self.rows.get(id)
+            if row is not None:
+                found.append(row)
+        return found
+
+    def remove(self, id):
+        with self.lock:
+            row = self.rows.pop(id, None)
+            if row is not None:
+                key = (_key(row[1]), id)
+                index = bisect.bisect_left(self.keys, key)
+                if index < len(self.keys) and self.keys[index] == key:
+                    del self.keys[index]
+
+    def put(self, row):
+        row = tuple(row)
+        self.remove(row[0])
+        with self.lock:
+            self.rows[row[0]] = row
+            bisect.insort(self.keys, (_key(row[1]), row[0]))
+
+
+def _build(model):
+    return PrefixArray(db.session.query(*_columns(model)).yield_per(1000))
+
+
+def _catch_up(array, model, old_version, new_version):
+    # Puts the rows updated since the last check; the array is current
+    # when it then holds as many rows as the table, and rebuilt otherwise,
+    # as after deletes.
+    query = db.session.query(*_columns(model))
+    if old_version[1] is not None:
+        query = query.filter(model.updated_at >= old_version[1])
+    for row in query.yield_per(1000):
+        array.put(row)
+    return len(array) == new_version[0]
+
+
+_arrays = IndexCache('autocomplete_arrays', _build, 'AUTOCOMPLETE_INDEX_MAX_AGE', _catch_up)
+
+
+def _array_for(model):
+    return _arrays.get(model)
+
+
+def refresh(model, ids):
+    # Re-reads the given venues or artists after a write, dropping the ones
+    # that are gone; one query by primary key. Nothing to do before the
+    # array is first used.
+    array = _arrays.peek(model)
+    ids = {id for id in ids if id is not None}
+    if array is None or not ids:
+        return
+    rows = db.session.query(*_columns(model)).filter(model.id.in_(ids)).all()
+    for id in ids - {row[0] for row in rows}:
+        array.remove(id)
+    for row in rows:
+        array.put(row)
+
+
+def invalidate(model):
+    # After bulk writes; the array is rebuilt on next use.
+    _arrays.invalidate(model)
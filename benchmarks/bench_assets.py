@@ -0,0 +1,41 @@
+# Requests and bytes of the stylesheets and scripts of a page: the source
+# files as served before (uncompressed), against the bundles written by
+# `flask build-assets`, uncompressed and in each precompressed encoding.
+# Builds into static/dist.
+#
+#   python benchmarks/bench_assets.py
+
+import os
+from common import app
+import assets
+
+
+def source_bytes(paths):
+    return sum(os.path.getsize(os.path.join(assets.STATIC_DIR, path)) for path in paths)
+
+
+def main():
+    report = {name: (size, variants) for name, _, size, variants in assets.build()}
+    bundles = list(assets.BUNDLES)
+    sources = [path for name in bundles for path in assets.BUNDLES[name]]
+    encodings = sorted({encoding for name in bundles for encoding in report[name][1]})
+
+    print(f"{'':>12} {'requests':>9} {'bytes':>9}")
+    print(f"{'sources':>12} {len(sources):9d} {source_bytes(sources):9d}")
+    print(f"{'bundles':>12} {len(bundles):9d} {sum(report[name][0] for name in bundles):9d}")
+    for encoding in encodings:
+        size = sum(report[name][1].get(encoding, report[name][0]) for name in bundles)
+        print(f"{'+ ' + encoding:>12} {len(bundles):9d} {size:9d}")
+
+    # Repeat visits: the bundles are cached for ASSETS_MAX_AGE and not
+    # requested again; the sources were revalidated every 12 hours.
+    with app.test_request_context():
+        app.extensions['assets'] = assets.load_manifest()
+        url = assets.asset_urls('main.css')[0]
+    response = app.test_client().get(url, headers={'Accept-Encoding': 'gzip, br'})
+    print(f'{url}: {response.headers["Cache-Control"]}, {response.content_encoding}')
+    response.close()
+
+
+if __name__ == '__main__':
+    main()
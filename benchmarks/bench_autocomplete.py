@@ -0,0 +1,52 @@
+# Autocomplete latency at catalogue sizes up to 500k venues: the in-memory
+# sorted array and the prefix index range scan, next to an unindexed
+# ILIKE 'prefix%' query ordered by name. Also times building the array and
+# moving one entry, as the write handlers do.
+#
+#   python benchmarks/bench_autocomplete.py [--sizes 10000,100000,500000]
+
+import argparse
+from common import app, db, Venue, setup_database, reset_database, seed_venues, timed
+import autocomplete
+
+TERMS = ['v', 'venue 1', 'venue 4999', 'venue 123456', 'nomatch']
+LIMIT = 10
+
+
+def ilike_scan(term):
+    return db.session.query(Venue.id, Venue.name, Venue.city, Venue.state) \
+        .filter(Venue.name.ilike(f'{term}%')).order_by(db.func.lower(Venue.name), Venue.id) \
+        .limit(LIMIT).all()
+
+
+def suggest(backend, term):
+    app.config['AUTOCOMPLETE_BACKEND'] = backend
+    return autocomplete.suggest(Venue, term, LIMIT)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10000,100000,500000')
+    args = parser.parse_args()
+
+    setup_database()
+    print(f"{'venues':>8} {'term':>12} {'ilike ms':>9} {'index ms':>9} {'memory ms':>10} {'hits':>5}")
+    for size in [int(size) for size in args.sizes.split(',')]:
+        reset_database()
+        autocomplete.invalidate(Venue)
+        seed_venues(size)
+        build = timed(lambda: autocomplete._array_for(Venue), repeat=1)
+        for term in TERMS:
+            assert suggest('index', term) == suggest('memory', term)
+            scan = timed(lambda: ilike_scan(term), repeat=5)
+            indexed = timed(lambda: suggest('index', term))
+            memory = timed(lambda: suggest('memory', term))
+            print(f"{size:>8} {term:>12} {scan:>9.2f} {indexed:>9.2f} {memory:>10.3f} "
+                  f"{len(suggest('memory', term)):>5}")
+        venue_id = size // 2
+        move = timed(lambda: autocomplete.refresh(Venue, [venue_id]))
+        print(f'{size:>8} array built in {build:.0f} ms, one entry refreshed in {move:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# Availability search: artists free over a two-hour window, filtered by
+# genre, city or both, with --artists artists and --shows shows booked
+# over the seeded year. Each query is one keyset page (PAGE_SIZE) of
+# scheduling.available_artists(), as served by /api/v1/artists/available.
+#
+#   python benchmarks/bench_availability.py [--artists 100000] [--shows 1000000]
+
+import argparse
+import datetime
+from common import (app, db, Artist, setup_database, seed_venues, seed_artists,
+                    seed_shows, timed)
+from models import sort_text
+import pagination
+import scheduling
+
+NAME_KEYS = [(sort_text(Artist.name), False), (Artist.id, False)]
+
+
+def page(start_time, end_time, **filters):
+    query = scheduling.available_artists(
+        db.session.query(Artist.id, Artist.name), start_time, end_time, **filters)
+    return pagination.keyset_page(query, NAME_KEYS, None, app.config['PAGE_SIZE']).items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--artists', type=int, default=100000)
+    parser.add_argument('--shows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    setup_database()
+    seed_venues(1000)
+    seed_artists(args.artists)
+    seed_shows(args.shows, list(range(1, 1001)), list(range(1, args.artists + 1)))
+
+    start_time = datetime.datetime.now().replace(minute=0, second=0, microsecond=0) + datetime.timedelta(days=30)
+    end_time = start_time + datetime.timedelta(hours=2)
+    print(f'{args.artists} artists, {args.shows} shows')
+    for label, filters in (
+        ('any', {}),
+        ('genre', {'genre': 'Jazz'}),
+        ('city', {'city': 'Austin'}),
+        ('genre + city', {'genre': 'Jazz', 'city': 'Austin', 'state': 'TX'}),
+        ('no match', {'genre': 'Jazz', 'city': 'Nowhere'}),
+    ):
+        rows = page(start_time, end_time, **filters)
+        print(f"{label + ' ms':>16} {timed(lambda: page(start_time, end_time, **filters)):8.2f}  ({len(rows)} artists)")
+
+
+if __name__ == '__main__':
+    main()
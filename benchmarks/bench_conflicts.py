@@ -0,0 +1,59 @@
+# Show conflict checks: scheduling.conflicts() for a venue and an artist
+# against a show table of --shows rows, next to an unbounded overlap query
+# (end_time > start AND start_time < end) that cannot stop the index scan
+# at the start of the window. Also checks a tour of TOUR_DATES dates with
+# one conflicts() call per date against one batch_conflicts() query.
+#
+#   python benchmarks/bench_conflicts.py [--shows 1000000]
+
+import argparse
+import datetime
+from common import db, Show, setup_database, seed_venues, seed_artists, seed_shows, timed
+import scheduling
+
+VENUES = 100
+ARTISTS = 10000
+TOUR_DATES = 50
+
+
+def unbounded(start_time, end_time, venue_id):
+    return db.session.query(*scheduling.CONFLICT_COLUMNS) \
+        .filter(Show.venue_id == venue_id, Show.start_time < end_time, Show.end_time > start_time) \
+        .order_by(Show.start_time).limit(10).all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    setup_database()
+    seed_venues(VENUES)
+    seed_artists(ARTISTS)
+    seed_shows(args.shows, list(range(1, VENUES + 1)), list(range(1, ARTISTS + 1)))
+
+    # A slot in the second half of the seeded year, where the unbounded
+    # query has the most earlier shows to walk past.
+    start_time = datetime.datetime.now() + datetime.timedelta(days=200)
+    end_time = scheduling.end_time_for(start_time, 120)
+    venue = lambda: scheduling.conflicts(start_time, end_time, venue_id=7)
+    both = lambda: scheduling.conflicts(start_time, end_time, venue_id=7, artist_id=7)
+    assert [row.id for row in unbounded(start_time, end_time, 7)] == [conflict['id'] for conflict in venue()]
+
+    print(f'{args.shows} shows, {args.shows // VENUES} per venue')
+    print(f"{'unbounded venue ms':>22} {timed(lambda: unbounded(start_time, end_time, 7), repeat=20):8.3f}")
+    print(f"{'bounded venue ms':>22} {timed(venue, repeat=20):8.3f}")
+    print(f"{'venue + artist ms':>22} {timed(both, repeat=20):8.3f}")
+
+    tour = [(index, index % VENUES + 1, 7, start_time + datetime.timedelta(days=index),
+             end_time + datetime.timedelta(days=index)) for index in range(TOUR_DATES)]
+    per_date = lambda: {key: found[0] for key, venue_id, artist_id, start, end in tour
+                        for found in [scheduling.conflicts(start, end, venue_id, artist_id, limit=1)] if found}
+    batch = lambda: scheduling.batch_conflicts(tour)
+    assert per_date().keys() == batch().keys()
+    print(f"{f'tour of {TOUR_DATES}, per date ms':>22} {timed(per_date, repeat=20):8.3f}")
+    print(f"{f'tour of {TOUR_DATES}, batch ms':>22} {timed(batch, repeat=20):8.3f}")
+
+
+if __name__ == '__main__':
+    main()
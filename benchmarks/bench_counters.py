@@ -0,0 +1,54 @@
+# Show counters: the top artists by upcoming shows computed from the show
+# table with a join and GROUP BY, against reading the maintained
+# upcoming_shows_count column through ix_artist_activity. Also times the
+# rollover job and a full recount.
+#
+#   python benchmarks/bench_counters.py
+
+import datetime
+from sqlalchemy import func
+from common import (db, Artist, Show, counters, setup_database, seed_venues,
+                    seed_artists, seed_shows, timed)
+
+ARTISTS = 10000
+SHOWS = 200000
+PAGE_SIZE = 50
+
+
+def aggregated_top(now):
+    return db.session.query(Artist.id, Artist.name, func.count(Show.id).label('upcoming')) \
+        .outerjoin(Show, (Show.artist_id == Artist.id) & (Show.start_time >= now)) \
+        .group_by(Artist.id, Artist.name) \
+        .order_by(func.count(Show.id).desc(), Artist.id.desc()) \
+        .limit(PAGE_SIZE).all()
+
+
+def counter_top():
+    return db.session.query(Artist.id, Artist.name, Artist.upcoming_shows_count) \
+        .order_by(Artist.upcoming_shows_count.desc(), Artist.id.desc()) \
+        .limit(PAGE_SIZE).all()
+
+
+def main():
+    setup_database()
+    seed_venues(1000)
+    seed_artists(ARTISTS)
+    seed_shows(SHOWS, list(range(1, 1001)), list(range(1, ARTISTS + 1)))
+    now = datetime.datetime.now()
+
+    assert [row[2] for row in aggregated_top(now)] == [row[2] for row in counter_top()]
+    print(f'{ARTISTS} artists, {SHOWS} shows, top {PAGE_SIZE} by upcoming shows')
+    print(f"{'join + group by ms':>20} {timed(lambda: aggregated_top(now)):10.1f}")
+    print(f"{'counter column ms':>20} {timed(counter_top):10.1f}")
+
+    # Each rollover picks up the artists whose next show started in the
+    # last hour; a full recount touches every row.
+    hour = datetime.timedelta(hours=1)
+    rollovers = [now + hour * (i + 1) for i in range(5)]
+    rolled = timed(lambda: counters.rollover(rollovers.pop(0)), repeat=5)
+    print(f"{'rollover (1h) ms':>20} {rolled:10.1f}")
+    print(f"{'full recount ms':>20} {timed(counters.rebuild, repeat=3):10.1f}")
+
+
+if __name__ == '__main__':
+    main()
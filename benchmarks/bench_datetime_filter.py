@@ -0,0 +1,35 @@
+# The `datetime` Jinja filter over 10k show start times: the previous
+# strftime -> dateutil parse -> babel.dates.format_datetime round trip
+# against filters.format_datetime() fed datetimes directly.
+#
+#   python benchmarks/bench_datetime_filter.py
+
+import datetime
+import babel.dates
+import dateutil.parser
+from common import timed
+from filters import format_datetime, DATETIME_FORMATS
+
+SHOWS = 10000
+
+
+def legacy_format_datetime(value, format='medium'):
+    date = dateutil.parser.parse(value)
+    return babel.dates.format_datetime(date, DATETIME_FORMATS.get(format, format))
+
+
+def main():
+    start = datetime.datetime(2021, 1, 1, 20, 30)
+    times = [start + datetime.timedelta(hours=7 * i) for i in range(SHOWS)]
+    strings = [t.strftime("%Y-%m-%d %H:%M:%S") for t in times]
+
+    for format in ('full', 'medium'):
+        legacy = [legacy_format_datetime(s, format) for s in strings]
+        assert legacy == [format_datetime(t, format) for t in times]
+        before = timed(lambda: [legacy_format_datetime(s, format) for s in strings], repeat=3)
+        after = timed(lambda: [format_datetime(t, format) for t in times], repeat=3)
+        print(f'{format:>6}: legacy {before:8.1f} ms  filter {after:8.1f} ms  ({before / after:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# Query count and request time of the venue and artist detail pages.
+#
+# A rendered page must stay at three queries (the version of the page, the
+# entity and its joined show list) however many shows it has, and a page
+# served from the page cache or answered with 304 at one; the script exits
+# non-zero if they don't.
+#
+#   python benchmarks/bench_detail_pages.py
+
+import sys
+from common import (app, db, Venue, Artist, setup_database, reset_database,
+                    seed_venues, seed_artists, seed_shows, timed)
+from instrumentation import QueryCounter
+
+SHOWS_PER_PAGE = [0, 10, 100, 1000]
+# Rendered, served from the page cache, revalidated with If-None-Match.
+EXPECTED_QUERIES = {'render': 3, 'cached': 1, '304': 1}
+
+
+def main():
+    setup_database()
+    client = app.test_client()
+    # Requests carrying a session cookie are never served from the page cache.
+    session_client = app.test_client()
+    session_client.set_cookie('localhost', app.session_cookie_name, 'x')
+    failures = 0
+    print(f"{'shows':>6} {'page':>8} {'path':>8} {'queries':>8} {'ms':>8}")
+    for shows in SHOWS_PER_PAGE:
+        reset_database()
+        seed_venues(1)
+        seed_artists(1)
+        venue_id = db.session.query(Venue.id).scalar()
+        artist_id = db.session.query(Artist.id).scalar()
+        if shows:
+            seed_shows(shows, [venue_id], [artist_id])
+        for page, url in (('venue', f'/venues/{venue_id}'), ('artist', f'/artists/{artist_id}')):
+            etag = client.get(url).headers['ETag']
+            requests = {
+                'render': lambda: session_client.get(url),
+                'cached': lambda: client.get(url),
+                '304': lambda: client.get(url, headers={'If-None-Match': etag}),
+            }
+            for path, request in requests.items():
+                with QueryCounter() as counter:
+                    response = request()
+                assert response.status_code == (304 if path == '304' else 200), url
+                print(f'{shows:>6} {page:>8} {path:>8} {counter.count:>8} {timed(request):>8.2f}')
+                if counter.count != EXPECTED_QUERIES[path]:
+                    failures += 1
+    if failures:
+        print(f'{failures} request(s) issued more queries than expected')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+# Peak Python memory and throughput of the streaming show export versus the
+# number of shows exported. Peak memory should stay flat as shows grow.
+#
+#   python benchmarks/bench_export.py
+
+import time
+import tracemalloc
+from common import (app, setup_database, reset_database, seed_venues,
+                    seed_artists, seed_shows)
+
+SIZES = [10000, 50000, 200000]
+
+
+def main():
+    setup_database()
+    client = app.test_client()
+    print(f"{'shows':>8} {'format':>6} {'MB out':>7} {'peak KB':>8} {'rows/s':>9}")
+    for size in SIZES:
+        reset_database()
+        seed_venues(100)
+        seed_artists(100)
+        seed_shows(size, list(range(1, 101)), list(range(1, 101)))
+        for format in ('csv', 'jsonl', 'ics'):
+            tracemalloc.start()
+            start = time.perf_counter()
+            response = client.get(f'/shows/export.{format}', buffered=False)
+            written = sum(len(chunk) for chunk in response.response)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'{size:>8} {format:>6} {written / 2**20:>7.1f} {peak / 1024:>8.0f} {size / elapsed:>9.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# Genres at --artists artists: per-genre counts read from the genre table
+# against aggregating the genres of every row, a /artists page filtered by
+# genre, and the genre count updates of one write against recounting.
+#
+#   python benchmarks/bench_genres.py [--artists 100000]
+
+import argparse
+from sqlalchemy import func, literal_column
+from common import app, db, Artist, setup_database, seed_artists, timed
+from models import sort_text
+import genres
+import pagination
+
+NAME_KEYS = [(sort_text(Artist.name), False), (Artist.id, False)]
+
+
+def aggregated_counts():
+    # The genres of every row, unnested and grouped (json_each on SQLite).
+    if db.engine.dialect.name == 'sqlite':
+        values = func.json_each(Artist.genres).alias('genre_values')
+        name = literal_column('genre_values.value')
+        return db.session.query(name, func.count(func.distinct(Artist.id))) \
+            .select_from(Artist).join(values, literal_column('1') == 1) \
+            .group_by(name).order_by(name).all()
+    name = func.unnest(Artist.genres)
+    return db.session.query(name.label('name'), func.count()).group_by('name').order_by('name').all()
+
+
+def genre_page(genre):
+    query = db.session.query(Artist.id, Artist.name).filter(genres.has_genre(Artist.genres, genre))
+    return pagination.keyset_page(query, NAME_KEYS, None, app.config['PAGE_SIZE']).items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--artists', type=int, default=100000)
+    args = parser.parse_args()
+
+    setup_database()
+    seed_artists(args.artists)
+    genres.refresh([Artist])
+    assert [tuple(row) for row in aggregated_counts()] == [tuple(row) for row in genres.counts(Artist)]
+
+    print(f'{args.artists} artists')
+    print(f"{'aggregated counts ms':>22} {timed(aggregated_counts):8.2f}")
+    print(f"{'genre table ms':>22} {timed(lambda: genres.counts(Artist)):8.2f}")
+    print(f"{'genre page ms':>22} {timed(lambda: genre_page('Jazz')):8.2f}")
+    print(f"{'recount 2 genres ms':>22} {timed(lambda: genres.refresh([Artist], ['Jazz', 'Soul'])):8.2f}")
+    print(f"{'adjust 2 genres ms':>22} {timed(lambda: genres.adjust(Artist, ['Jazz'], ['Soul'])):8.2f}")
+
+
+if __name__ == '__main__':
+    main()
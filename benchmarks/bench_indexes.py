@@ -0,0 +1,84 @@
+# EXPLAIN plans and timings of the show hot paths with and without the
+# indexes added in migration c41e7a5d2f90.
+#
+#   python benchmarks/bench_indexes.py [--shows 500000]
+
+import argparse
+import datetime
+from sqlalchemy import text
+from common import (db, Venue, Artist, Show, setup_database, seed_venues,
+                    seed_artists, seed_shows, timed)
+
+HOT_PATH_INDEXES = [
+    'ix_show_venue_id_start_time', 'ix_show_artist_id_start_time',
+    'ix_show_start_time_id', 'ix_venue_listed_at', 'ix_artist_listed_at',
+]
+
+
+def hot_path_queries():
+    now = datetime.datetime.now()
+    return {
+        'venue detail shows': db.session.query(Show.artist_id, Artist.name, Show.start_time)
+            .join(Artist, Show.artist_id == Artist.id)
+            .filter(Show.venue_id == 7).order_by(Show.start_time),
+        'artist detail shows': db.session.query(Show.venue_id, Venue.name, Show.start_time)
+            .join(Venue, Show.venue_id == Venue.id)
+            .filter(Show.artist_id == 7).order_by(Show.start_time),
+        'upcoming at venue': db.session.query(Show.id)
+            .filter(Show.venue_id == 7, Show.start_time > now),
+        '/shows first page': db.session.query(Show.id, Show.start_time)
+            .order_by(Show.start_time.desc(), Show.id.desc()).limit(50),
+        'recent venues': db.session.query(Venue.id, Venue.name)
+            .order_by(Venue.listed_at.desc()).limit(10),
+        'recent artists': db.session.query(Artist.id, Artist.name)
+            .order_by(Artist.listed_at.desc()).limit(10),
+    }
+
+
+def explain(query):
+    statement = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    prefix = 'EXPLAIN QUERY PLAN' if db.engine.dialect.name == 'sqlite' else 'EXPLAIN'
+    rows = db.session.execute(text(f'{prefix} {statement}')).fetchall()
+    return [str(row[-1]) for row in rows]
+
+
+def indexes():
+    tables = [Venue.__table__, Artist.__table__, Show.__table__]
+    return [index for table in tables for index in table.indexes
+            if index.name in HOT_PATH_INDEXES]
+
+
+def report(label):
+    print(f'== {label}')
+    for name, query in hot_path_queries().items():
+        elapsed = timed(query.all)
+        print(f'{name:<22} {elapsed:>8.2f} ms')
+        for line in explain(query):
+            print(f'    {line}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--venues', type=int, default=2000)
+    parser.add_argument('--artists', type=int, default=5000)
+    parser.add_argument('--shows', type=int, default=300000)
+    args = parser.parse_args()
+
+    setup_database()
+    seed_venues(args.venues)
+    seed_artists(args.artists)
+    seed_shows(args.shows, list(range(1, args.venues + 1)), list(range(1, args.artists + 1)))
+
+    for index in indexes():
+        index.drop(db.engine)
+    db.session.execute(text('ANALYZE'))
+    report('without indexes')
+
+    for index in indexes():
+        index.create(db.engine)
+    db.session.execute(text('ANALYZE'))
+    report('with indexes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+# Page fetch time versus depth for /shows: OFFSET paging against the keyset
+# cursors used by pagination.keyset_page().
+#
+#   python benchmarks/bench_pagination.py
+
+from common import (db, Show, setup_database, seed_venues, seed_artists,
+                    seed_shows, timed)
+from pagination import keyset_page
+
+SHOWS = 200000
+PAGE_SIZE = 50
+DEPTHS = [0, 100, 1000, 3000]
+KEYS = [(Show.start_time, True), (Show.id, True)]
+
+
+def offset_page(page):
+    return db.session.query(Show.id, Show.start_time) \
+        .order_by(Show.start_time.desc(), Show.id.desc()) \
+        .offset(page * PAGE_SIZE).limit(PAGE_SIZE).all()
+
+
+def main():
+    setup_database()
+    seed_venues(100)
+    seed_artists(100)
+    seed_shows(SHOWS, list(range(1, 101)), list(range(1, 101)))
+    query = db.session.query(Show.id, Show.start_time)
+    print(f"{'page':>6} {'offset ms':>10} {'keyset ms':>10}")
+    for depth in DEPTHS:
+        last = offset_page(depth - 1)[-1] if depth else None
+        cursor = ([last.start_time, last.id], 'next') if last else None
+        offset = timed(lambda: offset_page(depth))
+        keyset = timed(lambda: keyset_page(query, KEYS, cursor, PAGE_SIZE))
+        print(f'{depth:>6} {offset:>10.2f} {keyset:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+# Per-route micro-benchmarks: every page and API read, served through the
+# Flask test client from data made by seed.py, with p50/p95/p99 and maximum
+# latency and the number of queries per request. Routes with no case below
+# are listed so new ones get one.
+#
+#   python benchmarks/bench_routes.py [--venues 2000] [--artists 5000] [--shows 50000]
+#                                     [--repeat 50] [--page-cache]
+#                                     [--save baseline.json] [--compare baseline.json]
+#
+# --save writes the p50 of each route; --compare exits non-zero when a route's
+# p50 grew by more than --tolerance times (and --min-ms) over that baseline.
+# The page cache is off unless --page-cache, so the detail pages are timed
+# rendering.
+
+import argparse
+import datetime
+import json
+import sys
+import time
+from common import app, db, Venue, Artist, Show, setup_database
+from instrumentation import QueryCounter
+from stats import summary
+import seed
+
+# (name, method, path, form data); the path is formatted with sample().
+CASES = [
+    ('home', 'GET', '/', None),
+    ('venues', 'GET', '/venues', None),
+    ('venues area', 'GET', '/venues?city={city}&state={state}', None),
+    ('venues genre', 'GET', '/venues?genre={genre}', None),
+    ('venue', 'GET', '/venues/{venue}', None),
+    ('venue edit form', 'GET', '/venues/{venue}/edit', None),
+    ('venue create form', 'GET', '/venues/create', None),
+    ('venue search', 'POST', '/venues/search', {'search_term': 'hall'}),
+    ('artists', 'GET', '/artists', None),
+    ('artists genre', 'GET', '/artists?genre={genre}', None),
+    ('artist', 'GET', '/artists/{artist}', None),
+    ('artist edit form', 'GET', '/artists/{artist}/edit', None),
+    ('artist create form', 'GET', '/artists/create', None),
+    ('artist search', 'POST', '/artists/search', {'search_term': 'wolves'}),
+    ('shows', 'GET', '/shows', None),
+    ('show create form', 'GET', '/shows/create', None),
+    ('tour create form', 'GET', '/shows/tour', None),
+    ('cache stats', 'GET', '/cache/stats', None),
+    ('api venues', 'GET', '/api/v1/venues', None),
+    ('api venues activity', 'GET', '/api/v1/venues?sort=activity', None),
+    ('api venue', 'GET', '/api/v1/venues/{venue}', None),
+    ('api venue autocomplete', 'GET', '/api/v1/venues/autocomplete?q={venue_prefix}', None),
+    ('api artists', 'GET', '/api/v1/artists?genre={genre}', None),
+    ('api artist', 'GET', '/api/v1/artists/{artist}', None),
+    ('api artist autocomplete', 'GET', '/api/v1/artists/autocomplete?q={artist_prefix}', None),
+    ('api available', 'GET', '/api/v1/artists/available?start_time={start}&genre={genre}', None),
+    ('api shows', 'GET', '/api/v1/shows', None),
+    ('api show', 'GET', '/api/v1/shows/{show}', None),
+    ('api conflicts', 'GET', '/api/v1/shows/conflicts?venue_id={venue}&artist_id={artist}&start_time={start}', None),
+    ('api genres', 'GET', '/api/v1/genres', None),
+]
+# Not application pages, or timed by bench_export.py: a full export takes
+# seconds at these sizes.
+SKIPPED_ENDPOINTS = {'static', 'assets', 'metrics', 'export.export_shows'}
+
+
+def sample():
+    # The busiest venue and artist (the largest detail pages) and the first
+    # letters of their names, a show, the busiest area and genre and a
+    # Saturday evening two weeks ahead.
+    venue = Venue.query.order_by(Venue.upcoming_shows_count.desc(), Venue.id).first()
+    artist = Artist.query.order_by(Artist.upcoming_shows_count.desc(), Artist.id).first()
+    day = datetime.date.today() + datetime.timedelta(days=14)
+    day += datetime.timedelta(days=(5 - day.weekday()) % 7)
+    return {
+        'venue': venue.id,
+        'artist': artist.id,
+        'venue_prefix': venue.name[:3],
+        'artist_prefix': artist.name[:3],
+        'show': db.session.query(Show.id).order_by(Show.id).first()[0],
+        'city': venue.city,
+        'state': venue.state,
+        'genre': venue.genres[0],
+        'start': f'{day.isoformat()}T20:00:00',
+    }
+
+
+def uncovered(paths):
+    adapter = app.url_map.bind('localhost')
+    covered = {adapter.match(path.split('?')[0], method)[0] for method, path in paths}
+    return sorted(rule.rule for rule in app.url_map.iter_rules()
+                  if rule.endpoint not in covered | SKIPPED_ENDPOINTS
+                  and 'GET' in rule.methods and not rule.rule.endswith('/delete'))
+
+
+def run(client, method, path, data):
+    response = client.open(path, method=method, data=data)
+    response.get_data()
+    response.close()
+    return response.status_code
+
+
+def measure(client, method, path, data, repeat):
+    run(client, method, path, data)
+    with QueryCounter() as queries:
+        status = run(client, method, path, data)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(client, method, path, data)
+        samples.append((time.perf_counter() - start) * 1000)
+    return status, queries.count, summary(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--venues', type=int, default=2000)
+    parser.add_argument('--artists', type=int, default=5000)
+    parser.add_argument('--shows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--page-cache', action='store_true')
+    parser.add_argument('--save')
+    parser.add_argument('--compare')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    parser.add_argument('--min-ms', type=float, default=1.0)
+    args = parser.parse_args()
+
+    setup_database()
+    seed.seed(args.venues, args.artists, args.shows)
+    if not args.page_cache:
+        app.config['PAGE_CACHE_TTL'] = 0
+    values = sample()
+    client = app.test_client()
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print(f'{args.venues} venues, {args.artists} artists, {args.shows} shows, {args.repeat} runs')
+    print(f"{'route':>24} {'status':>6} {'queries':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    results = {}
+    regressions = []
+    for name, method, path, data in CASES:
+        status, queries, percentiles, slowest = measure(client, method, path.format(**values), data, args.repeat)
+        results[name] = percentiles['p50']
+        flag = ''
+        if name in baseline and percentiles['p50'] > max(baseline[name] * args.tolerance,
+                                                         baseline[name] + args.min_ms):
+            regressions.append(name)
+            flag = f'  regressed from {baseline[name]:.2f}'
+        print(f"{name:>24} {status:6d} {queries:7d} {percentiles['p50']:8.2f} {percentiles['p95']:8.2f} "
+              f"{percentiles['p99']:8.2f} {slowest:8.2f}{flag}")
+
+    missing = uncovered([(method, path.format(**values)) for _, method, path, _ in CASES])
+    if missing:
+        print('No case for: ' + ', '.join(missing))
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if regressions:
+        print(f'Regressed: {", ".join(regressions)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+# Search latency versus catalogue size.
+#
+# Times search.search() on the path the planner picks for the configured
+# database (the n-gram index on SQLite, pg_trgm on Postgres) against the
+# previous unindexed ILIKE scan over name, city and state.
+#
+#   python benchmarks/bench_search.py
+
+from common import db, Venue, setup_database, reset_database, seed_venues, timed
+import search
+
+SIZES = [1000, 10000, 50000, 100000]
+TERMS = ['venue 12', 'san', 'ny', 'portland', 'nomatch']
+
+
+def ilike_scan(term):
+    pattern = f'%{term}%'
+    return db.session.query(Venue.id, Venue.name, Venue.city, Venue.state) \
+        .filter(Venue.name.ilike(pattern) | Venue.city.ilike(pattern) | Venue.state.ilike(pattern)) \
+        .all()
+
+
+def main():
+    setup_database()
+    print(f"planner path: {search.plan()}")
+    print(f"{'venues':>8} {'term':>10} {'ilike ms':>9} {'search ms':>10} {'hits':>5}")
+    for size in SIZES:
+        reset_database()
+        search.invalidate(Venue)
+        seed_venues(size)
+        search.search(Venue, 'warm up')
+        for term in TERMS:
+            scan = timed(lambda: ilike_scan(term))
+            indexed = timed(lambda: search.search(Venue, term))
+            hits = len(search.search(Venue, term))
+            print(f'{size:>8} {term:>10} {scan:>9.2f} {indexed:>10.2f} {hits:>5}')
+
+
+if __name__ == '__main__':
+    main()
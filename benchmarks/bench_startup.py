@@ -0,0 +1,49 @@
+# Worker boot cost: time to import the app module, to build an app with
+# create_app() and to serve the first request, each in a fresh interpreter.
+# Also lists which heavy libraries a booted web worker has loaded.
+#
+#   python benchmarks/bench_startup.py
+
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RUNS = 7
+HEAVY = ['alembic', 'flask_migrate', 'flask_script', 'babel', 'dateutil']
+
+PROBE = '''
+import sys, time, warnings
+warnings.simplefilter('ignore')
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app('testing')
+created = time.perf_counter()
+from extensions import db
+with application.app_context():
+    db.create_all()
+application.test_client().get('/venues')
+served = time.perf_counter()
+print(imported - start, created - imported, served - created)
+print(','.join(name for name in %r if name in sys.modules))
+''' % (HEAVY,)
+
+
+def run():
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout.splitlines()
+    return [float(value) * 1000 for value in output[0].split()], output[1]
+
+
+def main():
+    samples = [run() for _ in range(RUNS)]
+    print(f"{'phase':>14} {'median ms':>10}")
+    for index, phase in enumerate(['import app', 'create_app()', 'first request']):
+        print(f'{phase:>14} {statistics.median(times[index] for times, _ in samples):10.1f}')
+    print(f'loaded after first request: {samples[-1][1] or "none of " + ", ".join(HEAVY)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# The venue directory at 100k venues: a /venues page read from the
+# venue_area summary against paging and grouping the venue table itself
+# (the previous venues() data path), plus the cost of keeping the summary
+# in sync: refreshing one area after a write and a full rebuild. Also
+# times the per-area page and GET /venues with a few very large areas.
+#
+#   python benchmarks/bench_venue_areas.py [--venues 100000] [--cities 5000]
+
+import argparse
+import datetime
+from common import app, db, Venue, areas, setup_database, reset_database, timed
+from models import VenueArea, sort_text
+import pagination
+
+VENUE_KEYS = [
+    (sort_text(Venue.city), True),
+    (sort_text(Venue.state), False),
+    (Venue.id, False)
+]
+
+
+def seed(venues, cities):
+    now = datetime.datetime.now()
+    for start in range(0, venues, 10000):
+        db.session.execute(Venue.__table__.insert(), [{
+            'name': f'Venue {i}',
+            'city': f'City {i % cities}',
+            'state': 'CA' if i % 2 else 'NY',
+            'genres': ['Jazz'],
+            'seeking_talent': False,
+            'listed_at': now,
+        } for i in range(start, min(start + 10000, venues))])
+    db.session.commit()
+
+
+def venue_table_page(limit):
+    query = db.session.query(Venue.id, Venue.name, Venue.city, Venue.state, Venue.upcoming_shows_count)
+    return areas.group_venues_by_area(pagination.keyset_page(query, VENUE_KEYS, None, limit).items)
+
+
+def summary_page(limit):
+    query = db.session.query(VenueArea.city, VenueArea.state, VenueArea.venue_count, VenueArea.venues)
+    return pagination.keyset_page(query, areas.AREA_DIRECTORY_KEYS, None, limit).items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--venues', type=int, default=100000)
+    parser.add_argument('--cities', type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_database()
+    seed(args.venues, args.cities)
+    rebuild = timed(areas.rebuild, repeat=3)
+    page_size = app.config['PAGE_SIZE']
+    client = app.test_client()
+
+    # The previous page was 50 venues (a handful of areas); a summary page
+    # is 50 whole areas.
+    print(f'{args.venues} venues in {VenueArea.query.count()} areas')
+    print(f"{'venue table page ms':>24} {timed(lambda: venue_table_page(page_size)):8.2f}"
+          f"  ({len(venue_table_page(page_size))} areas)")
+    print(f"{'summary page ms':>24} {timed(lambda: summary_page(page_size)):8.2f}"
+          f"  ({len(summary_page(page_size))} areas)")
+    print(f"{'GET /venues ms':>24} {timed(lambda: client.get('/venues')):8.2f}")
+    print(f"{'refresh one area ms':>24} {timed(lambda: areas.refresh([('City 7', 'CA')])):8.2f}")
+    print(f"{'full rebuild ms':>24} {rebuild:8.2f}")
+
+    reset_database()
+    seed(args.venues, 5)
+    areas.rebuild()
+    print(f'{args.venues} venues in {VenueArea.query.count()} areas')
+    print(f"{'GET /venues ms':>24} {timed(lambda: client.get('/venues')):8.2f}")
+    print(f"{'GET one area page ms':>24} "
+          f"{timed(lambda: client.get('/venues?city=City+3&state=CA')):8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# Request time of GET /venues versus the number of venues.
+#
+# Compares the single ordered query + linear grouping that builds the
+# venue_area summary (areas.py) with the previous data path (two full
+# queries and an areas x venues scan). bench_venue_areas.py covers the
+# summary reads at 100k venues.
+#
+#   python benchmarks/bench_venues.py
+
+from common import app, db, Venue, setup_database, reset_database, seed_venues, timed
+from areas import group_venues_by_area
+
+SIZES = [100, 1000, 5000, 10000, 25000]
+
+
+def legacy_areas():
+    data = []
+    venues = Venue.query.all()
+    for area in db.session.query(Venue.city, Venue.state).distinct().all():
+        data.append({
+            'city': area.city,
+            'state': area.state,
+            'venues': [{'id': venue.id, 'name': venue.name}
+                       for venue in venues
+                       if venue.city == area.city and venue.state == area.state]
+        })
+    return data
+
+
+def grouped_areas():
+    rows = db.session.query(Venue.id, Venue.name, Venue.city, Venue.state, Venue.upcoming_shows_count) \
+        .order_by(Venue.city.desc(), Venue.state, Venue.id).all()
+    return group_venues_by_area(rows)
+
+
+def main():
+    setup_database()
+    client = app.test_client()
+    print(f"{'venues':>8} {'legacy ms':>10} {'grouped ms':>11} {'GET /venues ms':>15}")
+    for size in SIZES:
+        reset_database()
+        seed_venues(size)
+        legacy = timed(lambda: (legacy_areas(), db.session.expunge_all()))
+        grouped = timed(grouped_areas)
+        request = timed(lambda: client.get('/venues'))
+        print(f'{size:>8} {legacy:>10.1f} {grouped:>11.1f} {request:>15.1f}')
+
+
+if __name__ == '__main__':
+    main()
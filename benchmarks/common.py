@@ -0,0 +1,104 @@
+# Shared setup for the benchmark scripts in this folder.
+#
+# The scripts run against an in-memory SQLite database by default so they can
+# be run anywhere; set BENCH_DATABASE_URI to point them at a local Postgres.
+
+import os
+import sys
+import time
+import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app import create_app
+from extensions import db
+from models import Venue, Artist, Show
+import counters
+import areas
+
+app = create_app('testing')
+
+CITIES = [
+    ('San Francisco', 'CA'), ('Los Angeles', 'CA'), ('New York', 'NY'),
+    ('Brooklyn', 'NY'), ('Austin', 'TX'), ('Seattle', 'WA'),
+    ('Chicago', 'IL'), ('Nashville', 'TN'), ('Denver', 'CO'),
+    ('Portland', 'OR'), ('Atlanta', 'GA'), ('Boston', 'MA'),
+]
+GENRES = ['Alternative', 'Blues', 'Classical', 'Country', 'Electronic',
+          'Folk', 'Hip-Hop', 'Jazz', 'Pop', 'Rock n Roll', 'Soul']
+
+
+def setup_database():
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+        'BENCH_DATABASE_URI', 'sqlite://')
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['TESTING'] = True
+    ctx = app.app_context()
+    ctx.push()
+    db.drop_all()
+    db.create_all()
+    return ctx
+
+
+def reset_database():
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+
+def seed_venues(count):
+    now = datetime.datetime.now()
+    db.session.execute(Venue.__table__.insert(), [{
+        'name': f'Venue {i}',
+        'city': CITIES[i % len(CITIES)][0],
+        'state': CITIES[i % len(CITIES)][1],
+        'genres': [GENRES[i % len(GENRES)]],
+        'seeking_talent': False,
+        'listed_at': now,
+    } for i in range(count)])
+    db.session.commit()
+    areas.rebuild()
+
+
+def seed_artists(count):
+    now = datetime.datetime.now()
+    db.session.execute(Artist.__table__.insert(), [{
+        'name': f'Artist {i}',
+        'city': CITIES[i % len(CITIES)][0],
+        'state': CITIES[i % len(CITIES)][1],
+        'genres': [GENRES[i % len(GENRES)]],
+        'seeking_venue': False,
+        'listed_at': now,
+        'lists_available': False,
+        'available_from': now - datetime.timedelta(days=365),
+        'available_to': now + datetime.timedelta(days=365),
+    } for i in range(count)])
+    db.session.commit()
+
+
+def seed_shows(count, venue_ids, artist_ids):
+    # Spread shows a year either side of now so detail pages have both
+    # past and upcoming shows.
+    now = datetime.datetime.now()
+    starts = [now + datetime.timedelta(hours=(i * 7) % 17520 - 8760) for i in range(count)]
+    db.session.execute(Show.__table__.insert(), [{
+        'venue_id': venue_ids[i % len(venue_ids)],
+        'artist_id': artist_ids[i % len(artist_ids)],
+        'start_time': starts[i],
+        'end_time': starts[i] + datetime.timedelta(hours=2),
+    } for i in range(count)])
+    db.session.commit()
+    counters.rebuild()
+
+
+def timed(func, repeat=5):
+    # Best of `repeat` runs, in milliseconds.
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
@@ -0,0 +1,173 @@
+# Load test against a running server: --concurrency clients, each on its own
+# keep-alive connection, send a weighted mix of page and API reads for
+# --duration seconds, then the p50/p95/p99 latency, throughput and errors
+# of every route are reported. Venue, artist and show ids are picked from
+# the server's own API, so seed it first, e.g.
+#
+#   BENCH_DATABASE_URI=postgresql://localhost/fyyur_bench python benchmarks/seed.py
+#   DATABASE_URL=postgresql://localhost/fyyur_bench gunicorn -w 4 'app:create_app()'
+#   python benchmarks/load.py --url http://127.0.0.1:8000 [--concurrency 20] [--duration 30]
+#
+# Uses only asyncio and does not import the app. --max-p95 MS exits non-zero
+# when a route's p95 is over MS, so a run can gate a deploy.
+
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import sys
+import time
+import urllib.parse
+from collections import defaultdict
+from stats import summary
+
+# (weight, route, path); paths are formatted with ids picked per request.
+MIX = [
+    (10, 'home', '/'),
+    (12, 'venues', '/venues'),
+    (6, 'venues genre', '/venues?genre={genre}'),
+    (20, 'venue', '/venues/{venue}'),
+    (12, 'artists', '/artists'),
+    (20, 'artist', '/artists/{artist}'),
+    (8, 'shows', '/shows'),
+    (4, 'api venues', '/api/v1/venues'),
+    (4, 'api artist', '/api/v1/artists/{artist}'),
+    (2, 'api available', '/api/v1/artists/available?start_time={start}'),
+    (2, 'api conflicts', '/api/v1/shows/conflicts?venue_id={venue}&artist_id={artist}&start_time={start}'),
+]
+GENRES = ['Jazz', 'Rock n Roll', 'Folk', 'Blues', 'Pop']
+
+
+class Connection(object):
+    # A minimal HTTP client: GET, Content-Length, chunked or read-to-close
+    # bodies, keeping the connection open when the server allows it (the
+    # Werkzeug development server speaks HTTP/1.0 and closes each one).
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f'GET {path} HTTP/1.1\r\nHost: {self.host}\r\n'
+                          f'Accept-Encoding: identity\r\n\r\n'.encode())
+        await self.writer.drain()
+        version, status = (await self.reader.readline()).split()[:2]
+        headers = {}
+        while True:
+            line = (await self.reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.lower()] = value.strip()
+        if headers.get('transfer-encoding') == 'chunked':
+            body = b''
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                body += await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self.reader.read()
+        keep_alive = headers.get('connection', '').lower()
+        if keep_alive == 'close' or (version == b'HTTP/1.0' and keep_alive != 'keep-alive'):
+            self.close()
+        return int(status), body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def discover(connection):
+    # A few hundred venue, artist and show ids from the API.
+    ids = {}
+    for kind in ('venues', 'artists', 'shows'):
+        status, body = await connection.get(f'/api/v1/{kind}?limit=200&fields=id')
+        if status != 200:
+            raise SystemExit(f'GET /api/v1/{kind}: {status}')
+        ids[kind] = [row['id'] for row in json.loads(body)['data']]
+        if not ids[kind]:
+            raise SystemExit(f'No {kind} to request; seed the database first')
+    return ids
+
+
+def paths(ids, rng):
+    weights = [weight for weight, _, _ in MIX]
+    day = datetime.date.today() + datetime.timedelta(days=rng.randint(1, 90))
+    while True:
+        _, route, path = rng.choices(MIX, weights)[0]
+        yield route, path.format(venue=rng.choice(ids['venues']), artist=rng.choice(ids['artists']),
+                                 genre=urllib.parse.quote(rng.choice(GENRES)),
+                                 start=f'{day.isoformat()}T20:00:00')
+
+
+async def client(host, port, requests, deadline, results, errors):
+    connection = Connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            route, path = next(requests)
+            start = time.perf_counter()
+            try:
+                status, _ = await connection.get(path)
+            except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                connection.close()
+                errors[route] += 1
+                continue
+            results[route].append((time.perf_counter() - start) * 1000)
+            if status >= 400:
+                errors[route] += 1
+    finally:
+        connection.close()
+
+
+async def load(url, concurrency, duration, seed):
+    parts = urllib.parse.urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    probe = Connection(host, port)
+    ids = await discover(probe)
+    probe.close()
+    requests = paths(ids, random.Random(seed))
+    results, errors = defaultdict(list), defaultdict(int)
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(client(host, port, requests, deadline, results, errors)
+                           for _ in range(concurrency)))
+    return results, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-p95', type=float)
+    args = parser.parse_args()
+
+    results, errors = asyncio.run(load(args.url, args.concurrency, args.duration, args.seed))
+    print(f'{args.concurrency} clients for {args.duration:g} s against {args.url}')
+    print(f"{'route':>16} {'requests':>8} {'errors':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    slow = []
+    for route in [route for _, route, _ in MIX] + ['all']:
+        samples = sum(results.values(), []) if route == 'all' else results.get(route, [])
+        failed = sum(errors.values()) if route == 'all' else errors.get(route, 0)
+        if not samples:
+            continue
+        percentiles = summary(samples)
+        print(f"{route:>16} {len(samples):8d} {failed:6d} {len(samples) / args.duration:7.1f} "
+              f"{percentiles['p50']:8.2f} {percentiles['p95']:8.2f} {percentiles['p99']:8.2f}")
+        if route != 'all' and args.max_p95 is not None and percentiles['p95'] > args.max_p95:
+            slow.append(route)
+    if slow:
+        print(f'p95 over {args.max_p95:g} ms: {", ".join(slow)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+# Synthetic data with realistic distributions, for the route benchmarks and
+# load tests:
+#   - a few big cities hold most venues and artists (Zipf over CITIES) and a
+#     long tail of small towns the rest,
+#   - one to three genres each, popular genres far more common,
+#   - shows from a year back to six months ahead, mostly on Thursday to
+#     Saturday evenings, 1 to 4 hours long, concentrated on popular venues
+#     and artists, and never double booking a venue or an artist,
+#   - some artists listing an availability window.
+# The same --seed gives the same data on the same day.
+#
+#   python benchmarks/seed.py [--venues 2000] [--artists 5000] [--shows 50000]
+#
+# Recreates the tables of BENCH_DATABASE_URI (an in-memory SQLite database by
+# default, so point it at a Postgres to seed one for load.py).
+
+import argparse
+import datetime
+import itertools
+import random
+import time
+from common import app, db, Venue, Artist, Show, CITIES, setup_database, counters, areas
+import genres
+
+SMALL_TOWNS = 300
+SMALL_TOWN_SHARE = 0.2
+STATES = ['AL', 'AZ', 'CA', 'CO', 'FL', 'GA', 'IL', 'MA', 'MI', 'MN', 'NC', 'NY',
+          'OH', 'OR', 'PA', 'TN', 'TX', 'VA', 'WA', 'WI']
+
+VENUE_WORDS = (['The', 'Old', 'Blue', 'Velvet', 'Golden', 'Rusty', 'Electric', 'Little', 'Grand', 'Black'],
+               ['Room', 'Hall', 'Lounge', 'Tavern', 'Theatre', 'Cellar', 'Garage', 'Ballroom', 'Bar', 'Club'])
+ARTIST_WORDS = (['Midnight', 'Silver', 'Wild', 'Lonesome', 'Neon', 'Paper', 'Broken', 'Crimson', 'Quiet', 'Young'],
+                ['Wolves', 'Rivers', 'Hearts', 'Echoes', 'Machines', 'Saints', 'Lanterns', 'Sparrows', 'Kings', 'Tides'])
+
+BATCH_SIZE = 5000
+# Weekday weights, Monday first, and start hours.
+WEEKDAY_WEIGHTS = [1, 1, 2, 4, 6, 7, 3]
+START_HOURS = [18, 19, 20, 21, 22]
+DURATIONS = [60, 90, 120, 150, 180, 240]
+
+
+def zipf_weights(count, exponent=1.1):
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+class Seeder(object):
+
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        self.today = datetime.datetime.combine(datetime.date.today(), datetime.time())
+        self.towns = [(f'{self._word(VENUE_WORDS[1])}ville {n}', self.random.choice(STATES))
+                      for n in range(SMALL_TOWNS)]
+        self.city_weights = zipf_weights(len(CITIES))
+        self.genre_weights = zipf_weights(len(genres.GENRES), 0.9)
+
+    def _word(self, words):
+        return self.random.choice(words)
+
+    def _area(self):
+        if self.random.random() < SMALL_TOWN_SHARE:
+            return self.random.choice(self.towns)
+        return self.random.choices(CITIES, self.city_weights)[0]
+
+    def _genres(self):
+        picked = set(self.random.choices(genres.GENRES, self.genre_weights, k=self.random.randint(1, 3)))
+        return sorted(picked)
+
+    def _contact(self, name):
+        slug = ''.join(c for c in name.lower() if c.isalnum())
+        return {
+            'phone': f'{self.random.randint(200, 999)}-{self.random.randint(200, 999)}-'
+                     f'{self.random.randint(1000, 9999)}',
+            'website': f'https://www.{slug}.com',
+            'facebook_link': f'https://www.facebook.com/{slug}',
+            'image_link': f'https://images.example.com/{slug}.jpg',
+        }
+
+    def venues(self, count):
+        for i in range(count):
+            name = f'{self._word(VENUE_WORDS[0])} {self._word(VENUE_WORDS[1])} {i}'
+            city, state = self._area()
+            seeking = self.random.random() < 0.3
+            yield dict(self._contact(name), **{
+                'name': name,
+                'city': city,
+                'state': state,
+                'address': f'{self.random.randint(1, 9999)} {self._word(ARTIST_WORDS[0])} St',
+                'genres': self._genres(),
+                'seeking_talent': seeking,
+                'seeking_description': 'Looking for local acts' if seeking else None,
+                'listed_at': self.today - datetime.timedelta(days=self.random.randint(0, 730)),
+            })
+
+    def artists(self, count):
+        for i in range(count):
+            name = f'{self._word(ARTIST_WORDS[0])} {self._word(ARTIST_WORDS[1])} {i}'
+            city, state = self._area()
+            seeking = self.random.random() < 0.4
+            lists_available = self.random.random() < 0.25
+            available_from = self.today + datetime.timedelta(days=self.random.randint(-30, 60))
+            yield dict(self._contact(name), **{
+                'name': name,
+                'city': city,
+                'state': state,
+                'genres': self._genres(),
+                'seeking_venue': seeking,
+                'seeking_description': 'Touring this season' if seeking else None,
+                'listed_at': self.today - datetime.timedelta(days=self.random.randint(0, 730)),
+                'lists_available': lists_available,
+                'available_from': available_from,
+                'available_to': available_from + datetime.timedelta(days=self.random.randint(7, 120)),
+            })
+
+    def _start_time(self):
+        # A day from a year back to six months ahead, weighted by weekday.
+        while True:
+            day = self.today + datetime.timedelta(days=self.random.randint(-365, 182))
+            if self.random.random() * max(WEEKDAY_WEIGHTS) < WEEKDAY_WEIGHTS[day.weekday()]:
+                break
+        return day + datetime.timedelta(hours=self.random.choice(START_HOURS),
+                                        minutes=self.random.choice([0, 30]))
+
+    def shows(self, count, venue_ids, artist_ids, attempts=20):
+        # Booked [start, end) ranges per venue or artist and day. Shows start
+        # in the evening and end by the next morning, so only shows starting
+        # the same day can overlap.
+        booked = {}
+        venue_weights = list(itertools.accumulate(zipf_weights(len(venue_ids), 0.8)))
+        artist_weights = list(itertools.accumulate(zipf_weights(len(artist_ids), 0.8)))
+
+        def free(key, start, end):
+            return all(end <= other_start or other_end <= start
+                       for other_start, other_end in booked.get((key, start.date()), ()))
+
+        for _ in range(count):
+            for _ in range(attempts):
+                venue_id = self.random.choices(venue_ids, cum_weights=venue_weights)[0]
+                artist_id = self.random.choices(artist_ids, cum_weights=artist_weights)[0]
+                start = self._start_time()
+                end = start + datetime.timedelta(minutes=self.random.choice(DURATIONS))
+                if free(('venue', venue_id), start, end) and free(('artist', artist_id), start, end):
+                    break
+            else:
+                continue
+            for key in (('venue', venue_id), ('artist', artist_id)):
+                booked.setdefault((key, start.date()), []).append((start, end))
+            yield {'venue_id': venue_id, 'artist_id': artist_id, 'start_time': start, 'end_time': end}
+
+
+def _insert(model, rows):
+    for batch in iter(lambda: list(itertools.islice(rows, BATCH_SIZE)), []):
+        db.session.execute(model.__table__.insert(), batch)
+    db.session.commit()
+
+
+def seed(venues, artists, shows, seed=0):
+    # Fills empty tables and rebuilds the derived data: show counters, the
+    # venue area summary and the genre counts.
+    seeder = Seeder(seed)
+    _insert(Venue, seeder.venues(venues))
+    _insert(Artist, seeder.artists(artists))
+    venue_ids = [id for id, in db.session.query(Venue.id).order_by(Venue.id)]
+    artist_ids = [id for id, in db.session.query(Artist.id).order_by(Artist.id)]
+    if venue_ids and artist_ids:
+        _insert(Show, seeder.shows(shows, venue_ids, artist_ids))
+    counters.rebuild()
+    areas.rebuild()
+    genres.refresh([Venue, Artist])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--venues', type=int, default=2000)
+    parser.add_argument('--artists', type=int, default=5000)
+    parser.add_argument('--shows', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_database()
+    start = time.perf_counter()
+    seed(args.venues, args.artists, args.shows, args.seed)
+    print(f'{Venue.query.count()} venues, {Artist.query.count()} artists, {Show.query.count()} shows '
+          f'in {app.config["SQLALCHEMY_DATABASE_URI"]} ({time.perf_counter() - start:.1f} s)')
+
+
+if __name__ == '__main__':
+    main()
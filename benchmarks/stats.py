@@ -0,0 +1,16 @@
+# Percentiles shared by bench_routes.py and load.py. Kept apart from
+# common.py so load.py runs without importing the app.
+
+import math
+
+
+def percentile(ordered, q):
+    # Nearest-rank percentile q (0-100) of an ascending list.
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summary(samples, points=(50, 95, 99)):
+    ordered = sorted(samples)
+    return {f'p{q}': percentile(ordered, q) for q in points}
@@ -0,0 +1,284 @@
+#----------------------------------------------------------------------------#
+# Bulk import of venues, artists and shows.
+#
+#   flask import-data venues venues.csv
+#   flask import-data shows shows.jsonl --batch-size 5000 --rejects bad.jsonl
+#
+# Rows are streamed from CSV or JSONL in batches, validated with the same
+# VenueForm / ArtistForm / ShowForm rules as the create pages and inserted
+# with one executemany per batch. Shows overlapping a booking of their venue
+# or artist, in the database or earlier in the batch, are rejected. Rejected
+# rows are counted and can be written to a JSONL file together with their
+# errors.
+#----------------------------------------------------------------------------#
+
+import csv
+import datetime
+import json
+import os
+import time
+import click
+from flask.cli import with_appcontext
+from werkzeug.datastructures import MultiDict
+from extensions import db
+from models import Venue, Artist, Show
+from forms import VenueForm, ArtistForm, ShowForm
+from venues import venues_changed
+from artists import artists_changed
+from shows import shows_changed
+import scheduling
+
+FALSE_VALUES = ('', 'false', 'f', 'no', 'n', '0', 'off')
+
+
+class UnreadableRow(object):
+    # A JSONL line that is not a JSON object; rejected as it stands.
+
+    def __init__(self, text, error):
+        self.text = text
+        self.error = error
+
+
+def _parse_line(line):
+    try:
+        row = json.loads(line)
+    except ValueError as e:
+        return UnreadableRow(line.rstrip('\n'), f'Not valid JSON: {e}')
+    if not isinstance(row, dict):
+        return UnreadableRow(line.rstrip('\n'), 'Not a JSON object')
+    return row
+
+
+def read_rows(path, format=None):
+    # Yields (line number, row dict) without loading the file in memory;
+    # lines that cannot be read as a row come as an UnreadableRow.
+    format = format or os.path.splitext(path)[1].lstrip('.').lower()
+    with open(path, newline='') as f:
+        if format == 'csv':
+            for number, row in enumerate(csv.DictReader(f), start=2):
+                yield number, row
+        elif format in ('jsonl', 'ndjson', 'json'):
+            for number, line in enumerate(f, start=1):
+                if line.strip():
+                    yield number, _parse_line(line)
+        else:
+            raise click.BadParameter(f'Unsupported format: {format}')
+
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def to_formdata(row, boolean_fields=(), list_fields=()):
+    # Turns a CSV/JSONL row into form data the WTForms fields understand:
+    # lists become repeated keys (CSV lists are comma separated), booleans
+    # are dropped when false, and empty values are left out entirely.
+    data = MultiDict()
+    for key, value in row.items():
+        if value is None:
+            continue
+        if key in list_fields:
+            values = value if isinstance(value, list) else str(value).split(',')
+            for item in values:
+                if str(item).strip():
+                    data.add(key, str(item).strip())
+        elif key in boolean_fields:
+            if str(value).strip().lower() not in FALSE_VALUES:
+                data.add(key, 'y')
+        elif str(value).strip():
+            data.add(key, str(value).strip())
+    return data
+
+
+def _errors(form):
+    return {name: messages for name, messages in form.errors.items()}
+
+
+#  Row builders
+#  ----------------------------------------------------------------
+# Each takes a batch of (line, row) pairs and returns (records, rejects).
+
+def venue_records(batch):
+    now = datetime.datetime.now()
+    records, rejects = [], []
+    for number, row in batch:
+        form = VenueForm(to_formdata(row, ('seeking_talent',), ('genres',)), meta={'csrf': False})
+        if not form.validate():
+            rejects.append((number, row, _errors(form)))
+            continue
+        records.append({
+            'name': form.name.data,
+            'city': form.city.data,
+            'state': form.state.data,
+            'address': form.address.data,
+            'phone': form.phone.data,
+            'image_link': form.image_link.data,
+            'facebook_link': form.facebook_link.data,
+            'website': form.website.data,
+            'genres': form.genres.data,
+            'seeking_talent': form.seeking_talent.data,
+            'seeking_description': form.seeking_description.data,
+            'listed_at': now
+        })
+    return records, rejects
+
+
+def artist_records(batch):
+    now = datetime.datetime.now()
+    records, rejects = [], []
+    for number, row in batch:
+        form = ArtistForm(to_formdata(row, ('seeking_venue',), ('genres',)), meta={'csrf': False})
+        if not form.validate():
+            rejects.append((number, row, _errors(form)))
+            continue
+        records.append({
+            'name': form.name.data,
+            'city': form.city.data,
+            'state': form.state.data,
+            'phone': form.phone.data,
+            'image_link': form.image_link.data,
+            'facebook_link': form.facebook_link.data,
+            'website': form.website.data,
+            'genres': form.genres.data,
+            'seeking_venue': form.seeking_venue.data,
+            'seeking_description': form.seeking_description.data,
+            'available_from': form.available_from.data,
+            'available_to': form.available_to.data,
+            'lists_available': form.available_from.data is not None and form.available_to.data is not None,
+            'listed_at': now
+        })
+    return records, rejects
+
+
+def show_records(batch):
+    records, rejects, forms = [], [], []
+    for number, row in batch:
+        form = ShowForm(to_formdata(row), meta={'csrf': False})
+        if not form.validate():
+            rejects.append((number, row, _errors(form)))
+        elif not (form.artist_id.data.isdigit() and form.venue_id.data.isdigit()):
+            rejects.append((number, row, {'id': ['artist_id and venue_id must be integers']}))
+        else:
+            forms.append((number, row, form))
+
+    # One set-based lookup per batch for the referenced artists and venues.
+    artist_ids = {int(form.artist_id.data) for number, row, form in forms}
+    venue_ids = {int(form.venue_id.data) for number, row, form in forms}
+    artists = {row.id: row for row in db.session.query(
+        Artist.id, Artist.lists_available, Artist.available_from, Artist.available_to)
+        .filter(Artist.id.in_(artist_ids))} if artist_ids else {}
+    venues = {venue_id for venue_id, in db.session.query(Venue.id)
+              .filter(Venue.id.in_(venue_ids))} if venue_ids else set()
+
+    candidates = []
+    for number, row, form in forms:
+        artist = artists.get(int(form.artist_id.data))
+        start_time = form.start_time.data
+        end_time = scheduling.end_time_for(start_time, form.duration.data)
+        if artist is None:
+            rejects.append((number, row, {'artist_id': ['The artist does not exist']}))
+        elif int(form.venue_id.data) not in venues:
+            rejects.append((number, row, {'venue_id': ['The venue does not exist']}))
+        elif not scheduling.is_within_availability(artist, start_time, end_time):
+            rejects.append((number, row, {'start_time': ['Artist not available in that time']}))
+        else:
+            candidates.append((number, row, {
+                'artist_id': int(form.artist_id.data),
+                'venue_id': int(form.venue_id.data),
+                'start_time': start_time,
+                'end_time': end_time
+            }))
+
+    # Rows overlapping an earlier row of the batch on the same venue or
+    # artist are rejected, then the rest are checked against the database.
+    clashes = {}
+    for resource in ('venue_id', 'artist_id'):
+        slots = [(index, record[resource], record['start_time'], record['end_time'])
+                 for index, (number, row, record) in enumerate(candidates)]
+        for index, earlier in scheduling.overlapping_pairs(slots):
+            clashes.setdefault(index, f'Overlaps the show on line {candidates[earlier][0]}')
+    found = scheduling.batch_conflicts([
+        (index, record['venue_id'], record['artist_id'], record['start_time'], record['end_time'])
+        for index, (number, row, record) in enumerate(candidates) if index not in clashes])
+    for index, (number, row, record) in enumerate(candidates):
+        if index in found:
+            clashes[index] = scheduling.describe(found[index])
+        if index in clashes:
+            rejects.append((number, row, {'start_time': [clashes[index]]}))
+        else:
+            records.append(record)
+    return records, rejects
+
+
+IMPORTERS = {
+    'venues': (Venue, venue_records),
+    'artists': (Artist, artist_records),
+    'shows': (Show, show_records),
+}
+
+
+def import_rows(kind, rows, batch_size=1000, on_reject=None):
+    # Validates and inserts rows batch by batch; returns (inserted, rejected).
+    model, build = IMPORTERS[kind]
+    inserted = rejected = 0
+    for batch in batches(rows, batch_size):
+        unreadable = [(number, row.text, {'row': [row.error]})
+                      for number, row in batch if isinstance(row, UnreadableRow)]
+        if unreadable:
+            batch = [(number, row) for number, row in batch if not isinstance(row, UnreadableRow)]
+        records, rejects = build(batch)
+        rejects = sorted(unreadable + rejects, key=lambda reject: reject[0])
+        if records:
+            db.session.execute(model.__table__.insert(), records)
+            db.session.commit()
+            if model is Show:
+                shows_changed({record['venue_id'] for record in records},
+                              {record['artist_id'] for record in records})
+        inserted += len(records)
+        rejected += len(rejects)
+        if on_reject:
+            for reject in rejects:
+                on_reject(*reject)
+    return inserted, rejected
+
+
+@click.command('import-data')
+@click.argument('kind', type=click.Choice(sorted(IMPORTERS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'format', type=click.Choice(['csv', 'jsonl']),
+              help='File format; guessed from the extension by default.')
+@click.option('--batch-size', default=1000, show_default=True,
+              help='Rows validated and inserted per transaction.')
+@click.option('--rejects', 'rejects_path', type=click.Path(dir_okay=False),
+              help='Write rejected rows and their errors to this JSONL file.')
+@with_appcontext
+def import_command(kind, path, format, batch_size, rejects_path):
+    """Import venues, artists or shows from a CSV or JSONL file."""
+    rejects_file = open(rejects_path, 'w') if rejects_path else None
+
+    def on_reject(number, row, errors):
+        if rejects_file:
+            rejects_file.write(json.dumps({'line': number, 'row': row, 'errors': errors}, default=str) + '\n')
+
+    start = time.perf_counter()
+    try:
+        inserted, rejected = import_rows(kind, read_rows(path, format), batch_size, on_reject)
+    finally:
+        if rejects_file:
+            rejects_file.close()
+    elapsed = time.perf_counter() - start
+
+    if kind == 'venues':
+        venues_changed()
+    elif kind == 'artists':
+        artists_changed()
+
+    rate = inserted / elapsed if elapsed else 0
+    click.echo(f'Imported {inserted} {kind} in {elapsed:.2f}s ({rate:.0f} rows/sec), rejected {rejected}')
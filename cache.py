@@ -0,0 +1,196 @@
+#----------------------------------------------------------------------------#
+# Application cache.
+#
+# create_cache() picks a backend from the config:
+#   CACHE_BACKEND = 'lru'   in-process LRU with a TTL per entry (default)
+#   CACHE_BACKEND = 'redis' any Redis-compatible server at CACHE_REDIS_URL,
+#                           or the in-process LocalRedis stand-in without one
+#   CACHE_BACKEND = 'null'  caching disabled
+# Every backend counts hits, misses, sets and deletes for stats().
+#----------------------------------------------------------------------------#
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class BaseCache(object):
+
+    def __init__(self, default_ttl=60):
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.deletes = 0
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+    def get(self, key, default=None):
+        value = self._get(key)
+        if value is MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.sets += 1
+        self._set(key, value, self.default_ttl if ttl is None else ttl)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.deletes += 1
+            self._delete(key)
+
+    def get_or_set(self, key, compute, ttl=None):
+        # Returns the cached value for key, computing and storing it on a miss.
+        value = self._get(key)
+        if value is not MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        self.set(key, value, ttl)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'sets': self.sets,
+            'deletes': self.deletes
+        }
+
+
+class NullCache(BaseCache):
+
+    def _get(self, key):
+        return MISSING
+
+    def _set(self, key, value, ttl):
+        pass
+
+    def _delete(self, key):
+        pass
+
+
+class LRUCache(BaseCache):
+
+    def __init__(self, max_entries=1024, default_ttl=60):
+        super().__init__(default_ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value, ttl):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LocalRedis(object):
+    # The subset of the redis-py client used by RedisCache, kept in process.
+    # Stands in for a server in development and in the benchmarks.
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            entry = self._data.get(name)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[name]
+                return None
+            return value
+
+    def set(self, name, value, ex=None):
+        expires_at = time.monotonic() + ex if ex else None
+        with self._lock:
+            self._data[name] = (value, expires_at)
+        return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
+        return True
+
+
+class RedisCache(BaseCache):
+
+    def __init__(self, client, prefix='fyyur:', default_ttl=60):
+        super().__init__(default_ttl)
+        self.client = client
+        self.prefix = prefix
+
+    def _get(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return MISSING
+        return pickle.loads(value)
+
+    def _set(self, key, value, ttl):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl or None)
+
+    def _delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+def create_cache(config):
+    backend = config.get('CACHE_BACKEND', 'lru')
+    ttl = config.get('CACHE_DEFAULT_TTL', 60)
+    if backend == 'null':
+        return NullCache(ttl)
+    if backend == 'redis':
+        url = config.get('CACHE_REDIS_URL')
+        if url:
+            import redis
+            client = redis.Redis.from_url(url)
+        else:
+            client = LocalRedis()
+        return RedisCache(client, config.get('CACHE_KEY_PREFIX', 'fyyur:'), ttl)
+    if backend == 'lru':
+        return LRUCache(config.get('CACHE_MAX_ENTRIES', 1024), ttl)
+    raise ValueError(f'Unknown CACHE_BACKEND: {backend}')
@@ -1,11 +1,214 @@
 import os
-SECRET_KEY = os.urandom(32)
+import tempfile
 # Grabs the folder where the script runs.
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 
-DEBUG = True
+def load_secret_key(generate=True):
+    # Every worker and node must sign sessions and CSRF tokens with the same
+    # key. Use SECRET_KEY, else the file at SECRET_KEY_FILE, else (with
+    # `generate`) a key generated once into instance/secret_key and shared by
+    # local workers. Without `generate` a missing key is an error, as nodes
+    # generating their own would reject each other's sessions.
+    key = os.environ.get('SECRET_KEY')
+    if key:
+        return key
+    if not generate and not os.environ.get('SECRET_KEY_FILE'):
+        raise RuntimeError('Set SECRET_KEY or SECRET_KEY_FILE: every node needs the same secret key')
+    path = os.environ.get('SECRET_KEY_FILE', os.path.join(basedir, 'instance', 'secret_key'))
+    if generate and not os.path.exists(path):
+        _generate_key_file(path)
+    try:
+        with open(path, 'rb') as f:
+            key = f.read().strip()
+    except FileNotFoundError:
+        raise RuntimeError(f'SECRET_KEY_FILE {path} does not exist')
+    if not key:
+        raise RuntimeError(f'The secret key file {path} is empty')
+    return key
 
 
-SQLALCHEMY_DATABASE_URI = 'postgresql://sondr@localhost:5432/fyyur'
-SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+def _generate_key_file(path):
+    # Writes the key to a temporary file next to `path` and links it into
+    # place, so the file appears whole or not at all. When several workers
+    # race, the first link wins and the others read its key.
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.secret_key.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(os.urandom(32).hex().encode())
+        try:
+            os.link(temp_path, path)
+        except FileExistsError:
+            pass
+    finally:
+        os.unlink(temp_path)
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class Config(object):
+    # Set by create_app() from load_secret_key(SECRET_KEY_GENERATE).
+    SECRET_KEY = None
+    SECRET_KEY_GENERATE = True
+    DEBUG = False
+    TESTING = False
+
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'postgresql://sondr@localhost:5432/fyyur')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool, turned into SQLALCHEMY_ENGINE_OPTIONS by
+    # engine_options(). Pre-ping and recycling drop connections that went
+    # stale during a database failover instead of failing a request on them.
+    DB_POOL_SIZE = env_int('DB_POOL_SIZE', 5)
+    DB_MAX_OVERFLOW = env_int('DB_MAX_OVERFLOW', 10)
+    DB_POOL_TIMEOUT = env_int('DB_POOL_TIMEOUT', 30)
+    DB_POOL_RECYCLE = env_int('DB_POOL_RECYCLE', 1800)
+    DB_POOL_PRE_PING = env_bool('DB_POOL_PRE_PING', True)
+    # Milliseconds; 0 disables. Applied per connection on Postgres.
+    DB_STATEMENT_TIMEOUT = env_int('DB_STATEMENT_TIMEOUT', 0)
+
+    # Search: 'auto' uses the pg_trgm indexes on Postgres and the in-memory
+    # n-gram index elsewhere; 'trigram' or 'ngram' force one path.
+    SEARCH_BACKEND = 'auto'
+    SEARCH_RESULT_LIMIT = 50
+    # Seconds before an in-memory search index is checked against its table
+    # for writes made by other processes.
+    SEARCH_INDEX_MAX_AGE = env_int('SEARCH_INDEX_MAX_AGE', 30)
+    # Name autocomplete: 'auto' reads the prefix indexes on Postgres and an
+    # in-memory sorted array elsewhere; 'index' or 'memory' force one path.
+    # ?limit= is clamped to AUTOCOMPLETE_LIMIT_MAX.
+    AUTOCOMPLETE_BACKEND = 'auto'
+    AUTOCOMPLETE_LIMIT = 10
+    AUTOCOMPLETE_LIMIT_MAX = 50
+    # Seconds before the in-memory array is checked against its table for
+    # writes made by other processes.
+    AUTOCOMPLETE_INDEX_MAX_AGE = env_int('AUTOCOMPLETE_INDEX_MAX_AGE', 30)
+
+    # Listings are keyset paginated; ?limit= is clamped to PAGE_SIZE_MAX.
+    PAGE_SIZE = 50
+    PAGE_SIZE_MAX = 200
+    # Venues listed per area on the /venues directory; the rest are on the
+    # area's own page.
+    VENUE_AREA_PREVIEW = 10
+
+    # Minutes a show runs when it is listed without a duration. Durations
+    # are capped at scheduling.MAX_DURATION. Shows listed before end times
+    # existed were backfilled with 120 (migration 9c4f2d7a1e36).
+    SHOW_DEFAULT_DURATION = 120
+
+    # Cache: 'lru' (in-process), 'redis' (CACHE_REDIS_URL, or an in-process
+    # stand-in when unset) or 'null'. TTLs are in seconds.
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'lru')
+    CACHE_DEFAULT_TTL = 60
+    CACHE_MAX_ENTRIES = 1024
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    # Seconds the venue and artist pages are cached whole for anonymous
+    # requests (page_cache.py); 0 disables.
+    PAGE_CACHE_TTL = env_int('PAGE_CACHE_TTL', 300)
+
+    # Sessions: 'cookie' keeps Flask's signed cookies; 'filesystem', 'sql' or
+    # 'redis' keep the data server-side (see sessions.py).
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'cookie')
+    SESSION_FILE_DIR = os.path.join(basedir, 'instance', 'sessions')
+    SESSION_REDIS_URL = os.environ.get('SESSION_REDIS_URL')
+    SESSION_KEY_PREFIX = 'session:'
+
+    # Logging (logs.py), outside debug and testing: JSON lines in LOG_FILE,
+    # shared by all workers and rotated outside the app (logrotate), written
+    # from a queue of LOG_QUEUE_SIZE records. Past LOG_SAMPLE_LIMIT repeats
+    # of a message in LOG_SAMPLE_INTERVAL seconds are dropped; 0 keeps them
+    # all.
+    LOG_FILE = os.environ.get('LOG_FILE', os.path.join(basedir, 'error.log'))
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_QUEUE_SIZE = env_int('LOG_QUEUE_SIZE', 10000)
+    LOG_SAMPLE_LIMIT = env_int('LOG_SAMPLE_LIMIT', 20)
+    LOG_SAMPLE_INTERVAL = env_int('LOG_SAMPLE_INTERVAL', 60)
+
+    # Instrumentation (instrumentation.py): Server-Timing headers on every
+    # response, Prometheus metrics at /metrics, and a warning in the app log
+    # for every SQL statement taking SLOW_QUERY_MS or longer (0 disables).
+    # With METRICS_TOKEN set, /metrics requires it as a bearer token.
+    SERVER_TIMING = env_bool('SERVER_TIMING', True)
+    METRICS_ENABLED = env_bool('METRICS_ENABLED', True)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    SLOW_QUERY_MS = env_int('SLOW_QUERY_MS', 250)
+
+    # Static assets: serve the bundles of `flask build-assets` when built
+    # (assets.py). Their names change with their content, so they are
+    # cached for ASSETS_MAX_AGE seconds.
+    ASSETS_USE_BUILD = env_bool('ASSETS_USE_BUILD', True)
+    ASSETS_MAX_AGE = 365 * 24 * 3600
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    # Edits to the source files show up without a rebuild.
+    ASSETS_USE_BUILD = env_bool('ASSETS_USE_BUILD', False)
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite://')
+    WTF_CSRF_ENABLED = False
+
+
+class ProductionConfig(Config):
+    # Nodes must share one key: refuse to start without SECRET_KEY or
+    # SECRET_KEY_FILE rather than generate one per node.
+    SECRET_KEY_GENERATE = False
+    DB_POOL_SIZE = env_int('DB_POOL_SIZE', 10)
+    DB_MAX_OVERFLOW = env_int('DB_MAX_OVERFLOW', 20)
+    DB_POOL_RECYCLE = env_int('DB_POOL_RECYCLE', 300)
+    DB_STATEMENT_TIMEOUT = env_int('DB_STATEMENT_TIMEOUT', 5000)
+    SESSION_COOKIE_SECURE = env_bool('SESSION_COOKIE_SECURE', True)
+    # Keeps query counts and timings out of public responses.
+    SERVER_TIMING = env_bool('SERVER_TIMING', False)
+    METRICS_ENABLED = env_bool('METRICS_ENABLED', False)
+
+
+CONFIGS = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
+
+
+def get_config(name=None):
+    # FYYUR_ENV picks the profile, falling back to FLASK_ENV and then to
+    # development.
+    name = name or os.environ.get('FYYUR_ENV') or os.environ.get('FLASK_ENV') or 'development'
+    try:
+        return CONFIGS[name]
+    except KeyError:
+        raise ValueError(f'Unknown configuration: {name}')
+
+
+def engine_options(config):
+    # SQLite uses its own single-connection pools, which take none of these.
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    if uri.startswith('sqlite'):
+        return {}
+    options = {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    if uri.startswith('postgresql'):
+        # Batch executemany() into multi-row INSERT ... VALUES (bulk import).
+        options['executemany_mode'] = 'values'
+        if config['DB_STATEMENT_TIMEOUT']:
+            options['connect_args'] = {'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT']}"}
+    return options
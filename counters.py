@@ -0,0 +1,81 @@
+#----------------------------------------------------------------------------#
+# Show counters on venues and artists.
+#
+# venue and artist rows carry upcoming_shows_count, past_shows_count and
+# next_show_time so listings, search results and the API can show and sort
+# by activity without touching the show table. They are recounted:
+#   - for the venue and artist of a show when it is created or deleted
+#     (shows.shows_changed),
+#   - for every row whose next show has started by the rollover job:
+#       flask rollover-show-counters          (run e.g. every few minutes)
+#       flask rollover-show-counters --full   (recount everything)
+# A show is upcoming while start_time >= now, as on the detail pages. The
+# venue directory summary (areas.py) lists the counts too and is refreshed
+# for the areas of every venue recounted here.
+#----------------------------------------------------------------------------#
+
+import datetime
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select, func, and_
+from extensions import db
+from models import Venue, Artist, Show
+import areas
+
+
+def _recount(model, foreign_key, now, where=None):
+    # One UPDATE with correlated subqueries; each is an index range scan on
+    # ix_show_<venue|artist>_id_start_time.
+    owned = foreign_key == model.id
+    statement = model.__table__.update().values(
+        upcoming_shows_count=select([func.count(Show.id)])
+        .where(and_(owned, Show.start_time >= now)).as_scalar(),
+        past_shows_count=select([func.count(Show.id)])
+        .where(and_(owned, Show.start_time < now)).as_scalar(),
+        next_show_time=select([func.min(Show.start_time)])
+        .where(and_(owned, Show.start_time >= now)).as_scalar())
+    if where is not None:
+        statement = statement.where(where)
+    return db.session.execute(statement).rowcount
+
+
+def refresh(venue_ids=(), artist_ids=(), now=None):
+    # Recounts the given venues and artists and commits.
+    now = now or datetime.datetime.now()
+    if artist_ids:
+        _recount(Artist, Show.artist_id, now, Artist.id.in_(set(artist_ids)))
+    if venue_ids:
+        venues = Venue.id.in_(set(venue_ids))
+        _recount(Venue, Show.venue_id, now, venues)
+        areas.refresh(areas.areas_of_venues(venues))
+    db.session.commit()
+
+
+def rollover(now=None):
+    # Only rows whose next show has started can have stale counts, and
+    # next_show_time is indexed, so this touches just those rows.
+    now = now or datetime.datetime.now()
+    started = Venue.next_show_time <= now
+    changed_areas = areas.areas_of_venues(started)
+    venues = _recount(Venue, Show.venue_id, now, started)
+    artists = _recount(Artist, Show.artist_id, now, Artist.next_show_time <= now)
+    areas.refresh(changed_areas)
+    db.session.commit()
+    return venues, artists
+
+
+def rebuild(now=None):
+    now = now or datetime.datetime.now()
+    venues = _recount(Venue, Show.venue_id, now)
+    artists = _recount(Artist, Show.artist_id, now)
+    areas.rebuild()
+    return venues, artists
+
+
+@click.command('rollover-show-counters')
+@click.option('--full', is_flag=True, help='Recount every venue and artist.')
+@with_appcontext
+def rollover_command(full):
+    """Move started shows from the upcoming to the past counters."""
+    venues, artists = rebuild() if full else rollover()
+    click.echo(f'Recounted shows of {venues} venues and {artists} artists')
@@ -0,0 +1,203 @@
+#----------------------------------------------------------------------------#
+# Streaming export of the show calendar.
+#
+#   GET /shows/export.csv?venue_id=&artist_id=&from=2021-01-01&to=2021-12-31
+#   flask export-shows --format ics --venue-id 3 -o venue-3.ics
+#
+# Shows are read through a server-side cursor (yield_per) and written out
+# chunk by chunk, so memory stays flat however many shows match. Formats
+# are CSV, JSONL and iCalendar.
+#----------------------------------------------------------------------------#
+
+import csv
+import datetime
+import io
+import json
+import sys
+import click
+from flask import Blueprint, Response, request, abort, stream_with_context
+from flask.cli import with_appcontext
+from extensions import db
+from models import Venue, Artist, Show
+
+CHUNK_ROWS = 500
+
+EXPORT_COLUMNS = [
+    Show.id.label('id'),
+    Show.start_time.label('start_time'),
+    Show.end_time.label('end_time'),
+    Show.artist_id.label('artist_id'),
+    Artist.name.label('artist_name'),
+    Show.venue_id.label('venue_id'),
+    Venue.name.label('venue_name'),
+    Venue.address.label('venue_address'),
+    Venue.city.label('venue_city'),
+    Venue.state.label('venue_state'),
+]
+FIELDS = [column.key for column in EXPORT_COLUMNS]
+TIME_FIELDS = ('start_time', 'end_time')
+
+export = Blueprint('export', __name__)
+
+
+def shows_query(venue_id=None, artist_id=None, start=None, end=None):
+    query = db.session.query(*EXPORT_COLUMNS).select_from(Show) \
+        .join(Artist, Show.artist_id == Artist.id) \
+        .join(Venue, Show.venue_id == Venue.id)
+    if venue_id is not None:
+        query = query.filter(Show.venue_id == venue_id)
+    if artist_id is not None:
+        query = query.filter(Show.artist_id == artist_id)
+    if start is not None:
+        query = query.filter(Show.start_time >= start)
+    if end is not None:
+        query = query.filter(Show.start_time < end)
+    return query.order_by(Show.start_time, Show.id).yield_per(CHUNK_ROWS)
+
+
+#  Writers
+#  ----------------------------------------------------------------
+# Each takes an iterable of rows and yields text chunks of CHUNK_ROWS rows.
+
+def _chunked(rows, write_row, buffer, footer=None):
+    pending = 0
+    for row in rows:
+        write_row(row)
+        pending += 1
+        if pending >= CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if footer:
+        buffer.write(footer)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+
+    def write_row(row):
+        writer.writerow([getattr(row, field).isoformat(sep=' ') if field in TIME_FIELDS
+                         else getattr(row, field) for field in FIELDS])
+
+    return _chunked(rows, write_row, buffer)
+
+
+def jsonl_chunks(rows):
+    buffer = io.StringIO()
+
+    def write_row(row):
+        record = {field: getattr(row, field) for field in FIELDS}
+        record['start_time'] = row.start_time.isoformat()
+        record['end_time'] = row.end_time.isoformat()
+        buffer.write(json.dumps(record))
+        buffer.write('\n')
+
+    return _chunked(rows, write_row, buffer)
+
+
+def _ical_text(value):
+    return (value or '').replace('\\', '\\\\').replace(';', '\\;') \
+        .replace(',', '\\,').replace('\n', '\\n')
+
+
+def _ical_line(line):
+    # Folds content lines longer than 75 octets (RFC 5545, 3.1).
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while encoded:
+        size = 75 if not parts else 74
+        # Never split inside a multi-byte character.
+        while size < len(encoded) and (encoded[size] & 0xC0) == 0x80:
+            size -= 1
+        parts.append(encoded[:size].decode('utf-8'))
+        encoded = encoded[size:]
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def ical_chunks(rows):
+    buffer = io.StringIO()
+    for line in ('BEGIN:VCALENDAR', 'VERSION:2.0',
+                 'PRODID:-//Fyyur//Show calendar//EN', 'CALSCALE:GREGORIAN'):
+        buffer.write(_ical_line(line))
+    stamp = datetime.datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+
+    def write_row(row):
+        location = ', '.join(part for part in (row.venue_address, row.venue_city, row.venue_state) if part)
+        for line in (
+            'BEGIN:VEVENT',
+            f'UID:show-{row.id}@fyyur',
+            f'DTSTAMP:{stamp}',
+            f"DTSTART:{row.start_time.strftime('%Y%m%dT%H%M%S')}",
+            f"DTEND:{row.end_time.strftime('%Y%m%dT%H%M%S')}",
+            f'SUMMARY:{_ical_text(row.artist_name)} at {_ical_text(row.venue_name)}',
+            f'LOCATION:{_ical_text(location)}',
+            'END:VEVENT',
+        ):
+            buffer.write(_ical_line(line))
+
+    return _chunked(rows, write_row, buffer, footer=_ical_line('END:VCALENDAR'))
+
+
+FORMATS = {
+    'csv': (csv_chunks, 'text/csv'),
+    'jsonl': (jsonl_chunks, 'application/x-ndjson'),
+    'ics': (ical_chunks, 'text/calendar'),
+}
+
+
+#  Endpoint
+#  ----------------------------------------------------------------
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        abort(400)
+
+
+@export.route('/shows/export.<format>')
+def export_shows(format):
+    if format not in FORMATS:
+        abort(404)
+    write, mimetype = FORMATS[format]
+    query = shows_query(
+        venue_id=request.args.get('venue_id', type=int),
+        artist_id=request.args.get('artist_id', type=int),
+        start=_parse_date(request.args.get('from')),
+        end=_parse_date(request.args.get('to')))
+    response = Response(stream_with_context(write(query)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=shows.{format}'
+    return response
+
+
+#  CLI
+#  ----------------------------------------------------------------
+
+@click.command('export-shows')
+@click.option('--format', 'format', type=click.Choice(sorted(FORMATS)), default='csv', show_default=True)
+@click.option('--venue-id', type=int)
+@click.option('--artist-id', type=int)
+@click.option('--from', 'start', type=click.DateTime(), help='Only shows starting at or after this time.')
+@click.option('--to', 'end', type=click.DateTime(), help='Only shows starting before this time.')
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help='Defaults to stdout.')
+@with_appcontext
+def export_command(format, venue_id, artist_id, start, end, output):
+    """Export the show calendar as CSV, JSONL or iCalendar."""
+    write = FORMATS[format][0]
+    rows = shows_query(venue_id, artist_id, start, end)
+    out = open(output, 'w', newline='') if output else sys.stdout
+    try:
+        for chunk in write(rows):
+            out.write(chunk)
+    finally:
+        if output:
+            out.close()
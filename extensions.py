@@ -0,0 +1,42 @@
+#----------------------------------------------------------------------------#
+# Extensions.
+#
+# Created unbound here and attached to an application in create_app(), so
+# models and blueprints can import them without importing the app itself.
+#----------------------------------------------------------------------------#
+
+import os
+from flask import current_app
+from flask_sqlalchemy import SQLAlchemy
+from werkzeug.local import LocalProxy
+
+
+def _load_moment():
+    from flask_moment import _moment
+    return _moment
+
+
+class LazyMoment(object):
+    # Registers Flask-Moment's `moment` template global without importing
+    # flask_moment, which pulls in distutils and pkg_resources (a few hundred
+    # ms at boot). The module is loaded the first time a template uses it.
+
+    def init_app(self, app):
+        app.extensions['moment'] = LocalProxy(_load_moment)
+        app.context_processor(lambda: {'moment': app.extensions['moment']})
+
+
+db = SQLAlchemy()
+moment = LazyMoment()
+
+# The application cache is built from the app's config (cache.create_cache)
+# and kept in app.extensions; this proxy resolves it for the current app.
+cache = LocalProxy(lambda: current_app.extensions['cache'])
+
+
+def init_migrations(app, directory=None):
+    # Alembic is only needed by the `flask db` commands, so it is imported
+    # here rather than at module level and web workers never load it.
+    from flask_migrate import Migrate
+    directory = directory or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+    return Migrate(app, db, directory=directory)
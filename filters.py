@@ -0,0 +1,42 @@
+#----------------------------------------------------------------------------#
+# Template filters.
+#
+# Registered on the app by create_app(). Babel and dateutil are imported on
+# first use so neither is loaded until a page is actually rendered.
+#----------------------------------------------------------------------------#
+
+import datetime
+
+DATETIME_FORMATS = {
+    'full': "EEEE MMMM, d, y 'at' h:mma",
+    'medium': "EE MM, dd, y h:mma"
+}
+_datetime_patterns = {}
+
+
+def _compile(format, locale):
+    import babel
+    import babel.dates
+    pattern = babel.dates.parse_pattern(DATETIME_FORMATS.get(format, format))
+    compiled = (pattern, babel.Locale.parse(locale or babel.dates.LC_TIME))
+    _datetime_patterns[(format, locale)] = compiled
+    return compiled
+
+
+def format_datetime(value, format='medium', locale=None):
+    # Controllers pass datetimes straight through; strings are still parsed
+    # for older callers. Parsed Babel patterns are kept per format and locale.
+    if isinstance(value, str):
+        import dateutil.parser
+        value = dateutil.parser.parse(value)
+    compiled = _datetime_patterns.get((format, locale))
+    if compiled is None:
+        compiled = _compile(format, locale)
+    pattern, babel_locale = compiled
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return pattern.apply(value, babel_locale)
+
+
+def init_app(app):
+    app.jinja_env.filters['datetime'] = format_datetime
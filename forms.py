@@ -1,8 +1,18 @@
 from datetime import datetime
 from flask_wtf import Form
-from wtforms import StringField, SelectField, SelectMultipleField, BooleanField, DateTimeField
-from wtforms.validators import DataRequired, AnyOf, URL, InputRequired
+import wtforms
+from wtforms import StringField, SelectField, SelectMultipleField, BooleanField, DateTimeField, IntegerField
+from wtforms import FieldList, FormField
+from wtforms.validators import DataRequired, AnyOf, URL, InputRequired, Optional, NumberRange, ValidationError
 from wtforms.fields.html5 import DateField
+from scheduling import MAX_DURATION_MINUTES
+from genres import GENRES
+
+GENRE_CHOICES = [(genre, genre) for genre in GENRES]
+# Empty date rows of the tour form; more can be added on the page.
+TOUR_FORM_ROWS = 5
+TOUR_MAX_DATES = 100
+
 class ShowForm(Form):
     artist_id = StringField(
         'artist_id',
@@ -17,6 +27,60 @@ class ShowForm(Form):
         validators=[DataRequired()],
         default= datetime.today()
     )
+    # Minutes; SHOW_DEFAULT_DURATION when left empty.
+    duration = IntegerField(
+        'duration',
+        validators=[Optional(), NumberRange(min=1, max=MAX_DURATION_MINUTES)]
+    )
+
+class TourDateForm(wtforms.Form):
+    # One date of a tour. Rows left blank are skipped.
+    venue_id = IntegerField(
+        'venue_id',
+        validators=[Optional()]
+    )
+    start_time = DateTimeField(
+        'start_time',
+        validators=[Optional()]
+    )
+    # Minutes; the tour's duration when left empty.
+    duration = IntegerField(
+        'duration',
+        validators=[Optional(), NumberRange(min=1, max=MAX_DURATION_MINUTES)]
+    )
+
+    @property
+    def blank(self):
+        return self.venue_id.data is None and self.start_time.data is None
+
+    def validate(self, extra_validators=None):
+        if not super().validate(extra_validators):
+            return False
+        for field in (self.venue_id, self.start_time):
+            if field.data is None and not self.blank:
+                field.errors.append('This field is required.')
+                return False
+        return True
+
+class TourForm(Form):
+    # An artist's shows at several venues, booked together.
+    artist_id = IntegerField(
+        'artist_id',
+        validators=[DataRequired()]
+    )
+    # Minutes; SHOW_DEFAULT_DURATION when left empty.
+    duration = IntegerField(
+        'duration',
+        validators=[Optional(), NumberRange(min=1, max=MAX_DURATION_MINUTES)]
+    )
+    dates = FieldList(FormField(TourDateForm), min_entries=TOUR_FORM_ROWS)
+
+    def validate_dates(self, field):
+        booked = len([entry for entry in field.entries if not entry.form.blank])
+        if not booked:
+            raise ValidationError('List at least one date.')
+        if booked > TOUR_MAX_DATES:
+            raise ValidationError(f'A tour can have at most {TOUR_MAX_DATES} dates.')
 
 class VenueForm(Form):
     name = StringField(
@@ -96,30 +160,10 @@ class VenueForm(Form):
     genres = SelectMultipleField(
         # TODO implement enum restriction
         'genres', validators=[DataRequired()],
-        choices=[
-            ('Alternative', 'Alternative'),
-            ('Blues', 'Blues'),
-            ('Classical', 'Classical'),
-            ('Country', 'Country'),
-            ('Electronic', 'Electronic'),
-            ('Folk', 'Folk'),
-            ('Funk', 'Funk'),
-            ('Hip-Hop', 'Hip-Hop'),
-            ('Heavy Metal', 'Heavy Metal'),
-            ('Instrumental', 'Instrumental'),
-            ('Jazz', 'Jazz'),
-            ('Musical Theatre', 'Musical Theatre'),
-            ('Pop', 'Pop'),
-            ('Punk', 'Punk'),
-            ('R&B', 'R&B'),
-            ('Reggae', 'Reggae'),
-            ('Rock n Roll', 'Rock n Roll'),
-            ('Soul', 'Soul'),
-            ('Other', 'Other'),
-        ]
+        choices=GENRE_CHOICES
     )
     facebook_link = StringField(
-        'facebook_link', validators=[URL()]
+        'facebook_link', validators=[Optional(), URL()]
     )
 
     seeking_talent = BooleanField(
@@ -127,7 +171,7 @@ class VenueForm(Form):
     )
     
     seeking_description = StringField(
-        'seeking_description', validators=[URL()]
+        'seeking_description'
     )
 
 class ArtistForm(Form):
@@ -198,36 +242,16 @@ class ArtistForm(Form):
         'phone'
     )
     image_link = StringField(
-        'image_link', validators=[URL()]
+        'image_link', validators=[Optional(), URL()]
     )
     genres = SelectMultipleField(
         # TODO implement enum restriction
         'genres', validators=[DataRequired()],
-        choices=[
-            ('Alternative', 'Alternative'),
-            ('Blues', 'Blues'),
-            ('Classical', 'Classical'),
-            ('Country', 'Country'),
-            ('Electronic', 'Electronic'),
-            ('Folk', 'Folk'),
-            ('Funk', 'Funk'),
-            ('Hip-Hop', 'Hip-Hop'),
-            ('Heavy Metal', 'Heavy Metal'),
-            ('Instrumental', 'Instrumental'),
-            ('Jazz', 'Jazz'),
-            ('Musical Theatre', 'Musical Theatre'),
-            ('Pop', 'Pop'),
-            ('Punk', 'Punk'),
-            ('R&B', 'R&B'),
-            ('Reggae', 'Reggae'),
-            ('Rock n Roll', 'Rock n Roll'),
-            ('Soul', 'Soul'),
-            ('Other', 'Other'),
-        ]
+        choices=GENRE_CHOICES
     )
     facebook_link = StringField(
         # TODO implement enum restriction
-        'facebook_link', validators=[URL()]
+        'facebook_link', validators=[Optional(), URL()]
     )
     seeking_venue = BooleanField(
         False
@@ -0,0 +1,95 @@
+#----------------------------------------------------------------------------#
+# Genres.
+#
+# Venues and artists keep their genres as a text[] on Postgres, where
+# "contains" compiles to genres @> ARRAY[...] and is served by the GIN
+# indexes ix_venue_genres and ix_artist_genres, and as a JSON list on
+# SQLite, matched through json_each.
+#
+# The genre table is the lookup of genre names with the number of venues
+# and artists listing each, so the genre filters can show counts without
+# unnesting every row. Counts are moved by one for the genres a venue or
+# artist gained or lost on create/edit/delete (venues.venues_changed,
+# artists.artists_changed) and recounted for every genre after bulk imports
+# and with
+#   flask rebuild-genre-counts
+#----------------------------------------------------------------------------#
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import exists, func, literal_column, select
+from extensions import db
+from models import Venue, Artist, Genre
+
+# The choices of the venue and artist forms.
+GENRES = [
+    'Alternative', 'Blues', 'Classical', 'Country', 'Electronic', 'Folk',
+    'Funk', 'Hip-Hop', 'Heavy Metal', 'Instrumental', 'Jazz',
+    'Musical Theatre', 'Pop', 'Punk', 'R&B', 'Reggae', 'Rock n Roll', 'Soul',
+    'Other',
+]
+
+COUNT_COLUMNS = {Venue: 'venue_count', Artist: 'artist_count'}
+
+
+def has_genre(column, genre):
+    if db.engine.dialect.name == 'sqlite':
+        values = func.json_each(column).alias('genre_values')
+        return exists(select([literal_column('1')]).select_from(values)
+                      .where(literal_column('genre_values.value') == genre))
+    return column.contains([genre])
+
+
+def _count(model, genre):
+    return db.session.query(func.count(model.id)).filter(has_genre(model.genres, genre)).scalar()
+
+
+def _ensure(names):
+    stored = {name for name, in db.session.query(Genre.name).filter(Genre.name.in_(names))}
+    db.session.add_all([Genre(name=name, venue_count=0, artist_count=0) for name in names - stored])
+    db.session.flush()
+
+
+def adjust(model, old=(), new=()):
+    # One venue or artist went from the `old` to the `new` genres (empty
+    # when created or deleted): moves the counts of the difference by one
+    # and commits.
+    old = {name for name in old or () if name}
+    new = {name for name in new or () if name}
+    column = getattr(Genre, COUNT_COLUMNS[model])
+    for names, step in ((new - old, 1), (old - new, -1)):
+        if names:
+            _ensure(names)
+            db.session.query(Genre).filter(Genre.name.in_(names)) \
+                .update({column: column + step}, synchronize_session=False)
+    db.session.commit()
+
+
+def refresh(models, names=None):
+    # Recounts the venues and/or artists of the given genres (every genre
+    # in the table and in GENRES when None) and commits.
+    stored = {genre.name: genre for genre in Genre.query}
+    names = set(stored) | set(GENRES) if names is None else {name for name in names if name}
+    for name in names:
+        genre = stored.get(name)
+        if genre is None:
+            genre = Genre(name=name, venue_count=0, artist_count=0)
+            db.session.add(genre)
+        for model in models:
+            setattr(genre, COUNT_COLUMNS[model], _count(model, name))
+    db.session.commit()
+    return len(names)
+
+
+def counts(model):
+    # [(name, count)] of the genres listed by at least one venue or artist,
+    # by name; one read of the genre table.
+    column = getattr(Genre, COUNT_COLUMNS[model])
+    return db.session.query(Genre.name, column).filter(column > 0).order_by(Genre.name).all()
+
+
+@click.command('rebuild-genre-counts')
+@with_appcontext
+def rebuild_command():
+    """Recount the venues and artists of every genre."""
+    click.echo(f'Recounted {refresh([Venue, Artist])} genres')
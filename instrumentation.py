@@ -0,0 +1,246 @@
+#----------------------------------------------------------------------------#
+# Request instrumentation.
+#
+# Every request is timed: its wall time, the number and total time of the
+# SQL statements it ran (SQLAlchemy cursor events) and the time spent
+# rendering templates. These are
+#   - sent back in a Server-Timing header (SERVER_TIMING), which browser dev
+#     tools show next to the request,
+#   - aggregated per route into Prometheus metrics served at /metrics
+#     (METRICS_ENABLED): a latency histogram per route, method and status,
+#     and query, database and template time counters per route. The
+#     metrics are kept per process, so scrape each worker. They are off
+#     in production unless enabled, and with METRICS_TOKEN set only served
+#     to requests carrying it as a bearer token.
+# Statements slower than SLOW_QUERY_MS, in requests or commands alike, are
+# logged with their text and the route running them; 0 disables.
+#----------------------------------------------------------------------------#
+
+import hmac
+import threading
+import time
+from flask import abort, current_app, g, has_app_context, has_request_context, request
+from jinja2 import Template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from extensions import cache, db
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+SLOW_QUERY_TEXT_LIMIT = 2000
+
+
+class RequestTiming(object):
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+
+def _timing():
+    # The timing of the current request, or None outside of one.
+    return g.get('request_timing') if has_request_context() else None
+
+
+def _route():
+    rule = request.url_rule if has_request_context() else None
+    return rule.rule if rule is not None else 'unmatched'
+
+#  SQL
+#  ----------------------------------------------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+    timing = _timing()
+    if timing is not None:
+        timing.queries += 1
+        timing.db_seconds += elapsed
+    if not has_app_context():
+        return
+    threshold = current_app.config.get('SLOW_QUERY_MS', 0)
+    if threshold and elapsed * 1000 >= threshold:
+        current_app.extensions['metrics'].slow_query()
+        route = _route() if has_request_context() else 'command'
+        current_app.logger.warning('Slow query (%.1f ms, %s): %s', elapsed * 1000, route,
+                                   ' '.join(statement.split())[:SLOW_QUERY_TEXT_LIMIT])
+
+
+def listen_for_queries():
+    # On the Engine class, so it covers engines Flask-SQLAlchemy creates
+    # later, on first use.
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+class QueryCounter(object):
+    # Counts statements sent to the app's database while active; used by
+    # the tests and the benchmarks.
+
+    def __init__(self):
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(db.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(db.engine, 'before_cursor_execute', self._count)
+
+#  Templates
+#  ----------------------------------------------------------------
+
+class TimedTemplate(Template):
+    # Flask's template signals need blinker; timing render() instead counts
+    # each page once, with the templates it extends and includes.
+
+    def render(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            timing = _timing()
+            if timing is not None:
+                timing.template_seconds += time.perf_counter() - start
+
+#  Metrics
+#  ----------------------------------------------------------------
+
+class Histogram(object):
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+
+
+def _labels(**labels):
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+class Metrics(object):
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.latency = {}
+        self.routes = {}
+        self.slow_queries = 0
+
+    def slow_query(self):
+        with self.lock:
+            self.slow_queries += 1
+
+    def observe(self, route, method, status, timing):
+        seconds = timing.elapsed()
+        with self.lock:
+            histogram = self.latency.get((route, method, status))
+            if histogram is None:
+                histogram = self.latency[(route, method, status)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            totals = self.routes.setdefault(route, [0, 0.0, 0.0])
+            totals[0] += timing.queries
+            totals[1] += timing.db_seconds
+            totals[2] += timing.template_seconds
+
+    def render(self, cache_stats=None):
+        # The Prometheus text exposition format.
+        lines = [
+            '# HELP fyyur_request_duration_seconds Request wall time.',
+            '# TYPE fyyur_request_duration_seconds histogram',
+        ]
+        with self.lock:
+            for (route, method, status), histogram in sorted(self.latency.items()):
+                labels = dict(route=route, method=method, status=status)
+                for bound, count in histogram.cumulative():
+                    lines.append(f'fyyur_request_duration_seconds_bucket{_labels(**labels, le=bound)} {count}')
+                lines.append(f'fyyur_request_duration_seconds_bucket{_labels(**labels, le="+Inf")} {histogram.count}')
+                lines.append(f'fyyur_request_duration_seconds_sum{_labels(**labels)} {histogram.sum}')
+                lines.append(f'fyyur_request_duration_seconds_count{_labels(**labels)} {histogram.count}')
+            for i, (name, help) in enumerate([
+                    ('fyyur_request_queries_total', 'SQL statements run by requests.'),
+                    ('fyyur_request_db_seconds_total', 'Time requests spent in SQL statements.'),
+                    ('fyyur_request_template_seconds_total', 'Time requests spent rendering templates.')]):
+                lines.append(f'# HELP {name} {help}')
+                lines.append(f'# TYPE {name} counter')
+                lines.extend(f'{name}{_labels(route=route)} {totals[i]}'
+                             for route, totals in sorted(self.routes.items()))
+            lines.append('# HELP fyyur_slow_queries_total SQL statements slower than SLOW_QUERY_MS.')
+            lines.append('# TYPE fyyur_slow_queries_total counter')
+            lines.append(f'fyyur_slow_queries_total {self.slow_queries}')
+        if cache_stats is not None:
+            backend = _labels(backend=cache_stats['backend'])
+            for name in ('hits', 'misses', 'sets', 'deletes'):
+                lines.append(f'# HELP fyyur_cache_{name}_total Application cache {name}.')
+                lines.append(f'# TYPE fyyur_cache_{name}_total counter')
+                lines.append(f'fyyur_cache_{name}_total{backend} {cache_stats[name]}')
+        return '\n'.join(lines) + '\n'
+
+#  Requests
+#  ----------------------------------------------------------------
+
+def _start_request():
+    g.request_timing = RequestTiming()
+
+
+def _finish_request(response):
+    timing = _timing()
+    if timing is None:
+        return response
+    current_app.extensions['metrics'].observe(_route(), request.method, response.status_code, timing)
+    if current_app.config.get('SERVER_TIMING'):
+        response.headers.add('Server-Timing', ', '.join([
+            f'app;dur={timing.elapsed() * 1000:.2f}',
+            f'db;dur={timing.db_seconds * 1000:.2f};desc="{timing.queries} queries"',
+            f'tpl;dur={timing.template_seconds * 1000:.2f}',
+        ]))
+    return response
+
+
+def metrics():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+            abort(401)
+    body = current_app.extensions['metrics'].render(cache.stats())
+    return current_app.response_class(body, content_type=METRICS_CONTENT_TYPE)
+
+
+def init_app(app):
+    listen_for_queries()
+    app.extensions['metrics'] = Metrics()
+    app.jinja_env.template_class = TimedTemplate
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    if app.config.get('METRICS_ENABLED'):
+        app.add_url_rule('/metrics', 'metrics', metrics)
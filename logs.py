@@ -0,0 +1,195 @@
+#----------------------------------------------------------------------------#
+# Logging.
+#
+# Request threads never write log records themselves. The app logger's only
+# handler (outside debug and testing) is a QueueHandler that stamps each
+# record with the id of its request and puts it on a bounded in-memory
+# queue. A QueueListener thread takes records off the queue and writes them
+# as JSON lines to LOG_FILE. When the queue is full, records are dropped and
+# counted rather than waited on. Repeats of one message are sampled: past
+# LOG_SAMPLE_LIMIT in LOG_SAMPLE_INTERVAL seconds they are dropped, and the
+# next one kept reports how many were.
+#
+# Every worker process appends to the same LOG_FILE, so none of them
+# rotates it: two workers rotating one file lose each other's records.
+# Rotate it outside the app, by size, with logrotate's default
+# create mode (not copytruncate); each worker reopens the file once it
+# has been moved away. For example:
+#
+#   /srv/fyyur/error.log {
+#       maxsize 10M
+#       rotate 5
+#       compress
+#       missingok
+#       notifempty
+#   }
+#
+# Every request gets an id, taken from a well-formed X-Request-ID header or
+# generated, and echoed in the response's X-Request-ID header, so a
+# response and its log lines can be matched up.
+#----------------------------------------------------------------------------#
+
+import atexit
+import copy
+import datetime
+import json
+import logging
+import queue
+import re
+import threading
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+from flask import g, has_request_context, request
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# Attributes of every LogRecord; anything else was passed in `extra` and is
+# written out as a field of its own.
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'request_id'}
+
+
+def request_id():
+    return g.get('request_id') if has_request_context() else None
+
+#  Records
+#  ----------------------------------------------------------------
+
+class JsonFormatter(logging.Formatter):
+    # One JSON object per line.
+
+    def format(self, record):
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc)
+                    .isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'location': f'{record.pathname}:{record.lineno}',
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        entry.update((key, value) for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES)
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    # Runs on the thread logging the record, where its request is current,
+    # and adds the request's id, method and path.
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = request_id()
+            record.method = request.method
+            record.path = request.path
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    # Keeps the first `limit` records of each message (logger, level and
+    # format string) per `interval` seconds; records of CRITICAL are always
+    # kept.
+
+    def __init__(self, limit, interval):
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.windows = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.CRITICAL:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self.lock:
+            start, seen, dropped = self.windows.get(key, (now, 0, 0))
+            if now - start >= self.interval:
+                start, seen = now, 0
+            if seen >= self.limit:
+                self.windows[key] = (start, seen, dropped + 1)
+                return False
+            self.windows[key] = (start, seen + 1, 0)
+        if dropped:
+            record.suppressed = dropped
+        return True
+
+#  Queue
+#  ----------------------------------------------------------------
+
+class NonBlockingQueueHandler(QueueHandler):
+    # Drops records when the queue is full instead of blocking or reporting
+    # the error on stderr, and counts them in `dropped`.
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The listener formats the record; only what cannot cross threads
+        # (the args and the traceback) is resolved here.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure(app):
+    # Replaces the app logger's handlers with the queue pipeline and starts
+    # its listener; returns the listener.
+    config = app.config
+    file_handler = WatchedFileHandler(config['LOG_FILE'], delay=True)
+    file_handler.setFormatter(JsonFormatter())
+    queue_handler = NonBlockingQueueHandler(queue.Queue(config['LOG_QUEUE_SIZE']))
+    if config['LOG_SAMPLE_LIMIT']:
+        queue_handler.addFilter(SamplingFilter(config['LOG_SAMPLE_LIMIT'], config['LOG_SAMPLE_INTERVAL']))
+    queue_handler.addFilter(RequestContextFilter())
+    listener = QueueListener(queue_handler.queue, file_handler, respect_handler_level=True)
+
+    app.logger.handlers[:] = [queue_handler]
+    app.logger.setLevel(config['LOG_LEVEL'])
+    app.logger.propagate = False
+    listener.start()
+    app.extensions['log_listener'] = listener
+    atexit.register(stop, app)
+    return listener
+
+
+def stop(app):
+    # Writes out the queued records and stops the listener.
+    listener = app.extensions.pop('log_listener', None)
+    if listener is not None:
+        listener.stop()
+
+#  Request ids
+#  ----------------------------------------------------------------
+
+def _assign_request_id():
+    supplied = request.headers.get(REQUEST_ID_HEADER, '')
+    g.request_id = supplied if REQUEST_ID_PATTERN.match(supplied) else uuid.uuid4().hex
+
+
+def _echo_request_id(response):
+    if request_id():
+        response.headers[REQUEST_ID_HEADER] = request_id()
+    return response
+
+
+def init_app(app):
+    app.before_request(_assign_request_id)
+    app.after_request(_echo_request_id)
+    if not app.debug and not app.testing:
+        configure(app)
@@ -0,0 +1,40 @@
+#----------------------------------------------------------------------------#
+# Home page, cache stats and error pages.
+#----------------------------------------------------------------------------#
+
+from flask import Blueprint, render_template, jsonify
+from extensions import db, cache
+from models import Venue, Artist
+
+bp = Blueprint('main', __name__)
+
+RECENT_VENUES_KEY = 'home:recent_venues'
+RECENT_ARTISTS_KEY = 'home:recent_artists'
+
+def recently_listed(model, limit=10):
+    rows = db.session.query(model.id, model.name, model.listed_at) \
+        .filter(model.listed_at != None) \
+        .order_by(model.listed_at.desc()).limit(limit).all()
+    return [{
+        'id': row.id,
+        'name': row.name,
+        'listed_at': row.listed_at.strftime("%Y-%m-%d")
+    } for row in rows]
+
+@bp.route('/')
+def index():
+    venues = cache.get_or_set(RECENT_VENUES_KEY, lambda: recently_listed(Venue))
+    artists = cache.get_or_set(RECENT_ARTISTS_KEY, lambda: recently_listed(Artist))
+    return render_template('pages/home.html', venues = venues, artists = artists)
+
+@bp.route('/cache/stats')
+def cache_stats():
+    return jsonify(cache.stats())
+
+@bp.app_errorhandler(404)
+def not_found_error(error):
+    return render_template('errors/404.html'), 404
+
+@bp.app_errorhandler(500)
+def server_error(error):
+    return render_template('errors/500.html'), 500
@@ -0,0 +1,30 @@
+"""artist availability search indexes
+
+Revision ID: 3a8e5b0d6f21
+Revises: 9c4f2d7a1e36
+Create Date: 2026-10-18 22:31:45.660192
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a8e5b0d6f21'
+down_revision = '9c4f2d7a1e36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_artist_genres', 'artist', ['genres'], unique=False, postgresql_using='gin')
+    # Artists of a city in the name order of the listings.
+    op.create_index('ix_artist_city_name', 'artist',
+                    ['city', sa.text("coalesce(name, '')"), 'id'], unique=False)
+    op.create_index('ix_artist_availability', 'artist', ['available_from', 'available_to'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_artist_availability', table_name='artist')
+    op.drop_index('ix_artist_city_name', table_name='artist')
+    op.drop_index('ix_artist_genres', table_name='artist')
@@ -0,0 +1,41 @@
+"""search trigram indexes
+
+Revision ID: 6f2d1c8a9b47
+Revises: a3111435bbba
+Create Date: 2026-10-18 18:40:12.518204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '6f2d1c8a9b47'
+down_revision = 'a3111435bbba'
+branch_labels = None
+depends_on = None
+
+SEARCH_INDEXES = [
+    ('ix_venue_name_trgm', 'venue', 'name'),
+    ('ix_venue_city_trgm', 'venue', 'city'),
+    ('ix_venue_state_trgm', 'venue', 'state'),
+    ('ix_artist_name_trgm', 'artist', 'name'),
+    ('ix_artist_city_trgm', 'artist', 'city'),
+    ('ix_artist_state_trgm', 'artist', 'state'),
+]
+
+
+def upgrade():
+    # GIN trigram indexes let Postgres answer ILIKE '%term%' without a
+    # sequential scan. Other backends get plain indexes, as declared by
+    # models.trigram_index, and search with search.NgramIndex instead.
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in SEARCH_INDEXES:
+        op.create_index(name, table, [column], unique=False,
+                        postgresql_using='gin',
+                        postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade():
+    for name, table, column in SEARCH_INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,47 @@
+"""show counters on venue and artist
+
+Revision ID: 7d3e0a6b5c12
+Revises: 2b7f4e19c6d3
+Create Date: 2026-10-18 20:14:37.518204
+
+"""
+import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3e0a6b5c12'
+down_revision = '2b7f4e19c6d3'
+branch_labels = None
+depends_on = None
+
+BACKFILL = """
+UPDATE {table} SET
+    upcoming_shows_count = (SELECT count(*) FROM show
+                            WHERE show.{table}_id = {table}.id AND show.start_time >= :now),
+    past_shows_count = (SELECT count(*) FROM show
+                        WHERE show.{table}_id = {table}.id AND show.start_time < :now),
+    next_show_time = (SELECT min(show.start_time) FROM show
+                      WHERE show.{table}_id = {table}.id AND show.start_time >= :now)
+"""
+
+
+def upgrade():
+    now = datetime.datetime.now()
+    for table in ('venue', 'artist'):
+        op.add_column(table, sa.Column('upcoming_shows_count', sa.Integer(), server_default='0', nullable=False))
+        op.add_column(table, sa.Column('past_shows_count', sa.Integer(), server_default='0', nullable=False))
+        op.add_column(table, sa.Column('next_show_time', sa.DateTime(), nullable=True))
+        op.create_index(op.f(f'ix_{table}_next_show_time'), table, ['next_show_time'], unique=False)
+        op.create_index(f'ix_{table}_activity', table, ['upcoming_shows_count', 'id'], unique=False)
+        op.execute(sa.text(BACKFILL.format(table=table)).bindparams(now=now))
+
+
+def downgrade():
+    for table in ('artist', 'venue'):
+        op.drop_index(f'ix_{table}_activity', table_name=table)
+        op.drop_index(op.f(f'ix_{table}_next_show_time'), table_name=table)
+        op.drop_column(table, 'next_show_time')
+        op.drop_column(table, 'past_shows_count')
+        op.drop_column(table, 'upcoming_shows_count')
@@ -0,0 +1,58 @@
+"""show end time and overlap constraints
+
+Revision ID: 9c4f2d7a1e36
+Revises: e58a1c0f4b7d
+Create Date: 2026-10-18 21:47:09.204815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4f2d7a1e36'
+down_revision = 'e58a1c0f4b7d'
+branch_labels = None
+depends_on = None
+
+# Existing shows get BACKFILL_MINUTES, the SHOW_DEFAULT_DURATION default
+# that scheduling.end_time_for gives new shows. It is fixed on purpose: the
+# backfilled end times are data, and must not change with the config live
+# at upgrade time. With another SHOW_DEFAULT_DURATION, the shows listed
+# before this upgrade keep 2 hour runs in the overlap checks.
+BACKFILL_MINUTES = 120
+BACKFILL = {
+    'postgresql': f"UPDATE show SET end_time = start_time + interval '{BACKFILL_MINUTES} minutes'",
+    'sqlite': f"UPDATE show SET end_time = datetime(start_time, '+{BACKFILL_MINUTES} minutes')",
+}
+
+# Shows overlapping an existing booking of their venue or artist fail the
+# upgrade; move or shorten them first.
+EXCLUSIONS = {
+    'ex_show_venue_overlap': 'venue_id',
+    'ex_show_artist_overlap': 'artist_id',
+}
+
+
+def upgrade():
+    dialect = op.get_context().dialect.name
+    op.add_column('show', sa.Column('end_time', sa.DateTime(), nullable=True))
+    op.execute(BACKFILL.get(dialect, BACKFILL['postgresql']))
+    with op.batch_alter_table('show') as batch_op:
+        batch_op.alter_column('end_time', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_check_constraint('ck_show_time_order', 'end_time > start_time')
+
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        for name, column in EXCLUSIONS.items():
+            op.execute(f'ALTER TABLE show ADD CONSTRAINT {name} '
+                       f'EXCLUDE USING gist ({column} WITH =, tsrange(start_time, end_time) WITH &&)')
+
+
+def downgrade():
+    if op.get_context().dialect.name == 'postgresql':
+        for name in EXCLUSIONS:
+            op.execute(f'ALTER TABLE show DROP CONSTRAINT {name}')
+    with op.batch_alter_table('show') as batch_op:
+        batch_op.drop_constraint('ck_show_time_order', type_='check')
+        batch_op.drop_column('end_time')
@@ -0,0 +1,54 @@
+"""genre lookup with venue and artist counts
+
+Revision ID: b61d0e9c3a47
+Revises: 3a8e5b0d6f21
+Create Date: 2026-10-18 23:18:20.913456
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b61d0e9c3a47'
+down_revision = '3a8e5b0d6f21'
+branch_labels = None
+depends_on = None
+
+# One (row, genre) pair per distinct genre of every venue and artist.
+ELEMENTS = {
+    'postgresql': "SELECT DISTINCT {table}.id, g.name FROM {table}, unnest({table}.genres) AS g(name)",
+    'sqlite': "SELECT DISTINCT {table}.id, g.value AS name FROM {table}, json_each({table}.genres) AS g",
+}
+
+BACKFILL = """
+    INSERT INTO genre (name, venue_count, artist_count)
+    SELECT name, sum(venue), sum(artist) FROM (
+        SELECT name, 1 AS venue, 0 AS artist FROM ({venues}) venue_genres
+        UNION ALL
+        SELECT name, 0 AS venue, 1 AS artist FROM ({artists}) artist_genres
+    ) listed
+    WHERE name IS NOT NULL AND name <> ''
+    GROUP BY name
+"""
+
+
+def upgrade():
+    op.create_table('genre',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.Column('venue_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('artist_count', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index('ix_venue_genres', 'venue', ['genres'], unique=False, postgresql_using='gin')
+
+    elements = ELEMENTS.get(op.get_context().dialect.name, ELEMENTS['postgresql'])
+    op.execute(BACKFILL.format(venues=elements.format(table='venue'),
+                               artists=elements.format(table='artist')))
+
+
+def downgrade():
+    op.drop_index('ix_venue_genres', table_name='venue')
+    op.drop_table('genre')
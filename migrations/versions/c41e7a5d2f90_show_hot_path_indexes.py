@@ -0,0 +1,42 @@
+"""show hot path indexes
+
+Revision ID: c41e7a5d2f90
+Revises: 6f2d1c8a9b47
+Create Date: 2026-10-18 19:05:47.201356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e7a5d2f90'
+down_revision = '6f2d1c8a9b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Detail pages filter shows on (venue_id, start_time) or
+    # (artist_id, start_time); /shows pages on (start_time, id).
+    op.create_index('ix_show_venue_id_start_time', 'show', ['venue_id', 'start_time'], unique=False)
+    op.create_index('ix_show_artist_id_start_time', 'show', ['artist_id', 'start_time'], unique=False)
+    op.create_index('ix_show_start_time_id', 'show', ['start_time', 'id'], unique=False)
+    # Recently listed venues and artists on the home page.
+    op.create_index(op.f('ix_venue_listed_at'), 'venue', ['listed_at'], unique=False)
+    op.create_index(op.f('ix_artist_listed_at'), 'artist', ['listed_at'], unique=False)
+    # Sort keys of the paginated /venues and /artists listings.
+    op.create_index('ix_venue_directory', 'venue',
+                    [sa.text("coalesce(city, '') DESC"), sa.text("coalesce(state, '')"), 'id'], unique=False)
+    op.create_index('ix_artist_sort_name', 'artist',
+                    [sa.text("coalesce(name, '')"), 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_artist_sort_name', table_name='artist')
+    op.drop_index('ix_venue_directory', table_name='venue')
+    op.drop_index(op.f('ix_artist_listed_at'), table_name='artist')
+    op.drop_index(op.f('ix_venue_listed_at'), table_name='venue')
+    op.drop_index('ix_show_start_time_id', table_name='show')
+    op.drop_index('ix_show_artist_id_start_time', table_name='show')
+    op.drop_index('ix_show_venue_id_start_time', table_name='show')
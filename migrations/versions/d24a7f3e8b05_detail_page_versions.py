@@ -0,0 +1,30 @@
+"""updated_at on venue and artist
+
+Revision ID: d24a7f3e8b05
+Revises: b61d0e9c3a47
+Create Date: 2026-10-18 23:52:36.118027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd24a7f3e8b05'
+down_revision = 'b61d0e9c3a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('venue', 'artist'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(f'UPDATE {table} SET updated_at = coalesce(listed_at, CURRENT_TIMESTAMP)')
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for table in ('artist', 'venue'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,71 @@
+"""venue area summary
+
+Revision ID: e58a1c0f4b7d
+Revises: 7d3e0a6b5c12
+Create Date: 2026-10-18 21:02:51.377410
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e58a1c0f4b7d'
+down_revision = '7d3e0a6b5c12'
+branch_labels = None
+depends_on = None
+
+# Areas keep their first PREVIEW venues by id, as areas.py does. The size is
+# fixed here, at the VENUE_AREA_PREVIEW default, so the upgrade does not
+# depend on the app's config; with another VENUE_AREA_PREVIEW, run
+# `flask rebuild-venue-areas` after upgrading.
+PREVIEW = 10
+RANKED = """
+    SELECT coalesce(city, '') AS city, coalesce(state, '') AS state, id, name, upcoming_shows_count,
+           row_number() OVER (PARTITION BY coalesce(city, ''), coalesce(state, '') ORDER BY id) AS position,
+           count(*) OVER (PARTITION BY coalesce(city, ''), coalesce(state, '')) AS total
+    FROM venue
+"""
+
+BACKFILL = {
+    'postgresql': """
+        INSERT INTO venue_area (city, state, venue_count, venues)
+        SELECT city, state, max(total),
+               json_agg(json_build_object('id', id, 'name', name,
+                                          'num_upcoming_shows', upcoming_shows_count) ORDER BY id)
+        FROM (%s) ranked
+        WHERE position <= %d
+        GROUP BY city, state
+    """ % (RANKED, PREVIEW),
+    'sqlite': """
+        INSERT INTO venue_area (city, state, venue_count, venues)
+        SELECT city, state, max(total),
+               json_group_array(json_object('id', id, 'name', name,
+                                            'num_upcoming_shows', upcoming_shows_count))
+        FROM (%s ORDER BY 1, 2, id) ranked
+        WHERE position <= %d
+        GROUP BY city, state
+    """ % (RANKED, PREVIEW),
+}
+
+
+def upgrade():
+    op.create_table('venue_area',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('city', sa.String(length=120), nullable=False),
+    sa.Column('state', sa.String(length=120), nullable=False),
+    sa.Column('venue_count', sa.Integer(), nullable=False),
+    sa.Column('venues', sa.JSON(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_venue_area_directory', 'venue_area',
+                    [sa.text('city DESC'), 'state'], unique=True)
+    # Other backends: run `flask rebuild-venue-areas` after upgrading.
+    backfill = BACKFILL.get(op.get_context().dialect.name)
+    if backfill:
+        op.execute(backfill)
+
+
+def downgrade():
+    op.drop_index('ix_venue_area_directory', table_name='venue_area')
+    op.drop_table('venue_area')
@@ -0,0 +1,37 @@
+"""name prefix indexes
+
+Revision ID: f3b8d2c6a419
+Revises: d24a7f3e8b05
+Create Date: 2026-10-19 00:31:09.630572
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8d2c6a419'
+down_revision = 'd24a7f3e8b05'
+branch_labels = None
+depends_on = None
+
+PREFIX_INDEXES = [
+    ('ix_venue_name_prefix', 'venue'),
+    ('ix_artist_name_prefix', 'artist'),
+]
+
+
+def upgrade():
+    # Autocomplete (autocomplete.py) scans lower(name) from the typed prefix
+    # in index order. On Postgres the "C" collation makes the order
+    # byte-wise, so the range covers exactly the names with that prefix and
+    # the same index serves LIKE 'prefix%' as text_pattern_ops would, and
+    # ORDER BY too; SQLite compares byte-wise already.
+    collation = ' COLLATE "C"' if op.get_bind().dialect.name == 'postgresql' else ''
+    for name, table in PREFIX_INDEXES:
+        op.create_index(name, table, [sa.text(f'lower(name){collation}'), 'id'], unique=False)
+
+
+def downgrade():
+    for name, table in PREFIX_INDEXES:
+        op.drop_index(name, table_name=table)
@@ -1,8 +1,53 @@
-from app import db
+from extensions import db
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement
 import datetime
 
+def sort_text(column):
+    # coalesce(column, '') with the '' inlined rather than bound, so queries
+    # ordering or filtering on it match the expression indexes at the end of
+    # this module; SQLite will not use them for a bound ''.
+    return db.func.coalesce(column, db.literal_column("''"))
+
+class ByteOrder(ColumnElement):
+    # `element` compared byte by byte: in the "C" collation on Postgres, as
+    # is elsewhere (SQLite's default BINARY collation already is).
+
+    def __init__(self, element):
+        self.element = element
+        self.type = element.type
+
+    def get_children(self, **kwargs):
+        return [self.element]
+
+@compiles(ByteOrder)
+def _compile_byte_order(element, compiler, **kwargs):
+    return compiler.process(element.element, **kwargs)
+
+@compiles(ByteOrder, 'postgresql')
+def _compile_byte_order_postgresql(element, compiler, **kwargs):
+    return compiler.process(element.element, **kwargs) + ' COLLATE "C"'
+
+def name_prefix_key(column):
+    # lower(column) in byte order, the key of the autocomplete prefix
+    # indexes at the end of this module.
+    return ByteOrder(db.func.lower(column))
+
+def trigram_index(table, column):
+    # GIN pg_trgm index backing search.py; a plain index on other backends.
+    return db.Index(f'ix_{table}_{column}_trgm', column,
+                    postgresql_using='gin',
+                    postgresql_ops={column: 'gin_trgm_ops'})
+
 class Venue(db.Model):
     __tablename__ = 'venue'
+    __table_args__ = (
+        trigram_index('venue', 'name'),
+        trigram_index('venue', 'city'),
+        trigram_index('venue', 'state'),
+        db.Index('ix_venue_activity', 'upcoming_shows_count', 'id'),
+        db.Index('ix_venue_genres', 'genres', postgresql_using='gin'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String)
@@ -13,10 +58,17 @@ class Venue(db.Model):
     image_link = db.Column(db.String(1000))
     facebook_link = db.Column(db.String(120))
     website = db.Column(db.String(500))
-    genres = db.Column(db.ARRAY(db.String(120)))
+    genres = db.Column(db.ARRAY(db.String(120)).with_variant(db.JSON(), 'sqlite'))
     seeking_talent = db.Column(db.Boolean, nullable=False, default=False)
     seeking_description = db.Column(db.String(180))
-    listed_at = db.Column(db.DateTime, default=datetime.datetime.now())
+    listed_at = db.Column(db.DateTime, default=datetime.datetime.now(), index=True)
+    # Maintained by counters.py.
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    past_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    next_show_time = db.Column(db.DateTime, index=True)
+    # Version of the detail page (page_cache.py); bumped on every update,
+    # including the show counter recounts.
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.now, onupdate=datetime.datetime.now)
     
     shows = db.relationship('Show', backref='venues', lazy=True)
     
@@ -27,6 +79,16 @@ class Venue(db.Model):
     
 class Artist(db.Model):
     __tablename__ = 'artist'
+    __table_args__ = (
+        trigram_index('artist', 'name'),
+        trigram_index('artist', 'city'),
+        trigram_index('artist', 'state'),
+        db.Index('ix_artist_activity', 'upcoming_shows_count', 'id'),
+        # Availability search (scheduling.available_artists), along with
+        # ix_artist_city_name below.
+        db.Index('ix_artist_genres', 'genres', postgresql_using='gin'),
+        db.Index('ix_artist_availability', 'available_from', 'available_to'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String)
@@ -36,14 +98,21 @@ class Artist(db.Model):
     image_link = db.Column(db.String(1000))
     facebook_link = db.Column(db.String(120))
     website = db.Column(db.String(250))
-    genres = db.Column(db.ARRAY(db.String(120)))
+    genres = db.Column(db.ARRAY(db.String(120)).with_variant(db.JSON(), 'sqlite'))
     seeking_venue = db.Column(db.Boolean, default=False, nullable=False)
     seeking_description = db.Column(db.String(120))
     shows = db.relationship('Show', backref='artists', lazy=True)
-    listed_at = db.Column(db.DateTime, default=datetime.datetime.now())
+    listed_at = db.Column(db.DateTime, default=datetime.datetime.now(), index=True)
     lists_available = db.Column(db.Boolean, default=False)
     available_from = db.Column(db.DateTime)
     available_to = db.Column(db.DateTime)
+    # Maintained by counters.py.
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    past_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    next_show_time = db.Column(db.DateTime, index=True)
+    # Version of the detail page (page_cache.py); bumped on every update,
+    # including the show counter recounts.
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.now, onupdate=datetime.datetime.now)
 
 
 
@@ -52,14 +121,76 @@ class Artist(db.Model):
       return f'<artists {self.id} {self.name}>'
 
 class Show(db.Model):
+  # A show occupies its venue and artist over [start_time, end_time). On
+  # Postgres the migration adds exclusion constraints (ex_show_venue_overlap,
+  # ex_show_artist_overlap) so overlapping bookings are rejected by the
+  # database itself; scheduling.py checks for them up front on any backend.
   __tablename__ = 'show'
+  __table_args__ = (
+    db.Index('ix_show_venue_id_start_time', 'venue_id', 'start_time'),
+    db.Index('ix_show_artist_id_start_time', 'artist_id', 'start_time'),
+    db.Index('ix_show_start_time_id', 'start_time', 'id'),
+    db.CheckConstraint('end_time > start_time', name='ck_show_time_order'),
+  )
 
   id = db.Column(db.Integer, primary_key=True)
   start_time = db.Column(db.DateTime, nullable=False)
+  end_time = db.Column(db.DateTime, nullable=False)
   artist_id = db.Column(db.Integer, db.ForeignKey('artist.id'), nullable=False)
   venue_id = db.Column(db.Integer, db.ForeignKey('venue.id'), nullable=False)
   venue = db.relationship('Venue', backref='shows_venue', lazy=True)
   artist = db.relationship('Artist', backref='shows_artist', lazy=True)
 
   def __repr__(self):
-    return f'<shows {self.artist_id} {self.venue_id}>'
\ No newline at end of file
+    return f'<shows {self.artist_id} {self.venue_id}>'
+
+class VenueArea(db.Model):
+  # Summary of the venue directory, one row per (city, state); maintained
+  # by areas.py. Missing cities and states are stored as ''.
+  __tablename__ = 'venue_area'
+  __table_args__ = (
+    db.Index('ix_venue_area_directory', db.desc('city'), 'state', unique=True),
+  )
+
+  id = db.Column(db.Integer, primary_key=True)
+  city = db.Column(db.String(120), nullable=False)
+  state = db.Column(db.String(120), nullable=False)
+  venue_count = db.Column(db.Integer, nullable=False)
+  # The first VENUE_AREA_PREVIEW (10 by default) venues by id,
+  # [{'id', 'name', 'num_upcoming_shows'}, ...].
+  venues = db.Column(db.JSON, nullable=False)
+
+  def __repr__(self):
+    return f'<venue_area {self.city}, {self.state}>'
+
+class Genre(db.Model):
+  # Genre lookup with the number of venues and artists listing each;
+  # maintained by genres.py.
+  __tablename__ = 'genre'
+
+  id = db.Column(db.Integer, primary_key=True)
+  name = db.Column(db.String(120), nullable=False, unique=True)
+  venue_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+  artist_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+  def __repr__(self):
+    return f'<genre {self.name}>'
+
+class WebSession(db.Model):
+  # Server-side session data for SESSION_BACKEND = 'sql' (see sessions.py).
+  __tablename__ = 'web_session'
+
+  id = db.Column(db.String(255), primary_key=True)
+  data = db.Column(db.LargeBinary, nullable=False)
+  expires_at = db.Column(db.DateTime, index=True)
+
+  def __repr__(self):
+    return f'<web_session {self.id}>'
+
+# Sort keys of the keyset-paginated listings and the availability search.
+db.Index('ix_venue_directory', sort_text(Venue.city).desc(), sort_text(Venue.state), Venue.id)
+db.Index('ix_artist_sort_name', sort_text(Artist.name), Artist.id)
+db.Index('ix_artist_city_name', Artist.city, sort_text(Artist.name), Artist.id)
+# Name autocomplete (autocomplete.py).
+db.Index('ix_venue_name_prefix', name_prefix_key(Venue.name), Venue.id)
+db.Index('ix_artist_name_prefix', name_prefix_key(Artist.name), Artist.id)
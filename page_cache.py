@@ -0,0 +1,95 @@
+#----------------------------------------------------------------------------#
+# HTTP caching of the venue and artist detail pages.
+#
+# Every venue and artist row has a version: its updated_at, which the edit
+# handlers and the show counters (counters.py) bump whenever the page would
+# change, or the start of its next show once that has passed, since the page
+# then lists the show as past before the rollover job bumps updated_at.
+# Edits of a venue or artist also bump the rows whose pages list its shows
+# (touch_related). Detail pages wrapped in cached_detail():
+#   - carry an ETag and Last-Modified made from the version and answer
+#     If-None-Match / If-Modified-Since with 304 after reading just those
+#     two columns, without loading the row through the ORM,
+#   - are kept whole in the app cache for requests without a session cookie
+#     (anonymous traffic, which never sees flashed messages), keyed by id and
+#     version, for PAGE_CACHE_TTL seconds; 0 disables this part.
+#----------------------------------------------------------------------------#
+
+import datetime
+import functools
+from flask import current_app, request, make_response
+from werkzeug.http import is_resource_modified
+from sqlalchemy import select
+from extensions import db, cache
+
+
+def version(model, object_id, now=None):
+    # The time the page of the given row last changed, or None without a row.
+    row = db.session.query(model.updated_at, model.next_show_time) \
+        .filter(model.id == object_id).first()
+    if row is None:
+        return None
+    updated_at, next_show_time = row
+    now = now or datetime.datetime.now()
+    if next_show_time is not None and updated_at < next_show_time <= now:
+        return next_show_time
+    return updated_at
+
+
+def http_time(stamp):
+    # Stored times are local; HTTP dates are GMT, which Werkzeug handles as
+    # naive UTC datetimes.
+    return stamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def touch_related(model, foreign_key, where):
+    # Bumps the version of the rows whose pages list shows matching `where`,
+    # e.g. the venues an edited artist plays at, and commits.
+    played = select([foreign_key]).where(where)
+    db.session.execute(model.__table__.update().where(model.id.in_(played))
+                       .values(updated_at=datetime.datetime.now()))
+    db.session.commit()
+
+
+def _is_anonymous():
+    return current_app.session_cookie_name not in request.cookies
+
+
+def cached_detail(model):
+    # Decorates a view taking the row id as its only argument.
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**kwargs):
+            object_id, = kwargs.values()
+            stamp = version(model, object_id)
+            if stamp is None:
+                return view(**kwargs)
+            etag = f'{model.__tablename__}-{object_id}-{stamp:%Y%m%d%H%M%S%f}'
+            last_modified = http_time(stamp)
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = _page(view, kwargs, etag)
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            response.vary.add('Cookie')
+            return response
+        return wrapper
+    return decorator
+
+
+def _page(view, kwargs, etag):
+    ttl = current_app.config.get('PAGE_CACHE_TTL', 0)
+    if not ttl or not _is_anonymous():
+        return make_response(view(**kwargs))
+    key = f'page:{etag}'
+    body = cache.get(key)
+    if body is not None:
+        return current_app.response_class(body, mimetype='text/html')
+    response = make_response(view(**kwargs))
+    if response.status_code == 200:
+        cache.set(key, response.get_data(), ttl)
+    return response
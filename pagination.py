@@ -0,0 +1,133 @@
+#----------------------------------------------------------------------------#
+# Keyset pagination.
+#
+# Listings are paged on their sort key instead of OFFSET: a cursor carries
+# the key of the last (or first) row shown and the next page is fetched with
+# a WHERE on that key, so every page costs the same index range scan however
+# deep it is.
+#----------------------------------------------------------------------------#
+
+import base64
+import datetime
+import json
+from flask import current_app, request, abort
+from sqlalchemy import and_, or_
+
+
+class Page(object):
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None, limit=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.limit = limit
+
+
+#  Cursors
+#  ----------------------------------------------------------------
+
+def _dump_value(value):
+    if isinstance(value, datetime.datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict):
+        return datetime.datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(values, direction):
+    payload = json.dumps({'d': direction, 'k': [_dump_value(v) for v in values]},
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    # Returns (values, direction) or raises ValueError for a bad token.
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload['d']
+        values = [_load_value(v) for v in payload['k']]
+    except (TypeError, KeyError, json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f'Invalid cursor: {e}')
+    if direction not in ('next', 'prev'):
+        raise ValueError(f'Invalid cursor direction: {direction}')
+    return values, direction
+
+
+#  Queries
+#  ----------------------------------------------------------------
+
+def _after(keys, values, reverse):
+    # Rows strictly after `values` in the order given by `keys`, or strictly
+    # before them when `reverse` is set. Written as an OR of prefix matches
+    # so mixed ASC/DESC keys work on every backend, plus an inclusive bound
+    # on the leading key so the planner can turn it into an index range scan.
+    clauses = []
+    bound = None
+    for i, (expression, descending) in enumerate(keys):
+        forward = descending == reverse
+        step = expression > values[i] if forward else expression < values[i]
+        clauses.append(and_(*[keys[j][0] == values[j] for j in range(i)], step))
+        if i == 0:
+            bound = expression >= values[i] if forward else expression <= values[i]
+    return and_(bound, or_(*clauses))
+
+
+def keyset_page(query, keys, cursor=None, limit=None):
+    # `keys` is a list of (expression, descending) pairs that together form
+    # a unique ordering, ending with the primary key. The key values are
+    # added to each row as sort_key_<n> columns.
+    labels = [f'sort_key_{i}' for i in range(len(keys))]
+    query = query.add_columns(*[expression.label(label)
+                                for label, (expression, descending) in zip(labels, keys)])
+
+    direction = 'next'
+    if cursor:
+        values, direction = cursor
+        if len(values) != len(keys):
+            raise ValueError('Cursor does not match this listing')
+        query = query.filter(_after(keys, values, reverse=direction == 'prev'))
+
+    reverse = direction == 'prev'
+    query = query.order_by(*[
+        expression.desc() if descending != reverse else expression.asc()
+        for expression, descending in keys
+    ])
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if reverse:
+        rows.reverse()
+
+    def cursor_for(row, direction):
+        return encode_cursor([getattr(row, label) for label in labels], direction)
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if (not reverse and has_more) or (reverse and cursor):
+            next_cursor = cursor_for(rows[-1], 'next')
+        if (not reverse and cursor) or (reverse and has_more):
+            prev_cursor = cursor_for(rows[0], 'prev')
+    return Page(rows, next_cursor, prev_cursor, limit)
+
+
+def paginate(query, keys):
+    # Reads ?cursor= and ?limit= from the current request.
+    default = current_app.config.get('PAGE_SIZE', 50)
+    maximum = current_app.config.get('PAGE_SIZE_MAX', 200)
+    try:
+        limit = int(request.args.get('limit', default))
+    except ValueError:
+        abort(400)
+    limit = max(1, min(limit, maximum))
+
+    token = request.args.get('cursor')
+    try:
+        cursor = decode_cursor(token) if token else None
+        return keyset_page(query, keys, cursor, limit)
+    except ValueError:
+        abort(400)
@@ -0,0 +1,159 @@
+#----------------------------------------------------------------------------#
+# Show scheduling.
+#
+# A show books its venue and its artist over [start_time, end_time); two
+# shows conflict when they share either and their ranges overlap. Shows are
+# at most MAX_DURATION long, so every show overlapping [start, end) starts
+# inside (start - MAX_DURATION, end) and a conflict check is one short range
+# scan per resource on ix_show_<venue|artist>_id_start_time, whatever the
+# size of the show table:
+#   - the create page and GET /api/v1/shows/conflicts call conflicts(),
+#   - tour bookings and bulk imports check their dates against each other
+#     (overlapping_pairs) and against the table with batch_conflicts(), which
+#     ORs the same scans for up to BATCH_CONFLICT_CHUNK dates into one query,
+#   - the availability search (GET /api/v1/artists/available) drops artists
+#     with a show in the window through the same scan, per candidate.
+# On Postgres the exclusion constraints on show back this up for writes that
+# race past the check.
+#----------------------------------------------------------------------------#
+
+import datetime
+from flask import current_app
+from sqlalchemy import and_, or_, exists
+from extensions import db
+from models import Artist, Show
+import genres
+
+MAX_DURATION_MINUTES = 24 * 60
+MAX_DURATION = datetime.timedelta(minutes=MAX_DURATION_MINUTES)
+
+CONFLICT_COLUMNS = [Show.id, Show.venue_id, Show.artist_id, Show.start_time, Show.end_time]
+# Two scans per date; keeps the OR well inside SQLite's expression depth.
+BATCH_CONFLICT_CHUNK = 100
+
+
+def end_time_for(start_time, duration=None):
+    # The end of a show starting at start_time and running `duration`
+    # minutes, SHOW_DEFAULT_DURATION when not given.
+    if duration is None:
+        duration = current_app.config.get('SHOW_DEFAULT_DURATION', 120)
+    length = datetime.timedelta(minutes=duration)
+    if not datetime.timedelta(0) < length <= MAX_DURATION:
+        raise ValueError(f'A show must run between 1 and {MAX_DURATION_MINUTES} minutes')
+    return start_time + length
+
+
+def overlapping(start_time, end_time):
+    # Shows overlapping [start_time, end_time). The lower bound on
+    # start_time is implied by the last condition but keeps the scan short.
+    return and_(Show.start_time > start_time - MAX_DURATION,
+                Show.start_time < end_time,
+                Show.end_time > start_time)
+
+
+def conflicts(start_time, end_time, venue_id=None, artist_id=None, exclude_id=None, limit=10):
+    # Shows booking the venue or the artist during [start_time, end_time),
+    # as dicts with the resource ('venue' or 'artist') they clash on.
+    found = []
+    for resource, column, value in (('venue', Show.venue_id, venue_id),
+                                    ('artist', Show.artist_id, artist_id)):
+        if value is None:
+            continue
+        query = db.session.query(*CONFLICT_COLUMNS) \
+            .filter(column == value, overlapping(start_time, end_time))
+        if exclude_id is not None:
+            query = query.filter(Show.id != exclude_id)
+        found.extend(_conflict(resource, row) for row in query.order_by(Show.start_time).limit(limit))
+    return found
+
+
+def _conflict(resource, row):
+    return {
+        'resource': resource,
+        'id': row.id,
+        'venue_id': row.venue_id,
+        'artist_id': row.artist_id,
+        'start_time': row.start_time,
+        'end_time': row.end_time,
+    }
+
+
+def batch_conflicts(bookings):
+    # bookings are (key, venue_id, artist_id, start_time, end_time); returns
+    # {key: the first show the booking would overlap, as in conflicts()} for
+    # the bookings that clash.
+    found = {}
+    for offset in range(0, len(bookings), BATCH_CONFLICT_CHUNK):
+        chunk = bookings[offset:offset + BATCH_CONFLICT_CHUNK]
+        conditions = []
+        for key, venue_id, artist_id, start_time, end_time in chunk:
+            window = overlapping(start_time, end_time)
+            if venue_id is not None:
+                conditions.append(and_(Show.venue_id == venue_id, window))
+            if artist_id is not None:
+                conditions.append(and_(Show.artist_id == artist_id, window))
+        if not conditions:
+            continue
+        rows = db.session.query(*CONFLICT_COLUMNS).filter(or_(*conditions)).order_by(Show.start_time).all()
+        for key, venue_id, artist_id, start_time, end_time in chunk:
+            for row in rows:
+                if row.start_time < end_time and row.end_time > start_time:
+                    if row.venue_id == venue_id:
+                        found[key] = _conflict('venue', row)
+                        break
+                    if row.artist_id == artist_id:
+                        found[key] = _conflict('artist', row)
+                        break
+    return found
+
+
+def describe(conflict):
+    return (f"The {conflict['resource']} already has a show from "
+            f"{conflict['start_time']:%Y-%m-%d %H:%M} to {conflict['end_time']:%Y-%m-%d %H:%M}")
+
+
+def overlapping_pairs(slots):
+    # slots are (key, resource id, start_time, end_time) for one resource;
+    # yields (key, other key) for every slot overlapping an earlier one.
+    # Sorting by resource and start makes it one sweep keeping the latest
+    # end seen per resource.
+    current, latest_end, latest_key = None, None, None
+    for key, resource, start_time, end_time in sorted(slots, key=lambda slot: (slot[1], slot[2])):
+        if resource != current:
+            current, latest_end, latest_key = resource, None, None
+        if latest_end is not None and start_time < latest_end:
+            yield key, latest_key
+        if latest_end is None or end_time > latest_end:
+            latest_end, latest_key = end_time, key
+
+
+def within_availability(start_time, end_time):
+    # Artists listing no availability, or one covering [start_time, end_time].
+    return or_(Artist.lists_available.isnot(True),
+               and_(Artist.available_from <= start_time, Artist.available_to >= end_time))
+
+
+def is_within_availability(artist, start_time, end_time):
+    # within_availability() for a loaded artist (or a row with its
+    # lists_available, available_from and available_to).
+    if not artist.lists_available:
+        return True
+    return artist.available_from is not None and artist.available_to is not None \
+        and artist.available_from <= start_time and end_time <= artist.available_to
+
+
+def available_artists(query, start_time, end_time, genre=None, city=None, state=None):
+    # Narrows an artist query to the artists free over [start_time,
+    # end_time): within their listed availability, if they list one, and
+    # without a show overlapping the window. genre, city and state are
+    # matched exactly and use ix_artist_genres and ix_artist_city_name.
+    query = query.filter(
+        within_availability(start_time, end_time),
+        ~exists().where(and_(Show.artist_id == Artist.id, overlapping(start_time, end_time))))
+    if genre:
+        query = query.filter(genres.has_genre(Artist.genres, genre))
+    if city:
+        query = query.filter(Artist.city == city)
+    if state:
+        query = query.filter(Artist.state == state)
+    return query
@@ -0,0 +1,265 @@
+#----------------------------------------------------------------------------#
+# Venue and artist search.
+#
+# Searches match a term against name, city and state. On Postgres the
+# pg_trgm GIN indexes (migration 6f2d1c8a9b47) serve the ILIKE filters and
+# similarity() ranks the matches. Every other backend (SQLite in development
+# and in the benchmarks) uses an in-memory n-gram index per model and app,
+# rebuilt lazily after the write handlers invalidate it, or when another
+# process changed the table: its version is checked at most every
+# SEARCH_INDEX_MAX_AGE seconds. Either path can be narrowed to one genre.
+#----------------------------------------------------------------------------#
+
+import heapq
+import time
+from itertools import islice
+from flask import current_app
+from sqlalchemy import func, or_, text
+from extensions import db
+import genres
+
+SEARCH_FIELDS = ('name', 'city', 'state')
+
+
+def _columns(model):
+    return [model.id] + [getattr(model, field) for field in SEARCH_FIELDS]
+
+
+def _as_dict(row, upcoming):
+    return {
+        'id': row[0],
+        'name': row[1],
+        'city': row[2],
+        'state': row[3],
+        'num_upcoming_shows': upcoming.get(row[0], 0)
+    }
+
+
+def _upcoming_counts(model, rows):
+    # Show counters change far more often than names and places, so they are
+    # read by primary key for the matches instead of living in the index.
+    ids = [row[0] for row in rows]
+    if not ids:
+        return {}
+    return dict(db.session.query(model.id, model.upcoming_shows_count).filter(model.id.in_(ids)))
+
+
+#  Planner
+#  ----------------------------------------------------------------
+
+_trigram_available = {}
+
+
+def _has_trigram_indexes():
+    engine = db.engine
+    key = str(engine.url)
+    if key not in _trigram_available:
+        found = db.session.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+        _trigram_available[key] = found is not None
+    return _trigram_available[key]
+
+
+def plan():
+    # Picks the index path for the current database: 'trigram' when
+    # Postgres has pg_trgm installed, the in-memory 'ngram' index otherwise.
+    backend = current_app.config.get('SEARCH_BACKEND', 'auto')
+    if backend != 'auto':
+        return backend
+    if db.engine.dialect.name == 'postgresql' and _has_trigram_indexes():
+        return 'trigram'
+    return 'ngram'
+
+
+def search(model, term, limit=None, genre=None):
+    term = (term or '').strip()
+    if limit is None:
+        limit = current_app.config.get('SEARCH_RESULT_LIMIT', 50)
+    if plan() == 'trigram':
+        rows = _trigram_search(model, term, limit, genre)
+    else:
+        rows = _index_for(model).search(term, limit, genre)
+    upcoming = _upcoming_counts(model, rows)
+    return [_as_dict(row, upcoming) for row in rows]
+
+
+#  Postgres trigram path
+#  ----------------------------------------------------------------
+
+def _escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _trigram_search(model, term, limit, genre=None):
+    columns = [getattr(model, field) for field in SEARCH_FIELDS]
+    pattern = f'%{_escape_like(term)}%'
+    rank = func.greatest(*[func.similarity(column, term) for column in columns])
+    query = db.session.query(*_columns(model)) \
+        .filter(or_(*[column.ilike(pattern, escape='\\') for column in columns]))
+    if genre:
+        query = query.filter(genres.has_genre(model.genres, genre))
+    return query.order_by(rank.desc(), model.name, model.id).limit(limit).all()
+
+
+#  In-memory n-gram index
+#  ----------------------------------------------------------------
+
+class NgramIndex(object):
+    # Postings map every 1..n character gram to the distinct lowercased field
+    # values containing it, and each (field, value) pair keeps its rows sorted
+    # by name. A query intersects the postings of its own grams, ranks the
+    # few matching values and merges their row lists until the limit is hit,
+    # so the cost follows the number of distinct values, not of rows. Rows
+    # may carry their genres last; they are kept per row for genre filters.
+
+    def __init__(self, rows, n=3):
+        self.n = n
+        self.postings = {}
+        self.rows = {}
+        self.values = {}
+        self.genres = {}
+        for row in rows:
+            row = tuple(row)
+            if len(row) > len(SEARCH_FIELDS) + 1:
+                self.genres[row[0]] = frozenset(row[-1] or ())
+                row = row[:-1]
+            self.rows[row[0]] = row
+            for position, value in enumerate(row[1:]):
+                key = (position, (value or '').lower())
+                self.values.setdefault(key, []).append(((row[1] or ''), row[0]))
+        for key, members in self.values.items():
+            members.sort()
+            value = key[1]
+            for size in range(1, self.n + 1):
+                for i in range(len(value) - size + 1):
+                    self.postings.setdefault(value[i:i + size], set()).add(key)
+        self.ordered = sorted(((row[1] or ''), doc_id) for doc_id, row in self.rows.items())
+
+    def _candidates(self, term):
+        size = min(self.n, len(term))
+        grams = {term[i:i + size] for i in range(len(term) - size + 1)}
+        postings = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        if not postings or not postings[0]:
+            return set()
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            candidates &= keys
+            if not candidates:
+                break
+        return candidates
+
+    @staticmethod
+    def _quality(term, value):
+        # Lower is better: exact match, prefix, word prefix, then substring.
+        if value == term:
+            return 0
+        if value.startswith(term):
+            return 1
+        if f' {term}' in value:
+            return 2
+        if term in value:
+            return 3
+        return None
+
+    def search(self, term, limit, genre=None):
+        term = term.lower()
+        if genre:
+            matches = lambda doc_id: genre in self.genres.get(doc_id, ())
+        else:
+            matches = lambda doc_id: True
+        if not term:
+            return [self.rows[doc_id] for name, doc_id in
+                    islice((entry for entry in self.ordered if matches(entry[1])), limit)]
+        # Tiers are ranked by match quality, then by field so that name
+        # matches come before city and state matches.
+        tiers = {}
+        for key in self._candidates(term):
+            quality = self._quality(term, key[1])
+            if quality is not None:
+                tiers.setdefault((quality, key[0]), []).append(self.values[key])
+        results = []
+        seen = set()
+        for tier in sorted(tiers):
+            for name, doc_id in heapq.merge(*tiers[tier]):
+                if doc_id in seen or not matches(doc_id):
+                    continue
+                seen.add(doc_id)
+                results.append(self.rows[doc_id])
+                if len(results) >= limit:
+                    return results
+        return results
+
+
+#  Index cache
+#  ----------------------------------------------------------------
+
+def table_version(model):
+    # (row count, latest updated_at): moves with every insert, delete and
+    # update, updated_at being bumped on each. One aggregate query.
+    return tuple(db.session.query(func.count(model.id), func.max(model.updated_at)).one())
+
+
+class IndexEntry(object):
+
+    def __init__(self, index, version):
+        self.index = index
+        self.version = version
+        self.checked_at = time.monotonic()
+
+
+class IndexCache(object):
+    # In-memory indexes built from the venue or artist table, one per model
+    # and app, kept in app.extensions[name]. An index is built on first
+    # use and after invalidate(). Writes made by other processes show up
+    # too: once the index is `max_age_setting` seconds old, the table's
+    # version is read and a changed one brings the index up to date,
+    # through `catch_up(index, model, old_version, new_version)` when given
+    # (it returns False when only a rebuild will do) or by rebuilding it.
+
+    def __init__(self, name, build, max_age_setting, catch_up=None):
+        self.name = name
+        self.build = build
+        self.max_age_setting = max_age_setting
+        self.catch_up = catch_up
+
+    def _entries(self):
+        return current_app.extensions.setdefault(self.name, {})
+
+    def get(self, model):
+        entries = self._entries()
+        entry = entries.get(model)
+        if entry is not None and \
+                time.monotonic() - entry.checked_at < current_app.config.get(self.max_age_setting, 30):
+            return entry.index
+        version = table_version(model)
+        if entry is not None and entry.version != version and self.catch_up is not None \
+                and self.catch_up(entry.index, model, entry.version, version):
+            entry.version = version
+        if entry is None or entry.version != version:
+            entry = entries[model] = IndexEntry(self.build(model), version)
+        entry.checked_at = time.monotonic()
+        return entry.index
+
+    def peek(self, model):
+        # The index if built, without checking it.
+        entry = self._entries().get(model)
+        return entry.index if entry is not None else None
+
+    def invalidate(self, model):
+        self._entries().pop(model, None)
+
+
+def _build(model):
+    return NgramIndex(db.session.query(*_columns(model), model.genres).yield_per(1000))
+
+
+_indexes = IndexCache('search_indexes', _build, 'SEARCH_INDEX_MAX_AGE')
+
+
+def _index_for(model):
+    return _indexes.get(model)
+
+
+def invalidate(model):
+    # Called by the handlers that write venues or artists.
+    _indexes.invalidate(model)
@@ -0,0 +1,215 @@
+#----------------------------------------------------------------------------#
+# Server-side sessions.
+#
+# With SESSION_BACKEND = 'cookie' (the default) Flask's signed cookie
+# sessions are used unchanged. The other backends keep session data on the
+# server and only put a signed session id in the cookie, so any worker on
+# any node can serve any request:
+#   'filesystem' files under SESSION_FILE_DIR (shared between the workers
+#                of one node, or across nodes on a shared volume)
+#   'sql'        the web_session table in the application database
+#   'redis'      a Redis-compatible server at SESSION_REDIS_URL, or the
+#                in-process cache.LocalRedis stand-in when it is unset
+# All stores expose the get / set(ex=) / delete subset of the Redis client.
+#----------------------------------------------------------------------------#
+
+import datetime
+import hashlib
+import os
+import secrets
+import tempfile
+import time
+from flask.sessions import SessionInterface, SessionMixin
+from flask.json.tag import TaggedJSONSerializer
+from itsdangerous import Signer, BadSignature
+from sqlalchemy.exc import IntegrityError
+from werkzeug.datastructures import CallbackDict
+from extensions import db
+from models import WebSession
+from cache import LocalRedis
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+#  Stores
+#  ----------------------------------------------------------------
+
+class FileSystemStore(object):
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, hashlib.sha256(name.encode()).hexdigest())
+
+    def get(self, name):
+        try:
+            with open(self._path(name), 'rb') as f:
+                expires_at = float(f.readline())
+                value = f.read()
+        except (OSError, ValueError):
+            return None
+        if expires_at and expires_at <= time.time():
+            self.delete(name)
+            return None
+        return value
+
+    def set(self, name, value, ex=None):
+        expires_at = time.time() + ex if ex else 0
+        # Write to a temporary file and rename so readers never see half a
+        # session, even with several workers writing the same one.
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(f'{expires_at}\n'.encode())
+            f.write(value)
+        os.replace(tmp, self._path(name))
+        return True
+
+    def delete(self, *names):
+        deleted = 0
+        for name in names:
+            try:
+                os.remove(self._path(name))
+                deleted += 1
+            except FileNotFoundError:
+                pass
+        return deleted
+
+
+class SQLStore(object):
+    # Sessions in the web_session table (migration 2b7f4e19c6d3). Expired
+    # rows are ignored on read and can be purged with purge_expired().
+    # Writes go through a transaction of their own on the engine, so saving
+    # a session never commits what the view left pending in db.session.
+
+    table = WebSession.__table__
+
+    def get(self, name):
+        row = db.session.query(WebSession.data, WebSession.expires_at) \
+            .filter(WebSession.id == name).first()
+        if row is None:
+            return None
+        if row.expires_at is not None and row.expires_at <= datetime.datetime.utcnow():
+            return None
+        return row.data
+
+    def set(self, name, value, ex=None):
+        expires_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=ex) if ex else None
+        values = {'data': value, 'expires_at': expires_at}
+        update = self.table.update().where(self.table.c.id == name).values(**values)
+        with db.engine.begin() as connection:
+            if connection.execute(update).rowcount:
+                return True
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(self.table.insert().values(id=name, **values))
+        except IntegrityError:
+            # Another request inserted it first.
+            with db.engine.begin() as connection:
+                connection.execute(update)
+        return True
+
+    def delete(self, *names):
+        with db.engine.begin() as connection:
+            return connection.execute(self.table.delete().where(self.table.c.id.in_(names))).rowcount
+
+    def purge_expired(self):
+        with db.engine.begin() as connection:
+            return connection.execute(self.table.delete().where(
+                self.table.c.expires_at <= datetime.datetime.utcnow())).rowcount
+
+
+#  Session interface
+#  ----------------------------------------------------------------
+
+class ServerSideSessionInterface(SessionInterface):
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store, key_prefix='session:'):
+        self.store = store
+        self.key_prefix = key_prefix
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='fyyur-session-id')
+
+    def _lifetime(self, app):
+        return int(app.permanent_session_lifetime.total_seconds())
+
+    def open_session(self, app, request):
+        token = request.cookies.get(app.session_cookie_name)
+        if token:
+            try:
+                sid = self._signer(app).unsign(token).decode()
+            except BadSignature:
+                sid = None
+            if sid:
+                value = self.store.get(self.key_prefix + sid)
+                if value is not None:
+                    try:
+                        data = self.serializer.loads(value.decode())
+                    except ValueError:
+                        data = None
+                    if data is not None:
+                        return ServerSideSession(data, sid=sid)
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified:
+                self.store.delete(self.key_prefix + session.sid)
+                response.delete_cookie(app.session_cookie_name, domain=domain, path=path)
+            return
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not self.should_set_cookie(app, session):
+            return
+
+        self.store.set(self.key_prefix + session.sid,
+                       self.serializer.dumps(dict(session)).encode(),
+                       ex=self._lifetime(app))
+        response.set_cookie(
+            app.session_cookie_name,
+            self._signer(app).sign(session.sid.encode()).decode(),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def create_session_interface(config):
+    # Returns None for the default cookie sessions.
+    backend = config.get('SESSION_BACKEND', 'cookie')
+    prefix = config.get('SESSION_KEY_PREFIX', 'session:')
+    if backend == 'cookie':
+        return None
+    if backend == 'filesystem':
+        return ServerSideSessionInterface(FileSystemStore(config['SESSION_FILE_DIR']), prefix)
+    if backend == 'sql':
+        return ServerSideSessionInterface(SQLStore(), prefix)
+    if backend == 'redis':
+        url = config.get('SESSION_REDIS_URL')
+        if url:
+            import redis
+            client = redis.Redis.from_url(url)
+        else:
+            client = LocalRedis()
+        return ServerSideSessionInterface(client, prefix)
+    raise ValueError(f'Unknown SESSION_BACKEND: {backend}')
@@ -0,0 +1,207 @@
+#----------------------------------------------------------------------------#
+# Show pages.
+#----------------------------------------------------------------------------#
+
+from flask import Blueprint, current_app, render_template, request, flash, redirect, url_for
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import Venue, Artist, Show
+from forms import ShowForm, TourForm
+import pagination
+import counters
+import scheduling
+
+bp = Blueprint('shows', __name__)
+
+
+def shows_changed(venue_ids, artist_ids):
+    # Recounts the show counters of the venues and artists a write to the
+    # show table touched. Every handler that creates or deletes shows calls it.
+    counters.refresh(venue_ids, artist_ids)
+
+def split_shows(shows, now):
+    # Detail pages load all shows of a venue or artist in one query ordered by
+    # start_time and split them here.
+    past_shows = []
+    upcoming_shows = []
+    for show in shows:
+        if show['start_time'] < now:
+            past_shows.append(show)
+        else:
+            upcoming_shows.append(show)
+    return past_shows, upcoming_shows
+
+
+def list_show(venue_id, artist_id, start_time, end_time):
+    # Books the show unless its venue or artist is already taken for that
+    # time; the exclusion constraints catch a booking made in between.
+    try:
+        clashes = scheduling.conflicts(start_time, end_time, venue_id=venue_id, artist_id=artist_id, limit=1)
+        if clashes:
+            flash(scheduling.describe(clashes[0]))
+            return
+        show = Show(
+            artist_id = artist_id,
+            venue_id = venue_id,
+            start_time = start_time,
+            end_time = end_time
+        )
+        db.session.add(show)
+        db.session.commit()
+        shows_changed([venue_id], [artist_id])
+        flash('Show was successfully listed!')
+    except IntegrityError:
+        db.session.rollback()
+        flash('That time was just booked for the venue or the artist. Show could not be listed')
+    except ValueError:
+        current_app.logger.exception('Show could not be listed')
+        flash('An error has occured. Show could not be listed')
+        db.session.rollback()
+
+
+def lookup_booking(artist_id, venue_ids):
+    # (artist, venues) for booking shows: the artist's availability, None
+    # when it does not exist, and the subset of venue_ids that do; one
+    # query each.
+    artist = db.session.query(Artist.lists_available, Artist.available_from, Artist.available_to) \
+        .filter(Artist.id == artist_id).first()
+    venues = {venue_id for venue_id, in db.session.query(Venue.id).filter(Venue.id.in_(venue_ids))}
+    return artist, venues
+
+
+def book_tour(artist_id, dates):
+    # Books an artist's dates, (venue_id, start_time, end_time) each, in one
+    # transaction, or none of them. The artist, the venues and clashes with
+    # the show table are each checked with one query, and the dates against
+    # each other in one sort. Returns (shows, errors): errors maps the index of
+    # every date that cannot be booked to the reason, and None to the reason
+    # when the whole tour cannot be.
+    venue_ids = {venue_id for venue_id, start_time, end_time in dates}
+    artist, venues = lookup_booking(artist_id, venue_ids)
+    if artist is None:
+        return [], {None: 'The artist does not exist'}
+
+    errors = {}
+    for index, (venue_id, start_time, end_time) in enumerate(dates):
+        if venue_id not in venues:
+            errors[index] = 'That venue does not exist'
+        elif not scheduling.is_within_availability(artist, start_time, end_time):
+            errors[index] = 'Artist not available in that time'
+    # Every date books the artist, so any two overlapping dates clash.
+    slots = [(index, artist_id, start_time, end_time)
+             for index, (venue_id, start_time, end_time) in enumerate(dates)]
+    for index, earlier in scheduling.overlapping_pairs(slots):
+        errors.setdefault(index, f'Overlaps the date at {dates[earlier][1]:%Y-%m-%d %H:%M}')
+    found = scheduling.batch_conflicts([(index, venue_id, artist_id, start_time, end_time)
+                                        for index, (venue_id, start_time, end_time) in enumerate(dates)
+                                        if index not in errors])
+    for index, conflict in found.items():
+        errors[index] = scheduling.describe(conflict)
+    if errors:
+        return [], errors
+
+    shows = [Show(artist_id=artist_id, venue_id=venue_id, start_time=start_time, end_time=end_time)
+             for venue_id, start_time, end_time in dates]
+    try:
+        db.session.add_all(shows)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return [], {None: 'A date was just booked for a venue or the artist. No show was listed'}
+    shows_changed(venue_ids, [artist_id])
+    return shows, {}
+
+
+#  Shows
+#  ----------------------------------------------------------------
+
+@bp.route('/shows')
+def shows():
+
+    query = db.session.query(
+            Show.venue_id, Show.artist_id, Show.start_time,
+            Artist.name.label('artist_name'), Artist.image_link.label('artist_image_link'),
+            Venue.name.label('venue_name')) \
+        .join(Artist, Show.artist_id == Artist.id) \
+        .join(Venue, Show.venue_id == Venue.id)
+    page = pagination.paginate(query, [(Show.start_time, True), (Show.id, True)])
+
+    data = []
+    for result in page.items:
+        data.append({
+            "venue_id": result.venue_id,
+            "artist_name": result.artist_name,
+            "venue_name": result.venue_name,
+            "artist_id": result.artist_id,
+            "artist_image_link": result.artist_image_link,
+            "start_time": result.start_time
+        })
+
+    return render_template('pages/shows.html', shows=data, page=page)
+
+@bp.route('/shows/create')
+def create_shows():
+    # renders form. do not touch.
+    form = ShowForm()
+    return render_template('forms/new_show.html', form=form)
+
+@bp.route('/shows/create', methods=['POST'])
+def create_show_submission():
+    # Checks the artist and venue exist, in one query each, and that the
+    # show fits the artist's availability before booking it.
+    form = ShowForm(request.form)
+    start_time = form.start_time.data
+    try:
+        artist_id, venue_id = int(form.artist_id.data), int(form.venue_id.data)
+    except (TypeError, ValueError):
+        flash('An error has occured. The artist and venue IDs must be numbers')
+        return redirect(url_for("main.index"))
+    if not start_time:
+        flash("Are you a traveler of time and space? I think not")
+        return redirect(url_for("main.index"))
+    if not form.duration.validate(form):
+        flash(form.duration.errors[0])
+        return redirect(url_for("main.index"))
+    end_time = scheduling.end_time_for(start_time, form.duration.data)
+
+    artist, venues = lookup_booking(artist_id, [venue_id])
+    if artist is None and not venues:
+        flash('Neither artist nor venue exists, get your shit together :P')
+    elif artist is None:
+        flash('An error has occured. The artist does not exist')
+    elif not venues:
+        flash('An error has occured. That venue does not exist')
+    elif not scheduling.is_within_availability(artist, start_time, end_time):
+        flash('Artist not available in that time')
+    else:
+        list_show(venue_id, artist_id, start_time, end_time)
+    return redirect(url_for("main.index"))
+
+#  Tours
+#  ----------------------------------------------------------------
+
+@bp.route('/shows/tour')
+def create_tour():
+    return render_template('forms/new_tour.html', form=TourForm())
+
+@bp.route('/shows/tour', methods=['POST'])
+def create_tour_submission():
+    # Lists every date of the tour or, when any cannot be booked, none and
+    # shows the form again with the reason next to each such date.
+    form = TourForm(request.form)
+    if not form.validate():
+        return render_template('forms/new_tour.html', form=form), 400
+    entries = [entry for entry in form.dates if not entry.form.blank]
+    dates = [(entry.venue_id.data, entry.start_time.data,
+              scheduling.end_time_for(entry.start_time.data, entry.duration.data or form.duration.data))
+             for entry in entries]
+    shows, errors = book_tour(form.artist_id.data, dates)
+    if errors:
+        for index, message in errors.items():
+            if index is None:
+                form.artist_id.errors.append(message)
+            else:
+                entries[index].start_time.errors.append(message)
+        return render_template('forms/new_tour.html', form=form), 409
+    flash(f'{len(shows)} shows were successfully listed!')
+    return redirect(url_for('artists.show_artist', artist_id=form.artist_id.data))
@@ -2,3 +2,131 @@ window.parseISOString = function parseISOString(s) {
   var b = s.split(/\D+/);
   return new Date(Date.UTC(b[0], --b[1], b[2], b[3], b[4], b[5], b[6]));
 };
+
+// Warns on the new show form when the venue or artist is already booked
+// for the chosen time, using GET /api/v1/shows/conflicts.
+(function () {
+  var form = document.getElementById('show-form');
+  if (!form) {
+    return;
+  }
+  var warning = document.getElementById('show-conflicts');
+  var pending = null;
+
+  function check() {
+    var params = ['venue_id', 'artist_id', 'start_time', 'duration']
+      .filter(function (name) { return form.elements[name].value.trim(); })
+      .map(function (name) {
+        return name + '=' + encodeURIComponent(form.elements[name].value.trim());
+      });
+    if (!form.elements.start_time.value.trim() ||
+        !(form.elements.venue_id.value.trim() || form.elements.artist_id.value.trim())) {
+      warning.style.display = 'none';
+      return;
+    }
+    if (pending) {
+      pending.abort();
+    }
+    pending = new XMLHttpRequest();
+    pending.open('GET', '/api/v1/shows/conflicts?' + params.join('&'));
+    pending.onload = function () {
+      var result = this.status === 200 ? JSON.parse(this.responseText) : null;
+      if (!result || !result.conflict) {
+        warning.style.display = 'none';
+        return;
+      }
+      warning.textContent = result.data.map(function (show) {
+        return 'The ' + show.resource + ' already has a show from ' +
+          show.start_time.replace('T', ' ').slice(0, 16) + ' to ' +
+          show.end_time.replace('T', ' ').slice(0, 16) + '.';
+      }).join(' ');
+      warning.style.display = 'block';
+    };
+    pending.send();
+  }
+
+  ['venue_id', 'artist_id', 'start_time', 'duration'].forEach(function (name) {
+    form.elements[name].addEventListener('change', check);
+  });
+})();
+
+// Adds an empty date row to the tour form, numbered after the last one.
+(function () {
+  var button = document.getElementById('add-tour-date');
+  if (!button) {
+    return;
+  }
+  var dates = document.getElementById('tour-dates');
+  button.addEventListener('click', function () {
+    var rows = dates.querySelectorAll('.tour-date');
+    var last = rows[rows.length - 1];
+    var index = rows.length;
+    var row = last.cloneNode(true);
+    row.classList.remove('has-error');
+    Array.prototype.forEach.call(row.querySelectorAll('.help-block'), function (error) {
+      error.parentNode.removeChild(error);
+    });
+    Array.prototype.forEach.call(row.querySelectorAll('input'), function (input) {
+      input.name = input.name.replace(/^dates-\d+-/, 'dates-' + index + '-');
+      input.id = input.name;
+      input.value = '';
+    });
+    dates.appendChild(row);
+  });
+})();
+
+// Name lookups for id fields: typing in an input with data-autocomplete
+// lists the matching names from that URL (?q=) in its datalist, and picking
+// one fills the field named by data-target with its id.
+(function () {
+  var DELAY = 150;
+
+  function label(suggestion) {
+    var place = [suggestion.city, suggestion.state].filter(Boolean).join(', ');
+    return suggestion.name + (place ? ' (' + place + ')' : '') + ' #' + suggestion.id;
+  }
+
+  Array.prototype.forEach.call(document.querySelectorAll('[data-autocomplete]'), function (input) {
+    var target = input.form.elements[input.getAttribute('data-target')];
+    var list = document.getElementById(input.getAttribute('list'));
+    var ids = {};
+    var timer = null;
+    var pending = null;
+
+    function fetchSuggestions() {
+      var term = input.value.trim();
+      if (!term || ids.hasOwnProperty(input.value)) {
+        return;
+      }
+      if (pending) {
+        pending.abort();
+      }
+      pending = new XMLHttpRequest();
+      pending.open('GET', input.getAttribute('data-autocomplete') + '?q=' + encodeURIComponent(term));
+      pending.onload = function () {
+        if (this.status !== 200) {
+          return;
+        }
+        ids = {};
+        list.innerHTML = '';
+        JSON.parse(this.responseText).data.forEach(function (suggestion) {
+          var option = document.createElement('option');
+          option.value = label(suggestion);
+          ids[option.value] = suggestion.id;
+          list.appendChild(option);
+        });
+      };
+      pending.send();
+    }
+
+    input.addEventListener('input', function () {
+      if (ids.hasOwnProperty(input.value)) {
+        target.value = ids[input.value];
+        target.dispatchEvent(new Event('change'));
+        return;
+      }
+      clearTimeout(timer);
+      timer = setTimeout(fetchSuggestions, DELAY);
+    });
+  });
+})();
@@ -0,0 +1,39 @@
+# Fixtures shared by the tests: an app on an in-memory SQLite database
+# (TEST_DATABASE_URL to use another) with fresh tables per test.
+
+import os
+import sys
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app import create_app
+from extensions import db as _db
+from instrumentation import QueryCounter
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+
+
+@pytest.fixture
+def db(app):
+    return _db
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_queries(app):
+    return QueryCounter
@@ -0,0 +1,53 @@
+# Rows that cannot be read are rejected with their line number, like rows
+# failing validation, and the rest of the file is still imported.
+
+import datetime
+import json
+from bulk_import import import_rows, read_rows
+from models import Venue, Artist, Show
+
+
+def test_unreadable_jsonl_lines_are_rejected(db, tmp_path):
+    path = tmp_path / 'artists.jsonl'
+    path.write_text('\n'.join([
+        json.dumps({'name': 'Wild Tides', 'city': 'Austin', 'state': 'TX', 'genres': ['Jazz']}),
+        '{"name": "Broken',
+        '["not", "an", "object"]',
+        json.dumps({'city': 'Austin', 'state': 'TX', 'genres': ['Jazz']}),
+        json.dumps({'name': 'Quiet Saints', 'city': 'Austin', 'state': 'TX', 'genres': ['Folk']}),
+    ]) + '\n')
+    rejects = []
+
+    inserted, rejected = import_rows('artists', read_rows(str(path)), batch_size=2,
+                                     on_reject=lambda *reject: rejects.append(reject))
+
+    assert (inserted, rejected) == (2, 3)
+    assert sorted(name for name, in db.session.query(Artist.name)) == ['Quiet Saints', 'Wild Tides']
+    assert [number for number, row, errors in rejects] == [2, 3, 4]
+    assert rejects[0][1] == '{"name": "Broken'
+    assert rejects[0][2]['row'][0].startswith('Not valid JSON')
+    assert rejects[1][2] == {'row': ['Not a JSON object']}
+    assert 'name' in rejects[2][2]
+
+
+def test_imported_shows_must_fit_availability(db):
+    # The whole show must fit, bounds included, as on /shows/create.
+    start = datetime.datetime(2030, 6, 1, 20)
+    venue = Venue(name='The Velvet Room', genres=['Jazz'])
+    artist = Artist(name='Wild Tides', genres=['Jazz'], lists_available=True,
+                    available_from=start, available_to=start + datetime.timedelta(hours=2))
+    db.session.add_all([venue, artist])
+    db.session.commit()
+    rows = [(number, {'artist_id': str(artist.id), 'venue_id': str(venue.id),
+                      'start_time': f'{start:%Y-%m-%d %H:%M:%S}', 'duration': str(duration)})
+            for number, duration in [(2, 180), (3, 120)]]
+    rejects = []
+
+    inserted, rejected = import_rows('shows', iter(rows),
+                                     on_reject=lambda *reject: rejects.append(reject))
+
+    assert (inserted, rejected) == (1, 1)
+    assert [(show.start_time, show.end_time) for show in db.session.query(Show)] == \
+        [(start, start + datetime.timedelta(hours=2))]
+    assert [(number, errors) for number, row, errors in rejects] == \
+        [(2, {'start_time': ['Artist not available in that time']})]
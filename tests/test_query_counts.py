@@ -0,0 +1,73 @@
+# The venue and artist pages load their shows in one joined query, whatever
+# their number: a rendered page takes three queries (the page version, the
+# venue or artist and its shows) and one served from the page cache one.
+
+import datetime
+import pytest
+from models import Venue, Artist, Show
+import counters
+
+RENDERED_QUERIES = 3
+CACHED_QUERIES = 1
+
+
+@pytest.fixture
+def listing(db):
+    # A venue and an artist with `shows` shows together, half past and half
+    # upcoming, and at as many other venues and artists.
+    def create(shows):
+        now = datetime.datetime.now()
+        venue = Venue(name='The Velvet Room', city='Austin', state='TX', genres=['Jazz'])
+        artist = Artist(name='Wild Tides', city='Austin', state='TX', genres=['Jazz'],
+                        available_from=now, available_to=now + datetime.timedelta(days=90))
+        others = [(Venue(name=f'Venue {i}', genres=[]), Artist(name=f'Artist {i}', genres=[]))
+                  for i in range(shows)]
+        db.session.add_all([venue, artist] + [row for pair in others for row in pair])
+        db.session.flush()
+        for i, (other_venue, other_artist) in enumerate(others):
+            start = now + datetime.timedelta(days=i - shows // 2, hours=1)
+            end = start + datetime.timedelta(hours=2)
+            db.session.add_all([
+                Show(venue_id=venue.id, artist_id=other_artist.id, start_time=start, end_time=end),
+                Show(venue_id=other_venue.id, artist_id=artist.id, start_time=start, end_time=end),
+            ])
+        db.session.commit()
+        counters.rebuild()
+        return venue.id, artist.id
+    return create
+
+
+def _pages(venue_id, artist_id):
+    return [f'/venues/{venue_id}', f'/artists/{artist_id}']
+
+
+@pytest.mark.parametrize('shows', [0, 1, 25])
+def test_rendered_detail_pages_take_three_queries(app, client, listing, count_queries, shows):
+    # Requests with a session cookie skip the page cache.
+    client.set_cookie('localhost', app.session_cookie_name, 'x')
+    for url in _pages(*listing(shows)):
+        with count_queries() as queries:
+            response = client.get(url)
+        assert response.status_code == 200, url
+        assert queries.count == RENDERED_QUERIES, url
+
+
+def test_cached_detail_pages_take_one_query(client, listing, count_queries):
+    for url in _pages(*listing(10)):
+        client.get(url)
+        with count_queries() as queries:
+            response = client.get(url)
+        assert response.status_code == 200, url
+        assert queries.count == CACHED_QUERIES, url
+
+
+def test_detail_pages_show_every_show(client, listing):
+    venue_body, artist_body = [client.get(url).get_data(as_text=True) for url in _pages(*listing(4))]
+    for i in range(4):
+        assert f'Artist {i}' in venue_body
+        assert f'Venue {i}' in artist_body
+
+
+@pytest.mark.parametrize('url', ['/venues/999', '/artists/999'])
+def test_missing_detail_pages_are_not_found(client, url):
+    assert client.get(url).status_code == 404
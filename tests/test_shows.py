@@ -0,0 +1,65 @@
+# Booking single shows and tours: unknown artists and venues are reported,
+# not crashed on, and a show must fit the artist's availability over its
+# whole run, as in the availability search.
+
+import datetime
+import pytest
+from models import Venue, Artist, Show
+
+
+@pytest.fixture
+def booking(db):
+    start = datetime.datetime(2030, 6, 1, 20)
+    venue = Venue(name='The Velvet Room', genres=['Jazz'])
+    artist = Artist(name='Wild Tides', genres=['Jazz'], lists_available=True,
+                    available_from=start - datetime.timedelta(days=1),
+                    available_to=start + datetime.timedelta(hours=2))
+    db.session.add_all([venue, artist])
+    db.session.commit()
+    return venue.id, artist.id, start
+
+
+def _flashes(client):
+    with client.session_transaction() as session:
+        return [message for category, message in session.get('_flashes', [])]
+
+
+def _create_show(client, venue_id, artist_id, start, duration):
+    return client.post('/shows/create', data={
+        'venue_id': venue_id, 'artist_id': artist_id,
+        'start_time': f'{start:%Y-%m-%d %H:%M:%S}', 'duration': duration})
+
+
+def test_unknown_artist_is_reported(client, booking):
+    venue_id, artist_id, start = booking
+    response = _create_show(client, venue_id, 9999, start, 60)
+    assert response.status_code == 302
+    assert _flashes(client) == ['An error has occured. The artist does not exist']
+
+
+def test_unknown_venue_is_reported(client, booking):
+    venue_id, artist_id, start = booking
+    _create_show(client, 9999, artist_id, start, 60)
+    assert _flashes(client) == ['An error has occured. That venue does not exist']
+
+
+@pytest.mark.parametrize('duration, listed', [(120, True), (180, False)])
+def test_show_must_end_within_availability(client, db, booking, duration, listed):
+    venue_id, artist_id, start = booking
+    _create_show(client, venue_id, artist_id, start, duration)
+    assert (db.session.query(Show).count() == 1) is listed
+    if not listed:
+        assert _flashes(client) == ['Artist not available in that time']
+
+
+def test_tour_date_must_end_within_availability(client, db, booking):
+    venue_id, artist_id, start = booking
+    response = client.post('/shows/tour', data={
+        'artist_id': artist_id,
+        'dates-0-venue_id': venue_id,
+        'dates-0-start_time': f'{start:%Y-%m-%d %H:%M:%S}',
+        'dates-0-duration': 180,
+    })
+    assert response.status_code == 409
+    assert 'Artist not available in that time' in response.get_data(as_text=True)
+    assert db.session.query(Show).count() == 0
@@ -0,0 +1,214 @@
+#----------------------------------------------------------------------------#
+# Venue pages.
+#----------------------------------------------------------------------------#
+
+import datetime
+from flask import Blueprint, current_app, render_template, request, flash, redirect, url_for
+from extensions import db, cache
+from models import Venue, Artist, Show, VenueArea
+from forms import VenueForm
+from main import RECENT_VENUES_KEY
+from shows import split_shows
+import pagination
+import search
+import autocomplete
+import areas
+import genres
+import page_cache
+
+bp = Blueprint('venues', __name__)
+
+
+def venues_changed(*changed_areas, old_genres=(), new_genres=(), ids=()):
+    # Drops or rebuilds everything derived from the venue table after a
+    # write. Handlers pass the (city, state) areas they touched, the genres
+    # of the venue before and after and its id; without any areas the
+    # directory summary, every genre count and the autocomplete array are
+    # rebuilt.
+    search.invalidate(Venue)
+    cache.delete(RECENT_VENUES_KEY)
+    if changed_areas:
+        areas.refresh(changed_areas)
+        genres.adjust(Venue, old_genres, new_genres)
+        autocomplete.refresh(Venue, ids)
+    else:
+        areas.rebuild()
+        genres.refresh([Venue])
+        autocomplete.invalidate(Venue)
+
+
+#  Venues
+#  ----------------------------------------------------------------
+
+@bp.route('/venues')
+def venues():
+    genre_counts = genres.counts(Venue)
+    if any(name in request.args for name in ('city', 'state', 'genre')):
+        # Venues of one area and/or genre, paged from the venue table.
+        query = areas.filtered_venues(request.args.get('city'), request.args.get('state'),
+                                      request.args.get('genre'))
+        page = pagination.paginate(query, areas.VENUE_DIRECTORY_KEYS)
+        return render_template('pages/venues.html', areas=areas.group_venues_by_area(page.items),
+                               page=page, genres=genre_counts)
+    query = db.session.query(VenueArea.city, VenueArea.state, VenueArea.venue_count, VenueArea.venues)
+    page = pagination.paginate(query, areas.AREA_DIRECTORY_KEYS)
+    return render_template('pages/venues.html', areas=page.items, page=page, genres=genre_counts)
+
+@bp.route('/venues/search', methods=['POST'])
+def search_venues():
+
+    search_term = request.form.get('search_term', '')
+    genre = request.form.get('genre') or None
+    data = search.search(Venue, search_term, genre=genre)
+    response = {
+        "count": len(data),
+        "data": data
+    }
+
+    return render_template('pages/search_venues.html', results=response, search_term=request.form.get('search_term', ''),
+                           genre=genre, genres=genres.counts(Venue))
+
+@bp.route('/venues/<int:venue_id>')
+@page_cache.cached_detail(Venue)
+def show_venue(venue_id):
+    # shows the venue page with the given venue_id
+    venue = Venue.query.get(venue_id)
+    now = datetime.datetime.now()
+
+    if not venue:
+        return render_template('errors/404.html'), 404
+
+    rows = db.session.query(Show.artist_id, Artist.name, Artist.image_link, Show.start_time) \
+        .join(Artist, Show.artist_id == Artist.id) \
+        .filter(Show.venue_id == venue_id) \
+        .order_by(Show.start_time).all()
+
+    past_shows, upcoming_shows = split_shows([{
+        "artist_id": artist_id,
+        "artist_name": artist_name,
+        "start_time": start_time,
+        "artist_image_link": artist_image_link
+    } for artist_id, artist_name, artist_image_link, start_time in rows], now)
+
+    data = {
+        'id': venue.id,
+        'name': venue.name,
+        'city': venue.city,
+        'state': venue.state,
+        'address': venue.address,
+        'phone': venue.phone,
+        'image_link': venue.image_link,
+        'facebook_link': venue.facebook_link,
+        'genres': venue.genres,
+        'seeking_talent': venue.seeking_talent,
+        'seeking_description': venue.seeking_description,
+        'upcoming_shows': upcoming_shows,
+        'past_shows': past_shows,
+        "past_shows_count": len(past_shows),
+        "upcoming_shows_count": len(upcoming_shows)
+    }
+
+
+    return render_template('pages/show_venue.html', venue=data)
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+@bp.route('/venues/create', methods=['GET'])
+def create_venue_form():
+    form = VenueForm()
+    return render_template('forms/new_venue.html', form=form)
+
+@bp.route('/venues/create', methods=['POST'])
+def create_venue_submission():
+    form = VenueForm(request.form)
+
+    try:
+        venue = Venue(
+            name=form.name.data,
+            city=form.city.data,
+            state=form.state.data,
+            address=form.address.data,
+            phone=form.phone.data,
+            facebook_link=form.facebook_link.data,
+            genres=form.genres.data,
+            seeking_talent=form.seeking_talent.data,
+            website=form.website.data,
+            seeking_description=form.seeking_description.data)
+        db.session.add(venue)
+        db.session.commit()
+        venues_changed((form.city.data, form.state.data), new_genres=form.genres.data, ids=[venue.id])
+        flash(f'Venue {form.name.data} was successfully listed!')
+    except ValueError:
+        current_app.logger.exception('Venue %r could not be listed', form.name.data)
+        flash(f'An error has occured! {form.name.data} could not be listed')
+        db.session.rollback()
+    finally:
+        db.session.close
+    return redirect(url_for("main.index"))
+
+@bp.route('/venues/<delete_id>/delete', methods=['POST'])
+def delete_venue(delete_id):
+    venue = Venue.query.get(delete_id)
+    if venue:
+        try:
+            area = (venue.city, venue.state)
+            old_genres = list(venue.genres or [])
+            venue_id = venue.id
+            db.session.delete(venue)
+            db.session.commit()
+            venues_changed(area, old_genres=old_genres, ids=[venue_id])
+            flash('The Venue has been successfully deleted!')
+            return redirect(url_for("main.index"))
+        except:
+            db.session.rollback()
+
+        finally:
+            db.session.close()
+
+    return render_template('pages/home.html')
+
+#  Update
+#  ----------------------------------------------------------------
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['GET'])
+def edit_venue(venue_id):
+    venue = Venue.query.get(venue_id)
+    if venue:
+        form = VenueForm(obj=venue)
+    else:
+        flash("The Venue does not exist")
+        return render_template ('errors/404.html')
+
+    return render_template('forms/edit_venue.html', form=form, venue=venue)
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['POST'])
+def edit_venue_submission(venue_id):
+    form = VenueForm()
+    venue = Venue.query.get(venue_id)
+    area = (venue.city, venue.state)
+    old_genres = list(venue.genres or [])
+    try:
+        venue.name = form.name.data,
+        venue.city = form.city.data,
+        venue.state = form.state.data,
+        venue.address = form.address.data,
+        venue.phone = form.phone.data,
+        venue.image_link = form.image_link.data,
+        venue.facebook_link = form.facebook_link.data,
+        venue.genres = form.genres.data,
+        venue.seeking_description = form.seeking_description.data
+        db.session.commit()
+        venues_changed(area, (form.city.data, form.state.data),
+                       old_genres=old_genres, new_genres=form.genres.data, ids=[venue_id])
+        page_cache.touch_related(Artist, Show.artist_id, Show.venue_id == venue_id)
+        flash(f'{venue.name} was succesfully edited')
+    except ValueError:
+        current_app.logger.exception('Venue %s could not be edited', venue_id)
+        flash(f'An error has occured. {venue.name} was not succesfully edited')
+        db.session.rollback()
+    finally:
+        db.session.close()
+
+
+    return redirect(url_for('.show_venue', venue_id=venue_id))